@@ -48,12 +48,17 @@ a = Analysis(
         'docx.shared',
         'docx.enum.text',
         'docx.oxml',
+        # Пакетне злиття періодів
+        'numpy',
         # Наші модулі
         'src.core.database',
         'src.core.excel_reader',
         'src.core.report_generator',
         'src.core.data_processor',
         'src.core.dodatky_reader',
+        'src.core.period_engine',
+        'src.core.data_table',
+        'src.core.xlsx_stream',
         'src.core.migration',
         'src.core.updater',
         'src.gui.main_window',
@@ -63,6 +68,7 @@ a = Analysis(
         'src.gui.styles',
         'src.gui.passport_data_dialog',
         'src.utils.date_utils',
+        'src.utils.name_utils',
         'src.utils.validators',
     ] + openpyxl_hiddenimports,
     hookspath=[],
@@ -74,7 +80,6 @@ a = Analysis(
         'unittest',
         'test',
         'tests',
-        'numpy',
         'pandas',
         'matplotlib',
         'scipy',
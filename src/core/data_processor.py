@@ -223,6 +223,13 @@ class DataProcessor:
         Returns:
             Список словників з даними
         """
+        from core.database import DatabaseManager
+
+        if isinstance(data_source, DatabaseManager):
+            # БД - один пакетний запит замість N окремих
+            batch_data = data_source.get_complete_data_batch(names)
+            return [batch_data[name] for name in names if name in batch_data]
+
         results = []
 
         for name in names:
@@ -0,0 +1,239 @@
+"""
+Компактне колонкове представлення аркуша Data
+
+Замість списку словників (15 ключів на рядок) дані зберігаються по колонках:
+- текстові колонки - списки інтернованих рядків (однакові звання, посади,
+  підрозділи, місяці та ПІБ зберігаються один раз)
+- дати - порядкові номери днів у array('i') + тип вихідного значення
+- номери рядків Excel - array('i')
+
+Рядки доступні через DataRow - легке подання, сумісне зі споживачами словників
+(row["name"], row.get("unit"), dict(row)).
+"""
+from array import array
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+
+from utils.date_utils import parse_date
+
+
+# Типи вихідних значень колонок дат
+_DATE_NONE = 0      # None
+_DATE_DATETIME = 1  # datetime опівночі (клітинка з форматом дати)
+_DATE_TEXT = 2      # рядок DD.MM.YYYY
+_DATE_RAW = 3       # інше значення - зберігається як є
+
+_MIDNIGHT = time()
+
+
+class DataSheetTable(Sequence):
+    """
+    Колонкова таблиця рядків аркуша Data
+
+    Послідовність DataRow у порядку рядків аркуша. Фільтри по ПІБ, підрозділу
+    та місяцю працюють через індекси номерів рядків (array('i')).
+    """
+
+    TEXT_COLUMNS = ("month", "unit", "birth_date", "rank", "name", "rnokpp", "position", "status")
+    DATE_COLUMNS = ("start_100", "end_100", "start_30", "end_30", "start_non", "end_non")
+    COLUMNS = (
+        "month", "unit", "birth_date", "rank", "name", "rnokpp", "position",
+        "start_100", "end_100", "start_30", "end_30", "start_non", "end_non",
+        "status", "row_number"
+    )
+    INDEXED_COLUMNS = ("name", "unit", "month")
+
+    def __init__(self):
+        self._text = {column: [] for column in self.TEXT_COLUMNS}
+        self._ordinals = {column: array("i") for column in self.DATE_COLUMNS}
+        self._date_kinds = {column: array("b") for column in self.DATE_COLUMNS}
+        self._raw_dates = {}  # {(колонка, індекс): значення} для _DATE_RAW
+        self._row_numbers = array("i")
+        self._strings = {}  # Пул інтернованих рядків
+        self._indexes = {column: {} for column in self.INDEXED_COLUMNS}  # {колонка: {значення: array('i')}}
+        self._length = 0
+
+    # ==================== Заповнення ====================
+
+    def append(self, values: Dict, row_number: int):
+        """
+        Додати рядок
+
+        Args:
+            values: Значення колонок (ключі як у COLUMNS, без row_number)
+            row_number: Номер рядка в Excel
+        """
+        index = self._length
+
+        for column in self.TEXT_COLUMNS:
+            value = values.get(column)
+            if value is not None:
+                value = self._strings.setdefault(value, value)
+            self._text[column].append(value)
+
+            if value and column in self._indexes:
+                positions = self._indexes[column].get(value)
+                if positions is None:
+                    positions = self._indexes[column][value] = array("i")
+                positions.append(index)
+
+        for column in self.DATE_COLUMNS:
+            ordinal, kind = self._encode_date(values.get(column))
+            self._ordinals[column].append(ordinal)
+            self._date_kinds[column].append(kind)
+            if kind == _DATE_RAW:
+                self._raw_dates[(column, index)] = values.get(column)
+
+        self._row_numbers.append(row_number)
+        self._length += 1
+
+    @staticmethod
+    def _encode_date(value):
+        """Повертає (порядковий номер, тип) для значення колонки дати"""
+        if value is None:
+            return 0, _DATE_NONE
+
+        if isinstance(value, datetime):
+            if value.tzinfo is None and value.time() == _MIDNIGHT:
+                return value.toordinal(), _DATE_DATETIME
+            return 0, _DATE_RAW
+
+        if isinstance(value, str) and len(value) == 10:
+            parsed = parse_date(value)
+            # Тільки якщо рядок однозначно відновлюється з дати
+            if parsed and parsed.strftime("%d.%m.%Y") == value:
+                return parsed.toordinal(), _DATE_TEXT
+
+        return 0, _DATE_RAW
+
+    # ==================== Доступ ====================
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [DataRow(self, i) for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("DataSheetTable index out of range")
+        return DataRow(self, index)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield DataRow(self, index)
+
+    def value(self, column: str, index: int):
+        """Значення колонки для рядка (як у словнику з get_sheet_data)"""
+        if column in self._text:
+            return self._text[column][index]
+
+        if column in self._ordinals:
+            kind = self._date_kinds[column][index]
+            if kind == _DATE_NONE:
+                return None
+            if kind == _DATE_DATETIME:
+                return datetime.fromordinal(self._ordinals[column][index])
+            if kind == _DATE_TEXT:
+                return date.fromordinal(self._ordinals[column][index]).strftime("%d.%m.%Y")
+            return self._raw_dates[(column, index)]
+
+        if column == "row_number":
+            return self._row_numbers[index]
+
+        raise KeyError(column)
+
+    def ordinals(self, column: str) -> array:
+        """
+        Порядкові номери днів колонки дати (0 - порожньо або не дата)
+
+        Args:
+            column: Одна з DATE_COLUMNS
+        """
+        return self._ordinals[column]
+
+    def row_dict(self, index: int) -> Dict:
+        """Рядок як звичайний словник"""
+        return {column: self.value(column, index) for column in self.COLUMNS}
+
+    # ==================== Фільтри ====================
+
+    def indices(self, name: Optional[str] = None, unit: Optional[str] = None,
+                month: Optional[str] = None) -> List[int]:
+        """
+        Індекси рядків, що відповідають усім заданим умовам (у порядку аркуша)
+
+        Args:
+            name: ПІБ
+            unit: Підрозділ
+            month: Місяць
+
+        Returns:
+            Список індексів рядків
+        """
+        candidates = []
+        for column, value in (("name", name), ("unit", unit), ("month", month)):
+            if value is not None:
+                candidates.append(self._indexes[column].get(value, array("i")))
+
+        if not candidates:
+            return list(range(self._length))
+
+        candidates.sort(key=len)
+        result = candidates[0]
+        if len(candidates) == 1:
+            return result.tolist()
+
+        others = [set(positions) for positions in candidates[1:]]
+        return [index for index in result if all(index in other for other in others)]
+
+    def filter(self, name: Optional[str] = None, unit: Optional[str] = None,
+               month: Optional[str] = None) -> List["DataRow"]:
+        """
+        Рядки, що відповідають усім заданим умовам (у порядку аркуша)
+
+        Returns:
+            Список DataRow
+        """
+        return [DataRow(self, index) for index in self.indices(name, unit, month)]
+
+    def unique(self, column: str) -> List[str]:
+        """
+        Відсортовані унікальні непорожні значення індексованої колонки
+
+        Args:
+            column: "name", "unit" або "month"
+        """
+        return sorted(self._indexes[column])
+
+    def unique_in_order(self, column: str, indices: List[int]) -> List[str]:
+        """Унікальні непорожні значення колонки для рядків (в порядку першої появи)"""
+        values = self._text[column]
+        return list(dict.fromkeys(values[index] for index in indices if values[index]))
+
+
+class DataRow(Mapping):
+    """
+    Подання одного рядка DataSheetTable, сумісне з dict-споживачами
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: DataSheetTable, index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._table.value(key, self._index)
+
+    def __iter__(self):
+        return iter(DataSheetTable.COLUMNS)
+
+    def __len__(self) -> int:
+        return len(DataSheetTable.COLUMNS)
+
+    def __repr__(self) -> str:
+        return f"DataRow({self._table.row_dict(self._index)!r})"
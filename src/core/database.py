@@ -2,12 +2,18 @@
 Управління SQLite базою даних для військових рапортів
 """
 import sqlite3
+import hashlib
+import json
+import os
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, date
 from contextlib import contextmanager
-from utils.date_utils import parse_period_string, format_period
+from itertools import groupby
+from utils.date_utils import parse_date, parse_period_string, format_period
+from utils.name_utils import normalize_name
 from core.data_processor import DataProcessor
-from core.dodatky_reader import get_dodatky_reader
+from core.period_engine import merge_periods_bulk, merge_ordinal_periods_bulk
+from core.dodatky_reader import DodatkyReader, DatabaseDodatkyReader, get_dodatky_reader, get_dodatky_path
 
 
 class DatabaseManager:
@@ -16,21 +22,62 @@ class DatabaseManager:
     Забезпечує CRUD операції та інтеграцію з Excel через синхронізацію
     """
 
-    def __init__(self, db_path: str):
+    DODATKY_ENTITY = "dodatky"  # entity_type в sync_metadata для Dodatky.xlsx
+
+    # Текстові колонки дат service_records та їх нормалізовані копії
+    # (порядковий номер дня date.toordinal(), NULL якщо дата не розпізнана)
+    RECORD_DATE_COLUMNS = ("start_100", "end_100", "start_30", "end_30", "start_non", "end_non")
+    RECORD_ORDINAL_COLUMNS = tuple(f"{column}_ord" for column in RECORD_DATE_COLUMNS)
+
+    # Колонки service_records, що оновлюються при повторному імпорті того ж запису
+    # (дати входять у природний ключ record_key, тут - тільки їх текстове подання)
+    RECORD_VALUE_COLUMNS = ("unit", "rank", "position", "rnokpp", "birth_date",
+                            *RECORD_DATE_COLUMNS, "status")
+
+    # Профіль підключення за замовчуванням (перевизначається в settings.json: database.connection_profile)
+    DEFAULT_CONNECTION_PROFILE = {
+        "journal_mode": "WAL",        # Читачі (потік рапортів) не блокують запис
+        "synchronous": "NORMAL",      # У WAL - fsync тільки на checkpoint, а не на кожен commit
+        "mmap_size": 268435456,       # 256 МБ memory-mapped I/O
+        "cache_size": -65536,         # 64 МБ кешу сторінок (від'ємне значення - в КБ)
+        "temp_store": "MEMORY",       # Тимчасові таблиці / сортування в пам'яті
+        "foreign_keys": True,         # Щоб ON DELETE CASCADE дійсно працював
+        "busy_timeout": 5000,         # Очікування блокування іншим підключенням (мс)
+    }
+
+    _JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+    _SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+    _TEMP_STORE_MODES = ("DEFAULT", "FILE", "MEMORY")
+
+    def __init__(self, db_path: str, connection_profile: Optional[Dict] = None):
         """
         Ініціалізація менеджера БД
 
         Args:
             db_path: Шлях до файлу SQLite БД
+            connection_profile: PRAGMA-налаштування підключення
+                                (доповнюють DEFAULT_CONNECTION_PROFILE)
         """
         self.db_path = db_path
         self.connection = None
+        self._dodatky_reader = None  # DatabaseDodatkyReader для цього підключення
+        self._tx_depth = 0  # Глибина вкладеності transaction() (0 - поза транзакцією)
+
+        self.connection_profile = dict(self.DEFAULT_CONNECTION_PROFILE)
+        if connection_profile:
+            self.connection_profile.update(connection_profile)
 
     def connect(self):
         """Підключення до БД та створення таблиць якщо не існують"""
         self.connection = sqlite3.connect(self.db_path)
         self.connection.row_factory = sqlite3.Row  # Доступ через імена колонок
+        self._apply_connection_profile()
+        self._migrate_dodatky_tables()
         self._create_tables()
+        self._migrate_name_keys()
+        self._migrate_periods_unique()
+        self._migrate_record_ordinals()
+        self._migrate_record_keys()
         self._create_triggers()
 
     def close(self):
@@ -38,16 +85,93 @@ class DatabaseManager:
         if self.connection:
             self.connection.close()
             self.connection = None
+        self._dodatky_reader = None
+
+    def _apply_connection_profile(self):
+        """
+        Застосовує PRAGMA з connection_profile до відкритого підключення
+
+        Невідомі / некоректні значення пропускаються з попередженням.
+        """
+        profile = self.connection_profile
+        cursor = self.connection.cursor()
+
+        journal_mode = str(profile.get("journal_mode") or "").upper()
+        if journal_mode:
+            if journal_mode in self._JOURNAL_MODES:
+                actual = cursor.execute(f"PRAGMA journal_mode = {journal_mode}").fetchone()[0]
+                # Для :memory: та файлових систем без shared memory WAL недоступний
+                if actual.upper() != journal_mode and self.db_path != ":memory:":
+                    print(f"[WARNING] journal_mode={journal_mode} недоступний, використовується {actual}")
+            else:
+                print(f"[WARNING] Невідомий journal_mode: {journal_mode}")
+
+        for key, allowed in (("synchronous", self._SYNCHRONOUS_MODES), ("temp_store", self._TEMP_STORE_MODES)):
+            value = str(profile.get(key) or "").upper()
+            if not value:
+                continue
+            if value in allowed:
+                cursor.execute(f"PRAGMA {key} = {value}")
+            else:
+                print(f"[WARNING] Невідоме значення {key}: {value}")
+
+        for key in ("mmap_size", "cache_size", "busy_timeout"):
+            value = profile.get(key)
+            if value is None:
+                continue
+            try:
+                cursor.execute(f"PRAGMA {key} = {int(value)}")
+            except (TypeError, ValueError):
+                print(f"[WARNING] Некоректне значення {key}: {value}")
+
+        if "foreign_keys" in profile:
+            cursor.execute(f"PRAGMA foreign_keys = {'ON' if profile['foreign_keys'] else 'OFF'}")
 
     @contextmanager
     def transaction(self):
-        """Context manager для транзакцій"""
+        """
+        Context manager для транзакцій (unit of work)
+
+        Всередині transaction() CRUD-методи не виконують commit - усі зміни
+        фіксуються одним commit при виході із зовнішнього блоку.
+        Вкладені transaction() працюють через SAVEPOINT: помилка у вкладеному
+        блоці відкочує тільки його зміни.
+        """
+        if self._tx_depth:
+            savepoint = f"sp_{self._tx_depth}"
+            self.connection.execute(f"SAVEPOINT {savepoint}")
+            self._tx_depth += 1
+            try:
+                yield self.connection
+            except Exception:
+                self.connection.execute(f"ROLLBACK TO {savepoint}")
+                self.connection.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                self.connection.execute(f"RELEASE {savepoint}")
+            finally:
+                self._tx_depth -= 1
+            return
+
+        # Явний BEGIN: інакше SAVEPOINT без відкритої транзакції
+        # зафіксує зміни вже при RELEASE
+        if not self.connection.in_transaction:
+            self.connection.execute("BEGIN")
+
+        self._tx_depth = 1
         try:
             yield self.connection
             self.connection.commit()
-        except Exception as e:
+        except Exception:
             self.connection.rollback()
             raise
+        finally:
+            self._tx_depth = 0
+
+    def _commit(self):
+        """Commit, якщо не всередині transaction() (інакше commit виконає зовнішній блок)"""
+        if not self._tx_depth:
+            self.connection.commit()
 
     def _create_tables(self):
         """Створення всіх таблиць БД"""
@@ -58,6 +182,7 @@ class DatabaseManager:
             CREATE TABLE IF NOT EXISTS servicemembers (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL UNIQUE,
+                name_key TEXT,
                 rank TEXT,
                 position TEXT,
                 rnokpp TEXT,
@@ -97,6 +222,13 @@ class DatabaseManager:
                 end_non TEXT,
                 status TEXT,
                 excel_row_number INTEGER,
+                start_100_ord INTEGER,
+                end_100_ord INTEGER,
+                start_30_ord INTEGER,
+                end_30_ord INTEGER,
+                start_non_ord INTEGER,
+                end_non_ord INTEGER,
+                record_key TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (servicemember_id) REFERENCES servicemembers(id) ON DELETE CASCADE
@@ -128,10 +260,7 @@ class DatabaseManager:
             )
         """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_periods_member_type
-            ON periods(servicemember_id, period_type)
-        """)
+        # Унікальний індекс periods(servicemember_id, period_type) - див. _migrate_periods_unique
 
         # Таблиця parsed_periods
         cursor.execute("""
@@ -182,6 +311,35 @@ class DatabaseManager:
             )
         """)
 
+        # Таблиця dirty_servicemembers - особи, чиї service_records змінились
+        # після останнього перерахунку періодів (заповнюється тригерами)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dirty_servicemembers (
+                servicemember_id INTEGER PRIMARY KEY,
+                marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Таблиця report_cache - зібрані дані get_complete_data для рапортів
+        # (payload - JSON; stale = 1 ставлять тригери при зміні вхідних даних)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS report_cache (
+                servicemember_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                dodatky_version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                stale INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (servicemember_id) REFERENCES servicemembers(id) ON DELETE CASCADE
+            )
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_report_cache_name
+            ON report_cache(name)
+        """)
+
         # Таблиця ЖБД (журнали бойових дій)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS zbd (
@@ -203,7 +361,7 @@ class DatabaseManager:
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS hromady (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL,
                 start_date TEXT NOT NULL,
                 end_date TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -220,7 +378,7 @@ class DatabaseManager:
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS naseleni_punkty (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL,
                 start_date TEXT NOT NULL,
                 end_date TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -233,25 +391,271 @@ class DatabaseManager:
             ON naseleni_punkty(start_date, end_date)
         """)
 
-        # View для швидкого доступу
+        # View: рівно один рядок на особу з полями останнього service_record
+        # (звання/посада - з останнього запису, РНОКПП/дата народження - перше непорожнє
+        # з servicemembers, останнього запису, найсвіжішого запису з цим полем)
+        cursor.execute("""
+            SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'v_servicemember_complete'
+        """)
+        row = cursor.fetchone()
+        if row and "ROW_NUMBER" not in row[0].upper():
+            # Стара версія view (LEFT JOIN periods без агрегації - дублікати рядків)
+            cursor.execute("DROP VIEW v_servicemember_complete")
+
         cursor.execute("""
             CREATE VIEW IF NOT EXISTS v_servicemember_complete AS
             SELECT
                 sm.id,
                 sm.name,
-                sm.rank,
-                sm.position,
-                sm.rnokpp,
+                COALESCE(NULLIF(lr.rank, ''), sm.rank) AS rank,
+                COALESCE(NULLIF(lr.position, ''), sm.position) AS position,
+                COALESCE(NULLIF(sm.rnokpp, ''), NULLIF(lr.rnokpp, ''), rk.rnokpp, sm.rnokpp) AS rnokpp,
                 sm.unit,
-                sm.birth_date,
-                p100.period_text as periods_100,
-                p30.period_text as periods_30
+                COALESCE(NULLIF(sm.birth_date, ''), NULLIF(lr.birth_date, ''), bd.birth_date, sm.birth_date) AS birth_date,
+                lr.month AS last_month,
+                p100.period_text AS periods_100,
+                p30.period_text AS periods_30
             FROM servicemembers sm
+            LEFT JOIN (
+                SELECT servicemember_id, month, rank, position, rnokpp, birth_date,
+                       ROW_NUMBER() OVER (PARTITION BY servicemember_id ORDER BY month DESC, id DESC) AS rn
+                FROM service_records
+            ) lr ON lr.servicemember_id = sm.id AND lr.rn = 1
+            LEFT JOIN (
+                SELECT servicemember_id, rnokpp,
+                       ROW_NUMBER() OVER (PARTITION BY servicemember_id ORDER BY id DESC) AS rn
+                FROM service_records
+                WHERE rnokpp IS NOT NULL AND rnokpp != ''
+            ) rk ON rk.servicemember_id = sm.id AND rk.rn = 1
+            LEFT JOIN (
+                SELECT servicemember_id, birth_date,
+                       ROW_NUMBER() OVER (PARTITION BY servicemember_id ORDER BY id DESC) AS rn
+                FROM service_records
+                WHERE birth_date IS NOT NULL AND birth_date != ''
+            ) bd ON bd.servicemember_id = sm.id AND bd.rn = 1
             LEFT JOIN periods p100 ON sm.id = p100.servicemember_id AND p100.period_type = '100'
             LEFT JOIN periods p30 ON sm.id = p30.servicemember_id AND p30.period_type = '30'
         """)
 
-        self.connection.commit()
+        self._commit()
+
+    def _migrate_name_keys(self):
+        """
+        Колонка servicemembers.name_key (normalize_name(name)) та індекс по ній
+
+        Пошук по ПІБ без урахування регістру / написання апострофа / зайвих пробілів
+        (get_servicemember_by_name, імпорт місяця, паспортні дані). Для старих БД
+        колонка додається та заповнюється один раз.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("PRAGMA table_info(servicemembers)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        if "name_key" not in existing_columns:
+            cursor.execute("ALTER TABLE servicemembers ADD COLUMN name_key TEXT")
+
+            cursor.execute("SELECT id, name FROM servicemembers")
+            rows = [(normalize_name(name), sm_id) for sm_id, name in cursor.fetchall()]
+            cursor.executemany("UPDATE servicemembers SET name_key = ? WHERE id = ?", rows)
+
+            if rows:
+                print(f"[OK] Заповнено ключі ПІБ: {len(rows)} військовослужбовців")
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_servicemembers_name_key
+            ON servicemembers(name_key)
+        """)
+        self._commit()
+
+    def _migrate_periods_unique(self):
+        """
+        Унікальність periods(servicemember_id, period_type) (старі БД)
+
+        Раніше індекс був неунікальним, тому INSERT OR REPLACE нічого не замінював
+        і дублікати множили рядки у v_servicemember_complete. Дублікати видаляються
+        (залишається перший рядок - саме його читає get_complete_data).
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_periods_member_type_unique'
+        """)
+        if cursor.fetchone():
+            return
+
+        cursor.execute("""
+            DELETE FROM periods
+            WHERE id NOT IN (
+                SELECT MIN(id) FROM periods GROUP BY servicemember_id, period_type
+            )
+        """)
+        removed = cursor.rowcount
+
+        cursor.execute("DROP INDEX IF EXISTS idx_periods_member_type")
+        cursor.execute("""
+            CREATE UNIQUE INDEX idx_periods_member_type_unique
+            ON periods(servicemember_id, period_type)
+        """)
+        self._commit()
+
+        if removed > 0:
+            print(f"[OK] Видалено дублікатів periods: {removed}")
+
+    def _migrate_dodatky_tables(self):
+        """
+        Прибирає UNIQUE з name у hromady / naseleni_punkty (старі БД)
+
+        У Dodatky.xlsx одна громада / НП може мати кілька діапазонів дат.
+        Таблиці містять тільки дані з Dodatky.xlsx, тому перестворюються
+        і заповнюються заново при наступному sync_dodatky.
+        """
+        cursor = self.connection.cursor()
+        recreated = False
+
+        for table in ("hromady", "naseleni_punkty"):
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            row = cursor.fetchone()
+            if row and "UNIQUE" in row[0].upper():
+                cursor.execute(f"DROP TABLE {table}")
+                recreated = True
+
+        if recreated:
+            cursor.execute("""
+                SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sync_metadata'
+            """)
+            if cursor.fetchone():
+                cursor.execute("DELETE FROM sync_metadata WHERE entity_type = ?", (self.DODATKY_ENTITY,))
+
+        self._commit()
+
+    def _migrate_record_ordinals(self):
+        """
+        Додає колонки *_ord у service_records (старі БД) та одноразово заповнює їх
+
+        Текстові дати service_records бувають у форматах DD.MM.YYYY, YYYY-MM-DD
+        та YYYY-MM-DD HH:MM:SS. Колонки *_ord зберігають їх як порядковий номер дня,
+        щоб перерахунок періодів та SQL-запити по діапазонах не парсили текст.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("PRAGMA table_info(service_records)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        missing = [column for column in self.RECORD_ORDINAL_COLUMNS if column not in existing_columns]
+        if not missing:
+            return
+
+        for column in missing:
+            cursor.execute(f"ALTER TABLE service_records ADD COLUMN {column} INTEGER")
+
+        # Одноразове заповнення з текстових колонок
+        date_columns = ", ".join(self.RECORD_DATE_COLUMNS)
+        assignments = ", ".join(f"{column} = ?" for column in self.RECORD_ORDINAL_COLUMNS)
+
+        read_cursor = self.connection.cursor()
+        read_cursor.execute(f"SELECT id, {date_columns} FROM service_records")
+
+        updated = 0
+        while True:
+            rows = read_cursor.fetchmany(5000)
+            if not rows:
+                break
+            cursor.executemany(
+                f"UPDATE service_records SET {assignments} WHERE id = ?",
+                [(*self.date_ordinals(*row[1:]), row[0]) for row in rows]
+            )
+            updated += len(rows)
+
+        self._commit()
+
+        if updated:
+            print(f"[OK] Нормалізовано дати service_records: {updated} записів")
+
+    def _migrate_record_keys(self):
+        """
+        Природний ключ service_records: record_key + частковий унікальний індекс
+
+        Унікальність (servicemember_id, month, record_key) робить імпорт місяця
+        ідемпотентним (INSERT ... ON CONFLICT DO UPDATE). Для старих БД колонка
+        додається та заповнюється один раз; у групах вже існуючих дублікатів ключ
+        отримує тільки перший запис, решта лишаються з NULL (індекс їх не враховує).
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("PRAGMA table_info(service_records)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        if "record_key" not in existing_columns:
+            cursor.execute("ALTER TABLE service_records ADD COLUMN record_key TEXT")
+
+            # Одноразове заповнення
+            date_columns = ", ".join(self.RECORD_DATE_COLUMNS + self.RECORD_ORDINAL_COLUMNS)
+            read_cursor = self.connection.cursor()
+            read_cursor.execute(f"""
+                SELECT id, servicemember_id, month, {date_columns}
+                FROM service_records
+                ORDER BY id
+            """)
+
+            seen = set()
+            updated = 0
+            while True:
+                rows = read_cursor.fetchmany(5000)
+                if not rows:
+                    break
+
+                batch = []
+                for row in rows:
+                    key = self.record_key(row[3:9], row[9:15])
+                    if (row[1], row[2], key) in seen:
+                        continue
+                    seen.add((row[1], row[2], key))
+                    batch.append((key, row[0]))
+
+                cursor.executemany("UPDATE service_records SET record_key = ? WHERE id = ?", batch)
+                updated += len(batch)
+
+            if updated:
+                print(f"[OK] Заповнено ключі service_records: {updated} записів")
+
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_service_records_key
+            ON service_records(servicemember_id, month, record_key)
+            WHERE record_key IS NOT NULL
+        """)
+        self._commit()
+
+    @staticmethod
+    def record_key(dates, ordinals) -> str:
+        """
+        Природний ключ запису (разом з servicemember_id та month): тип періоду, початок, кінець
+
+        Args:
+            dates: Текстові дати RECORD_DATE_COLUMNS
+            ordinals: Відповідні порядкові номери (RECORD_ORDINAL_COLUMNS)
+
+        Returns:
+            Рядок "початок-100|кінець-100|...|кінець-non": порядковий номер дня,
+            якщо дата розпізнана, інакше текст як є
+        """
+        return "|".join(
+            str(ordinal) if ordinal is not None else str(value or "").strip()
+            for value, ordinal in zip(dates, ordinals)
+        )
+
+    @staticmethod
+    def date_ordinals(*values) -> Tuple[Optional[int], ...]:
+        """
+        Порядкові номери днів для значень дат (для колонок *_ord)
+
+        Args:
+            values: Дати (рядки у будь-якому підтримуваному форматі, date, None)
+
+        Returns:
+            Кортеж date.toordinal() (None для порожніх / нерозпізнаних значень)
+        """
+        ordinals = []
+        for value in values:
+            parsed = parse_date(value) if value else None
+            ordinals.append(parsed.toordinal() if parsed else None)
+        return tuple(ordinals)
 
     def _create_triggers(self):
         """Створення тригерів для автоматичного оновлення"""
@@ -277,7 +681,69 @@ class DatabaseManager:
             END
         """)
 
-        self.connection.commit()
+        # Відстеження змін для recalculate_dirty()
+        # ON CONFLICT DO NOTHING, а не INSERT OR IGNORE: у тригері, викликаному з UPSERT,
+        # OR IGNORE перевизначається зовнішньою інструкцією. Старі версії перестворюються.
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'trigger' AND name LIKE 'mark_dirty_on_service_%' AND sql LIKE '%OR IGNORE%'
+        """)
+        for (trigger_name,) in cursor.fetchall():
+            cursor.execute(f"DROP TRIGGER {trigger_name}")
+
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS mark_dirty_on_service_insert
+            AFTER INSERT ON service_records
+            BEGIN
+                INSERT INTO dirty_servicemembers (servicemember_id)
+                VALUES (NEW.servicemember_id) ON CONFLICT DO NOTHING;
+            END
+        """)
+
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS mark_dirty_on_service_update
+            AFTER UPDATE ON service_records
+            BEGIN
+                INSERT INTO dirty_servicemembers (servicemember_id)
+                VALUES (NEW.servicemember_id) ON CONFLICT DO NOTHING;
+                INSERT INTO dirty_servicemembers (servicemember_id)
+                VALUES (OLD.servicemember_id) ON CONFLICT DO NOTHING;
+            END
+        """)
+
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS mark_dirty_on_service_delete
+            AFTER DELETE ON service_records
+            BEGIN
+                INSERT INTO dirty_servicemembers (servicemember_id)
+                VALUES (OLD.servicemember_id) ON CONFLICT DO NOTHING;
+            END
+        """)
+
+        # Інвалідація report_cache при зміні вхідних даних рапорту
+        for table in ("service_records", "periods", "parsed_periods"):
+            for event, refs in (("INSERT", ("NEW",)), ("UPDATE", ("NEW", "OLD")), ("DELETE", ("OLD",))):
+                statements = "".join(
+                    f"UPDATE report_cache SET stale = 1 WHERE servicemember_id = {ref}.servicemember_id;\n"
+                    for ref in refs
+                )
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS invalidate_report_cache_on_{table}_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        {statements}
+                    END
+                """)
+
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS invalidate_report_cache_on_servicemembers_update
+            AFTER UPDATE ON servicemembers
+            BEGIN
+                UPDATE report_cache SET stale = 1 WHERE servicemember_id = NEW.id;
+            END
+        """)
+
+        self._commit()
 
     # ==================== CRUD для servicemembers ====================
 
@@ -301,10 +767,11 @@ class DatabaseManager:
             return existing["id"]
 
         cursor.execute("""
-            INSERT INTO servicemembers (name, rank, position, rnokpp, unit, birth_date)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO servicemembers (name, name_key, rank, position, rnokpp, unit, birth_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (
             data.get("name"),
+            normalize_name(data.get("name")),
             data.get("rank"),
             data.get("position"),
             data.get("rnokpp"),
@@ -312,19 +779,72 @@ class DatabaseManager:
             data.get("birth_date")
         ))
 
-        self.connection.commit()
+        self._commit()
         return cursor.lastrowid
 
     def get_servicemember_by_name(self, name: str) -> Optional[Dict]:
-        """Знайти військовослужбовця по ПІБ"""
+        """
+        Знайти військовослужбовця по ПІБ
+
+        Спочатку точне співпадіння, потім по ключу normalize_name
+        (регістр, апостроф, пробіли) - обидва через індекс
+        """
         cursor = self.connection.cursor()
         cursor.execute("""
             SELECT * FROM servicemembers WHERE name = ?
         """, (name,))
 
         row = cursor.fetchone()
+        if row is None:
+            cursor.execute("""
+                SELECT * FROM servicemembers WHERE name_key = ? ORDER BY id LIMIT 1
+            """, (normalize_name(name),))
+            row = cursor.fetchone()
+
         return dict(row) if row else None
 
+    def match_names(self, names: List[str]) -> Dict[str, str]:
+        """
+        ПІБ в БД для імен, що відрізняються лише регістром / апострофом / пробілами
+
+        Args:
+            names: Список ПІБ
+
+        Returns:
+            Словник {ПІБ із names: ПІБ в БД} (тільки для неточних співпадінь;
+            при кількох кандидатах - перший за id)
+        """
+        CHUNK_SIZE = 500  # Ліміт параметрів SQLite
+
+        names_by_key = {}
+        for name in names:
+            if name:
+                names_by_key.setdefault(normalize_name(name), []).append(name)
+
+        keys = list(names_by_key)
+        result = {}
+        cursor = self.connection.cursor()
+
+        for offset in range(0, len(keys), CHUNK_SIZE):
+            chunk = keys[offset:offset + CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+
+            cursor.execute(f"""
+                SELECT name_key, name FROM servicemembers
+                WHERE name_key IN ({placeholders})
+                ORDER BY id DESC
+            """, chunk)
+
+            # ORDER BY id DESC - перший за id записується останнім
+            matched = {name_key: db_name for name_key, db_name in cursor.fetchall()}
+
+            for name_key, db_name in matched.items():
+                for name in names_by_key[name_key]:
+                    if name != db_name:
+                        result[name] = db_name
+
+        return result
+
     def get_servicemember_by_id(self, id: int) -> Optional[Dict]:
         """Знайти військовослужбовця по ID"""
         cursor = self.connection.cursor()
@@ -350,7 +870,7 @@ class DatabaseManager:
             data.get("birth_date"),
             id
         ))
-        self.connection.commit()
+        self._commit()
 
     def get_all_servicemembers(self) -> List[Dict]:
         """Отримати всіх військовослужбовців"""
@@ -358,6 +878,19 @@ class DatabaseManager:
         cursor.execute("SELECT * FROM servicemembers ORDER BY name")
         return [dict(row) for row in cursor.fetchall()]
 
+    def get_servicemembers_overview(self) -> List[Dict]:
+        """
+        Один рядок на особу з полями останнього service_record та текстами періодів
+        (v_servicemember_complete) - для списків вибору та пакетної генерації за один прохід
+
+        Returns:
+            Список словників {id, name, rank, position, rnokpp, unit, birth_date,
+            last_month, periods_100, periods_30}, відсортований по ПІБ
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT * FROM v_servicemember_complete ORDER BY name")
+        return [dict(row) for row in cursor.fetchall()]
+
     def get_unique_names(self) -> List[str]:
         """Отримати список унікальних ПІБ (аналог excel_reader.get_unique_names)"""
         cursor = self.connection.cursor()
@@ -372,9 +905,27 @@ class DatabaseManager:
 
     # ==================== CRUD для service_records ====================
 
+    # UPSERT за природним ключем: існуючий запис оновлюється тільки якщо значення змінились
+    # (інакше тригери позначили б особу для перерахунку без потреби)
+    _UPSERT_SERVICE_RECORD_SQL = f"""
+        INSERT INTO service_records (
+            servicemember_id, month, unit, rank, position, rnokpp, birth_date,
+            start_100, end_100, start_30, end_30, start_non, end_non, status, excel_row_number,
+            start_100_ord, end_100_ord, start_30_ord, end_30_ord, start_non_ord, end_non_ord,
+            record_key
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (servicemember_id, month, record_key) WHERE record_key IS NOT NULL
+        DO UPDATE SET
+            {", ".join(f"{column} = excluded.{column}" for column in RECORD_VALUE_COLUMNS)},
+            updated_at = CURRENT_TIMESTAMP
+        WHERE ({", ".join(f"service_records.{column}" for column in RECORD_VALUE_COLUMNS)})
+            IS NOT ({", ".join(f"excluded.{column}" for column in RECORD_VALUE_COLUMNS)})
+    """
+
     def add_service_record(self, servicemember_id: int, data: Dict) -> int:
         """
-        Додати запис з аркуша Data
+        Додати запис з аркуша Data (повторне додавання того ж періоду оновлює існуючий запис)
 
         Args:
             servicemember_id: ID військовослужбовця
@@ -383,14 +934,12 @@ class DatabaseManager:
         Returns:
             ID створеного запису
         """
+        dates = tuple(data.get(column) for column in self.RECORD_DATE_COLUMNS)
+        ordinals = self.date_ordinals(*dates)
+        record_key = self.record_key(dates, ordinals)
+
         cursor = self.connection.cursor()
-        cursor.execute("""
-            INSERT INTO service_records (
-                servicemember_id, month, unit, rank, position, rnokpp, birth_date,
-                start_100, end_100, start_30, end_30, start_non, end_non, status, excel_row_number
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(self._UPSERT_SERVICE_RECORD_SQL, (
             servicemember_id,
             data.get("month"),
             data.get("unit"),
@@ -405,11 +954,20 @@ class DatabaseManager:
             data.get("start_non"),
             data.get("end_non"),
             data.get("status"),
-            data.get("row_number")
+            data.get("row_number"),
+            *ordinals,
+            record_key
         ))
 
-        self.connection.commit()
-        return cursor.lastrowid
+        # При конфлікті (такий запис вже є) lastrowid не змінюється - шукаємо за ключем
+        cursor.execute("""
+            SELECT id FROM service_records
+            WHERE servicemember_id = ? AND month IS ? AND record_key = ?
+        """, (servicemember_id, data.get("month"), record_key))
+        record_id = cursor.fetchone()[0]
+
+        self._commit()
+        return record_id
 
     def get_service_records(self, servicemember_id: int) -> List[Dict]:
         """Отримати всі записи для військовослужбовця"""
@@ -427,7 +985,7 @@ class DatabaseManager:
 
         Логіка:
         1. Отримати всі service_records
-        2. Зібрати та розпарсити періоди 100% та 30%
+        2. Зібрати періоди 100% та 30% (з нормалізованих колонок *_ord)
         3. Злити послідовні періоди
         4. Зберегти в таблиці periods та parsed_periods
         """
@@ -438,50 +996,20 @@ class DatabaseManager:
         periods_100 = []
         periods_30 = []
 
-        def parse_date(date_str):
-            """Парсить дату з різних форматів"""
-            if not date_str:
-                return None
-
-            date_str = str(date_str).strip()
-
-            # Спробувати різні формати
-            formats = [
-                "%d.%m.%Y",                    # 01.08.2025
-                "%Y-%m-%d",                    # 2025-08-01
-                "%Y-%m-%d %H:%M:%S",           # 2025-08-01 00:00:00
-                "%Y-%m-%dT%H:%M:%S",           # 2025-08-01T00:00:00
-                "%Y-%m-%d %H:%M:%S.%f",        # 2025-08-01 00:00:00.000000
-            ]
-
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt).date()
-                except ValueError:
-                    continue
-
-            # Якщо нічого не спрацювало - спробувати fromisoformat
-            try:
-                return datetime.fromisoformat(date_str.replace(" ", "T")).date()
-            except:
-                return None
-
         for record in records:
             # Періоди 100%
-            if record["start_100"] and record["end_100"]:
-                start = parse_date(record["start_100"])
-                end = parse_date(record["end_100"])
-
-                if start and end:
-                    periods_100.append((start, end))
+            if record["start_100_ord"] is not None and record["end_100_ord"] is not None:
+                periods_100.append((
+                    date.fromordinal(record["start_100_ord"]),
+                    date.fromordinal(record["end_100_ord"])
+                ))
 
             # Періоди 30%
-            if record["start_30"] and record["end_30"]:
-                start = parse_date(record["start_30"])
-                end = parse_date(record["end_30"])
-
-                if start and end:
-                    periods_30.append((start, end))
+            if record["start_30_ord"] is not None and record["end_30_ord"] is not None:
+                periods_30.append((
+                    date.fromordinal(record["start_30_ord"]),
+                    date.fromordinal(record["end_30_ord"])
+                ))
 
         # Злиття послідовних періодів
         merged_100 = DataProcessor.merge_consecutive_periods(periods_100)
@@ -496,6 +1024,7 @@ class DatabaseManager:
         # Видалити старі періоди
         cursor.execute("DELETE FROM periods WHERE servicemember_id = ?", (servicemember_id,))
         cursor.execute("DELETE FROM parsed_periods WHERE servicemember_id = ?", (servicemember_id,))
+        cursor.execute("DELETE FROM dirty_servicemembers WHERE servicemember_id = ?", (servicemember_id,))
 
         # Зберегти нові періоди
         if formatted_100:
@@ -523,7 +1052,7 @@ class DatabaseManager:
                 VALUES (?, '30', ?, ?)
             """, (servicemember_id, start.isoformat(), end.isoformat()))
 
-        self.connection.commit()
+        self._commit()
 
     def get_periods(self, servicemember_id: int, period_type: str) -> str:
         """Отримати текст періодів для військовослужбовця"""
@@ -554,135 +1083,379 @@ class DatabaseManager:
                 "periods_list": [...]    # Список кортежів
             }
         """
-        # Отримати основну інформацію
-        servicemember = self.get_servicemember_by_name(name)
-        if not servicemember:
-            return None
+        return self.get_complete_data_batch([name]).get(name)
+
+    def get_complete_data_batch(self, names: List[str], use_cache: bool = True) -> Dict[str, Dict]:
+        """
+        Отримати повні дані для списку військовослужбовців (пакетний get_complete_data)
+
+        Спочатку дані читаються з report_cache (один індексований SELECT на пакет);
+        відсутні / застарілі записи збираються заново і зберігаються в кеш.
+        Кеш використовується тільки коли Dodatky.xlsx синхронізовано в БД
+        (версія Dodatky - хеш файлу в sync_metadata).
+
+        Args:
+            names: Список ПІБ військовослужбовців
+            use_cache: Використовувати report_cache
+
+        Returns:
+            Словник {ПІБ: дані у форматі get_complete_data}.
+            ПІБ, яких немає в БД (в т.ч. по ключу normalize_name), відсутні у словнику.
+        """
+        unique_names = list(dict.fromkeys(name for name in names if name))
+        dodatky_version = self._get_dodatky_version() if use_cache else None
+
+        result = {}
+        if dodatky_version is not None:
+            result = self._read_report_cache(unique_names, dodatky_version)
+
+        missing = [name for name in unique_names if name not in result]
+        if missing:
+            result.update(self._build_complete_data_batch(missing, dodatky_version))
+
+        # ПІБ без точного співпадіння - по ключу normalize_name
+        missing = [name for name in unique_names if name not in result]
+        if missing:
+            aliases = self.match_names(missing)
+            if aliases:
+                matched = self.get_complete_data_batch(list(aliases.values()), use_cache)
+                for name, db_name in aliases.items():
+                    if db_name in matched:
+                        result[name] = matched[db_name]
+
+        return result
+
+    def _build_complete_data_batch(self, unique_names: List[str],
+                                   dodatky_version: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Збирає дані get_complete_data з таблиць БД
+
+        ОПТИМІЗОВАНО: замість ~6 запитів на особу - кілька set-based запитів на пакет
+        1. servicemembers по списку ПІБ
+        2. Останній service_record через ROW_NUMBER() OVER (...)
+        3. РНОКПП / дата народження з попередніх записів (якщо відсутні)
+        4. Тексти periods та згруповані parsed_periods
+
+        Args:
+            unique_names: Список унікальних ПІБ
+            dodatky_version: Версія Dodatky для report_cache (None - не записувати кеш)
+
+        Returns:
+            Словник {ПІБ: дані у форматі get_complete_data}
+        """
+        CHUNK_SIZE = 500  # Ліміт параметрів SQLite
+
+        result = {}
+        dodatky = None
 
-        # ВИПРАВЛЕННЯ: Отримати звання та посаду з ОСТАННЬОГО service_record
-        # Аналогічно до Excel Reader - беремо найсвіжіші дані
         cursor = self.connection.cursor()
-        cursor.execute("""
-            SELECT rank, position, rnokpp, unit, birth_date, month
-            FROM service_records
-            WHERE servicemember_id = ?
-            ORDER BY month DESC, id DESC
-            LIMIT 1
-        """, (servicemember["id"],))
-
-        latest_record = cursor.fetchone()
-        if latest_record:
-            # Оновлюємо дані з останнього запису
-            servicemember["rank"] = latest_record[0] or servicemember["rank"]
-            servicemember["position"] = latest_record[1] or servicemember["position"]
-            # Також шукаємо РНОКПП та дату народження якщо відсутні
-            if not servicemember.get("rnokpp") and latest_record[2]:
-                servicemember["rnokpp"] = latest_record[2]
-            if not servicemember.get("birth_date") and latest_record[4]:
-                servicemember["birth_date"] = latest_record[4]
-
-        # Якщо РНОКПП або дата народження все ще порожні - шукаємо у всіх записах
-        if not servicemember.get("rnokpp") or not servicemember.get("birth_date"):
-            cursor.execute("""
-                SELECT rnokpp, birth_date
-                FROM service_records
-                WHERE servicemember_id = ?
-                  AND (rnokpp IS NOT NULL OR birth_date IS NOT NULL)
-                ORDER BY id DESC
-            """, (servicemember["id"],))
 
-            for row in cursor.fetchall():
-                if not servicemember.get("rnokpp") and row[0]:
-                    servicemember["rnokpp"] = row[0]
-                if not servicemember.get("birth_date") and row[1]:
-                    servicemember["birth_date"] = row[1]
-                if servicemember.get("rnokpp") and servicemember.get("birth_date"):
-                    break
+        for offset in range(0, len(unique_names), CHUNK_SIZE):
+            chunk = unique_names[offset:offset + CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+
+            # Основна інформація
+            cursor.execute(f"""
+                SELECT * FROM servicemembers WHERE name IN ({placeholders})
+            """, chunk)
+            members = {row["id"]: dict(row) for row in cursor.fetchall()}
+
+            if not members:
+                continue
+
+            ids = list(members)
+            id_placeholders = ", ".join("?" * len(ids))
+
+            # ВИПРАВЛЕННЯ: Звання та посада з ОСТАННЬОГО service_record
+            # Аналогічно до Excel Reader - беремо найсвіжіші дані
+            cursor.execute(f"""
+                SELECT servicemember_id, rank, position, rnokpp, birth_date
+                FROM (
+                    SELECT servicemember_id, rank, position, rnokpp, birth_date,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY servicemember_id
+                               ORDER BY month DESC, id DESC
+                           ) AS rn
+                    FROM service_records
+                    WHERE servicemember_id IN ({id_placeholders})
+                )
+                WHERE rn = 1
+            """, ids)
+
+            for sm_id, rank, position, rnokpp, birth_date in cursor.fetchall():
+                servicemember = members[sm_id]
+                servicemember["rank"] = rank or servicemember["rank"]
+                servicemember["position"] = position or servicemember["position"]
+                # Також шукаємо РНОКПП та дату народження якщо відсутні
+                if not servicemember.get("rnokpp") and rnokpp:
+                    servicemember["rnokpp"] = rnokpp
+                if not servicemember.get("birth_date") and birth_date:
+                    servicemember["birth_date"] = birth_date
+
+            # Якщо РНОКПП або дата народження все ще порожні - беремо найсвіжіше непорожнє значення
+            for field in ("rnokpp", "birth_date"):
+                missing_ids = [sm_id for sm_id, sm in members.items() if not sm.get(field)]
+                if not missing_ids:
+                    continue
+
+                missing_placeholders = ", ".join("?" * len(missing_ids))
+                cursor.execute(f"""
+                    SELECT servicemember_id, {field}
+                    FROM (
+                        SELECT servicemember_id, {field},
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY servicemember_id
+                                   ORDER BY id DESC
+                               ) AS rn
+                        FROM service_records
+                        WHERE servicemember_id IN ({missing_placeholders})
+                          AND {field} IS NOT NULL AND {field} != ''
+                    )
+                    WHERE rn = 1
+                """, missing_ids)
+
+                for sm_id, value in cursor.fetchall():
+                    members[sm_id][field] = value
+
+            # Тексти періодів
+            cursor.execute(f"""
+                SELECT servicemember_id, period_type, period_text
+                FROM periods
+                WHERE servicemember_id IN ({id_placeholders})
+                  AND period_type IN ('100', '30')
+                ORDER BY id
+            """, ids)
+
+            period_texts = {}
+            for sm_id, period_type, period_text in cursor.fetchall():
+                period_texts.setdefault((sm_id, period_type), period_text)
+
+            # Всі parsed_periods (100% + 30%) для periods_all
+            cursor.execute(f"""
+                SELECT servicemember_id, start_date, end_date
+                FROM parsed_periods
+                WHERE servicemember_id IN ({id_placeholders})
+                  AND period_type IN ('100', '30')
+                ORDER BY servicemember_id, start_date, id
+            """, ids)
+
+            all_periods = {sm_id: [] for sm_id in ids}
+            for sm_id, start_date, end_date in cursor.fetchall():
+                start = parse_date(start_date)
+                end = parse_date(end_date)
+                all_periods[sm_id].append((start, end))
+
+            merged_periods = merge_periods_bulk(all_periods)
+
+            # Попередні записи кешу: якщо вхідні дані не змінились - ЖБД та громади беремо з них
+            cached = self._read_report_cache_rows(ids, dodatky_version) if dodatky_version is not None else {}
+            cache_rows = []
+
+            for sm_id, servicemember in members.items():
+                merged_all = merged_periods[sm_id]
+                periods_all_text = DataProcessor.format_periods_for_document(merged_all)
+
+                # Перша літера посади - маленька
+                position = servicemember["position"]
+                if position and len(position) > 0:
+                    position = position[0].lower() + position[1:]
+
+                data = {
+                    "name": servicemember["name"],
+                    "rank": servicemember["rank"],
+                    "position": position,
+                    "rnokpp": servicemember["rnokpp"],
+                    "unit": servicemember["unit"],
+                    "birth_date": servicemember["birth_date"],
+                    "periods": periods_all_text,  # Для Pilgova: {{ПЕРІОДИ}}
+                    "periods_100": period_texts.get((sm_id, "100"), ""),  # Для Only100: {{ПЕРІОДИ_100}}
+                    "periods_30": period_texts.get((sm_id, "30"), ""),
+                    "periods_all": periods_all_text,
+                    "periods_list": merged_all,
+                }
+                input_hash = self._report_input_hash(data)
+
+                # Отримати ЖБД та Громади з Dodatky.xlsx
+                try:
+                    previous = cached.get(sm_id)
+                    if previous and previous[0] == input_hash:
+                        zbd_text = previous[1]["zbd"]
+                        hromady_text = previous[1]["hromady"]
+                    else:
+                        if dodatky is None:
+                            dodatky = self.get_dodatky()
+                        zbd_text = dodatky.get_zbd(periods_all_text)
+                        hromady_text = dodatky.get_hromady(periods_all_text)
+                except Exception as e:
+                    import traceback
+                    error_details = traceback.format_exc()
+                    print(f"[ERROR] Помилка читання Dodatky.xlsx: {e}\n{error_details}")
+                    # Кидаємо exception вверх щоб побачити помилку в діалозі
+                    raise Exception(f"Не вдалося прочитати Dodatky.xlsx: {e}")
+
+                data["zbd"] = zbd_text  # {{ЖБД}}
+                data["hromady"] = hromady_text  # {{ГРОМАДА}}
+                result[servicemember["name"]] = data
+
+                if dodatky_version is not None:
+                    cache_rows.append((
+                        sm_id, data["name"], input_hash, dodatky_version, self._encode_report_payload(data)
+                    ))
+
+            if cache_rows:
+                self._write_report_cache(cache_rows)
+
+        return result
 
-        # Отримати періоди
-        periods_100_text = self.get_periods(servicemember["id"], "100")
-        periods_30_text = self.get_periods(servicemember["id"], "30")
+    # ==================== report_cache ====================
 
-        # Отримати parsed_periods для periods_list
+    def _get_dodatky_version(self) -> Optional[str]:
+        """Версія Dodatky для report_cache (хеш синхронізованого файлу) або None"""
         cursor = self.connection.cursor()
         cursor.execute("""
-            SELECT start_date, end_date FROM parsed_periods
-            WHERE servicemember_id = ?
-            ORDER BY start_date
-        """, (servicemember["id"],))
+            SELECT hash FROM sync_metadata WHERE entity_type = ? ORDER BY id DESC LIMIT 1
+        """, (self.DODATKY_ENTITY,))
+        row = cursor.fetchone()
+        return row[0] if row and row[0] else None
 
-        periods_list = []
-        for row in cursor.fetchall():
-            start = datetime.fromisoformat(row[0]).date()
-            end = datetime.fromisoformat(row[1]).date()
-            periods_list.append((start, end))
+    def _read_report_cache(self, names: List[str], dodatky_version: str) -> Dict[str, Dict]:
+        """
+        Читає актуальні записи report_cache по ПІБ
 
-        # Об'єднати всі періоди для periods_all
-        cursor.execute("""
-            SELECT start_date, end_date FROM parsed_periods
-            WHERE servicemember_id = ? AND period_type IN ('100', '30')
-            ORDER BY start_date
-        """, (servicemember["id"],))
+        Returns:
+            Словник {ПІБ: дані у форматі get_complete_data}
+        """
+        CHUNK_SIZE = 500  # Ліміт параметрів SQLite
 
-        all_periods = []
-        for row in cursor.fetchall():
-            start = datetime.fromisoformat(row[0]).date()
-            end = datetime.fromisoformat(row[1]).date()
-            all_periods.append((start, end))
+        result = {}
+        cursor = self.connection.cursor()
 
-        merged_all = DataProcessor.merge_consecutive_periods(all_periods)
-        periods_all_text = DataProcessor.format_periods_for_document(merged_all)
+        for offset in range(0, len(names), CHUNK_SIZE):
+            chunk = names[offset:offset + CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
 
-        # Перша літера посади - маленька
-        position = servicemember["position"]
-        if position and len(position) > 0:
-            position = position[0].lower() + position[1:]
+            cursor.execute(f"""
+                SELECT name, payload FROM report_cache
+                WHERE name IN ({placeholders}) AND stale = 0 AND dodatky_version = ?
+            """, (*chunk, dodatky_version))
 
-        # Отримати ЖБД та Громади з Dodatky.xlsx
-        try:
-            dodatky = get_dodatky_reader()
-            zbd_text = dodatky.get_zbd(periods_all_text)
-            hromady_text = dodatky.get_hromady(periods_all_text)
-        except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            print(f"[ERROR] Помилка читання Dodatky.xlsx: {e}\n{error_details}")
-            # Кидаємо exception вверх щоб побачити помилку в діалозі
-            raise Exception(f"Не вдалося прочитати Dodatky.xlsx: {e}")
+            for name, payload in cursor.fetchall():
+                result[name] = self._decode_report_payload(payload)
+
+        return result
+
+    def _read_report_cache_rows(self, ids: List[int], dodatky_version: str) -> Dict[int, Tuple[str, Dict]]:
+        """
+        Попередні записи report_cache (включно із застарілими) для тієї ж версії Dodatky
+
+        Returns:
+            Словник {servicemember_id: (input_hash, дані)}
+        """
+        placeholders = ", ".join("?" * len(ids))
+        cursor = self.connection.cursor()
+        cursor.execute(f"""
+            SELECT servicemember_id, input_hash, payload FROM report_cache
+            WHERE servicemember_id IN ({placeholders}) AND dodatky_version = ?
+        """, (*ids, dodatky_version))
 
         return {
-            "name": servicemember["name"],
-            "rank": servicemember["rank"],
-            "position": position,
-            "rnokpp": servicemember["rnokpp"],
-            "unit": servicemember["unit"],
-            "birth_date": servicemember["birth_date"],
-            "periods": periods_all_text,  # Для Pilgova: {{ПЕРІОДИ}}
-            "periods_100": periods_100_text,  # Для Only100: {{ПЕРІОДИ_100}}
-            "periods_30": periods_30_text,
-            "periods_all": periods_all_text,
-            "periods_list": merged_all,
-            "zbd": zbd_text,  # {{ЖБД}}
-            "hromady": hromady_text  # {{ГРОМАДА}}
+            sm_id: (input_hash, self._decode_report_payload(payload))
+            for sm_id, input_hash, payload in cursor.fetchall()
         }
 
+    def _write_report_cache(self, rows: List[Tuple]):
+        """
+        Записує зібрані дані в report_cache
+
+        Помилка запису (наприклад, БД заблокована іншим підключенням) не є критичною -
+        дані просто будуть зібрані заново наступного разу.
+
+        Args:
+            rows: [(servicemember_id, name, input_hash, dodatky_version, payload), ...]
+        """
+        try:
+            self.connection.executemany("""
+                INSERT INTO report_cache (servicemember_id, name, input_hash, dodatky_version, payload, stale)
+                VALUES (?, ?, ?, ?, ?, 0)
+                ON CONFLICT(servicemember_id) DO UPDATE SET
+                    name = excluded.name,
+                    input_hash = excluded.input_hash,
+                    dodatky_version = excluded.dodatky_version,
+                    payload = excluded.payload,
+                    stale = 0,
+                    updated_at = CURRENT_TIMESTAMP
+            """, rows)
+            self._commit()
+        except sqlite3.Error as e:
+            print(f"[WARNING] Не вдалося оновити report_cache: {e}")
+            if not self._tx_depth:
+                self.connection.rollback()
+
+    def clear_report_cache(self):
+        """Очищає report_cache (дані будуть зібрані заново при наступному запиті)"""
+        self.connection.execute("DELETE FROM report_cache")
+        self._commit()
+
+    @staticmethod
+    def _report_input_hash(data: Dict) -> str:
+        """Хеш вхідних даних рапорту (все, від чого залежать ЖБД та громади і сам рапорт)"""
+        key = [
+            data["name"], data["rank"], data["position"], data["rnokpp"],
+            data["unit"], data["birth_date"],
+            data["periods_100"], data["periods_30"], data["periods_all"]
+        ]
+        return hashlib.md5(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode_report_payload(data: Dict) -> str:
+        """Серіалізує дані get_complete_data в JSON (periods_list - ISO дати)"""
+        payload = dict(data)
+        payload["periods_list"] = [
+            [start.isoformat(), end.isoformat()] for start, end in data["periods_list"]
+        ]
+        return json.dumps(payload, ensure_ascii=False)
+
+    @staticmethod
+    def _decode_report_payload(payload: str) -> Dict:
+        """Відновлює дані get_complete_data з JSON"""
+        data = json.loads(payload)
+        data["periods_list"] = [
+            (date.fromisoformat(start), date.fromisoformat(end)) for start, end in data["periods_list"]
+        ]
+        return data
+
     # ==================== Імпорт даних за місяць ====================
 
-    def import_month_data(self, month: str, data, progress_callback=None) -> Dict[str, int]:
+    def import_month_data(self, month: str, data, progress_callback=None,
+                          replace_month: bool = False) -> Dict[str, int]:
         """
-        Імпортує дані за новий місяць
+        Імпортує дані за місяць (ідемпотентно - повторний імпорт не створює дублікатів)
+
+        ОПТИМІЗОВАНО: set-based імпорт в одній транзакції
+        1. Всі ПІБ резолвляться одним запитом
+        2. Нові servicemembers вставляються, існуючі оновлюються через executemany
+        3. service_records порівнюються з уже імпортованими за місяць (ключ record_key):
+           нові та змінені записуються через UPSERT, незмінені пропускаються,
+           у режимі replace_month відсутні у вхідних даних - видаляються
+        4. Періоди перераховуються одним пакетом тільки для осіб зі зміненими записами
 
         Args:
             month: Місяць у форматі YYYY-MM
             data: Список записів [{name, rank, position, start_100, end_100, ...}, ...]
                   АБО словник {ПІБ: {rank, position, start_100, end_100, ...}} (старий формат)
-            progress_callback: Функція для оновлення прогресу (current, total, message)
+            progress_callback: Функція для оновлення прогресу (current, total, message).
+                Виняток з callback до завершення (current < total) відкочує весь
+                імпорт - так працює скасування
+            replace_month: Замінити місяць - записи місяця, яких немає у data, видаляються
 
         Returns:
-            Статистика: {"added": 150, "updated": 0, "errors": 0}
+            Статистика: {"added": 150, "changed": 0, "unchanged": 0, "removed": 0,
+                         "updated": 0, "recalculated": 150, "errors": 0}
+            (updated - військовослужбовці з оновленим званням / посадою,
+             recalculated - особи, для яких перераховано періоди)
         """
-        stats = {"added": 0, "updated": 0, "errors": 0}
-        updated_servicemembers = set()
+        stats = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0,
+                 "updated": 0, "recalculated": 0, "errors": 0}
 
         # Перетворюємо дані в єдиний формат (список записів)
         if isinstance(data, dict):
@@ -696,91 +1469,489 @@ class DatabaseManager:
             # Новий формат: список записів
             records = data
 
+        records = [r for r in records if r.get("name")]
         total_records = len(records)
+        # Прогрес: записи + перерахунок (приблизно стільки ж кроків)
+        total_steps = total_records * 2
 
-        for i, record_data in enumerate(records, 1):
-            name = record_data.get("name")
-            if not name:
-                continue
+        if progress_callback:
+            progress_callback(0, total_steps, f"Підготовка {total_records} записів...")
 
-            # Оновлюємо прогрес
-            if progress_callback:
-                progress_callback(i, total_records, f"Імпорт запису {i}/{total_records}: {name}")
+        cursor = self.connection.cursor()
 
-            try:
-                # 1. Знайти або створити servicemember
-                servicemember = self.get_servicemember_by_name(name)
-
-                if not servicemember:
-                    # Створити нового
-                    sm_data = {
-                        "name": name,
-                        "rank": record_data.get("rank", ""),
-                        "position": record_data.get("position", ""),
-                        "rnokpp": record_data.get("rnokpp", ""),
-                        "unit": record_data.get("unit", ""),
-                        "birth_date": record_data.get("birth_date", "")
-                    }
-                    servicemember_id = self.add_servicemember(sm_data)
-                else:
-                    servicemember_id = servicemember["id"]
-                    # Оновити звання та посаду якщо вони змінились
-                    if record_data.get("rank") or record_data.get("position"):
-                        update_data = {
-                            "rank": record_data.get("rank") or servicemember.get("rank"),
-                            "position": record_data.get("position") or servicemember.get("position"),
-                            "rnokpp": servicemember.get("rnokpp"),
-                            "unit": servicemember.get("unit"),
-                            "birth_date": servicemember.get("birth_date")
-                        }
-                        self.update_servicemember(servicemember_id, update_data)
-
-                # 2. Додати service_record за цей місяць
-                service_record = {
-                    "month": month,
+        # 1. Резолвимо всі ПІБ одним запитом
+        cursor.execute("SELECT id, name, name_key, rank, position FROM servicemembers ORDER BY id")
+        existing = {}
+        name_keys = {}  # name_key -> ПІБ особи (в БД - перший за id, або перша поява в імпорті)
+        for row in cursor.fetchall():
+            existing[row[1]] = {"id": row[0], "rank": row[3], "position": row[4]}
+            name_keys.setdefault(row[2], row[1])
+
+        # ПІБ запису -> ПІБ особи: точне співпадіння, інакше по ключу normalize_name
+        canonical_names = {}
+        for record_data in records:
+            name = record_data["name"]
+            if name not in canonical_names:
+                canonical_names[name] = name if name in existing else name_keys.setdefault(normalize_name(name), name)
+
+        # Підсумковий стан кожної особи після застосування всіх записів по порядку
+        # (повторює логіку послідовних add_servicemember/update_servicemember)
+        new_members = {}      # name -> sm_data (порядок першої появи)
+        updated_members = {}  # name -> {"rank", "position"}
+
+        for record_data in records:
+            name = canonical_names[record_data["name"]]
+            rank = record_data.get("rank")
+            position = record_data.get("position")
+
+            if name not in existing and name not in new_members:
+                new_members[name] = {
+                    "name": name,
                     "rank": record_data.get("rank", ""),
                     "position": record_data.get("position", ""),
-                    "unit": record_data.get("unit", ""),
                     "rnokpp": record_data.get("rnokpp", ""),
-                    "birth_date": record_data.get("birth_date", ""),
-                    "start_100": record_data.get("start_100"),
-                    "end_100": record_data.get("end_100"),
-                    "start_30": record_data.get("start_30"),
-                    "end_30": record_data.get("end_30"),
-                    "start_non": record_data.get("start_non"),
-                    "end_non": record_data.get("end_non"),
-                    "status": record_data.get("status", ""),
-                    "row_number": None  # Для імпорту не потрібен
+                    "unit": record_data.get("unit", ""),
+                    "birth_date": record_data.get("birth_date", "")
                 }
+                continue
+
+            # Оновити звання та посаду якщо вони змінились
+            if rank or position:
+                target = new_members.get(name) or updated_members.setdefault(name, dict(existing[name]))
+                target["rank"] = rank or target.get("rank")
+                target["position"] = position or target.get("position")
+
+        # Тільки ті, у кого звання / посада дійсно змінились (повторний імпорт місяця нічого не оновлює)
+        updated_members = {
+            name: sm for name, sm in updated_members.items()
+            if (sm["rank"], sm["position"]) != (existing[name]["rank"], existing[name]["position"])
+        }
+
+        with self.transaction():
+            # 2. Нові військовослужбовці
+            if new_members:
+                cursor.executemany("""
+                    INSERT INTO servicemembers (name, name_key, rank, position, rnokpp, unit, birth_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (sm["name"], normalize_name(sm["name"]), sm["rank"], sm["position"],
+                     sm["rnokpp"], sm["unit"], sm["birth_date"])
+                    for sm in new_members.values()
+                ])
+
+                cursor.execute("SELECT id, name FROM servicemembers")
+                name_to_id = {row[1]: row[0] for row in cursor.fetchall()}
+            else:
+                name_to_id = {name: sm["id"] for name, sm in existing.items()}
+
+            # Існуючі військовослужбовці - оновлення звання та посади
+            if updated_members:
+                cursor.executemany("""
+                    UPDATE servicemembers
+                    SET rank = ?, position = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, [
+                    (sm["rank"], sm["position"], sm["id"])
+                    for sm in updated_members.values()
+                ])
+                stats["updated"] = len(updated_members)
+
+            # 3. service_records за цей місяць: поточний стан {(id особи, ключ): (id запису, значення)}
+            value_columns = ", ".join(self.RECORD_VALUE_COLUMNS)
+            cursor.execute(f"""
+                SELECT id, servicemember_id, record_key, {value_columns}
+                FROM service_records
+                WHERE month = ?
+            """, (month,))
+            existing_records = {}
+            unkeyed_records = []  # Старі дублікати без ключа: (id запису, id особи)
+            for row in cursor.fetchall():
+                if row[2] is None:
+                    unkeyed_records.append((row[0], row[1]))
+                else:
+                    existing_records[(row[1], row[2])] = (row[0], tuple(row[3:]))
+
+            # Вхідні записи за ключем (повтор у вхідних даних - перемагає останній)
+            incoming_records = {}
+            for record_data in records:
+                servicemember_id = name_to_id.get(canonical_names[record_data["name"]])
+                if servicemember_id is None:
+                    print(f"[ERROR] Помилка при імпорті {record_data['name']}: ID не знайдено")
+                    stats["errors"] += 1
+                    continue
+
+                dates = tuple(record_data.get(column) for column in self.RECORD_DATE_COLUMNS)
+                ordinals = self.date_ordinals(*dates)
+                values = (
+                    record_data.get("unit", ""),
+                    record_data.get("rank", ""),
+                    record_data.get("position", ""),
+                    record_data.get("rnokpp", ""),
+                    record_data.get("birth_date", ""),
+                    *dates,
+                    record_data.get("status", "")
+                )
+                incoming_records[(servicemember_id, self.record_key(dates, ordinals))] = (values, ordinals)
 
-                self.add_service_record(servicemember_id, service_record)
-                updated_servicemembers.add(servicemember_id)
-                stats["added"] += 1
+            service_records_batch = []
+            changed_servicemembers = set()
 
-            except Exception as e:
-                print(f"[ERROR] Помилка при імпорті {name}: {e}")
-                stats["errors"] += 1
+            for (servicemember_id, record_key), (values, ordinals) in incoming_records.items():
+                existing_record = existing_records.get((servicemember_id, record_key))
+                if existing_record is None:
+                    stats["added"] += 1
+                elif existing_record[1] != values:
+                    stats["changed"] += 1
+                else:
+                    stats["unchanged"] += 1
+                    continue
 
-        # 3. Перерахувати періоди для всіх оновлених servicemembers
-        print(f"\nПерерахунок періодів для {len(updated_servicemembers)} військовослужбовців...")
-        updated_list = list(updated_servicemembers)
-        total_to_update = len(updated_list)
+                service_records_batch.append((
+                    servicemember_id,
+                    month,
+                    *values,
+                    None,  # excel_row_number - для імпорту не потрібен
+                    *ordinals,
+                    record_key
+                ))
+                changed_servicemembers.add(servicemember_id)
+
+            cursor.executemany(self._UPSERT_SERVICE_RECORD_SQL, service_records_batch)
+
+            # Заміна місяця: видаляємо записи, яких немає у вхідних даних
+            if replace_month:
+                removed_records = [
+                    (record_id, servicemember_id)
+                    for (servicemember_id, record_key), (record_id, _) in existing_records.items()
+                    if (servicemember_id, record_key) not in incoming_records
+                ] + unkeyed_records
+
+                cursor.executemany(
+                    "DELETE FROM service_records WHERE id = ?",
+                    [(record_id,) for record_id, _ in removed_records]
+                )
+                changed_servicemembers.update(servicemember_id for _, servicemember_id in removed_records)
+                stats["removed"] = len(removed_records)
 
-        for idx, sm_id in enumerate(updated_list, 1):
             if progress_callback:
                 progress_callback(
-                    total_records + idx,
-                    total_records + total_to_update,
-                    f"Перерахунок періодів {idx}/{total_to_update}"
+                    total_records, total_steps,
+                    f"Перерахунок періодів для {len(changed_servicemembers)} військовослужбовців..."
                 )
 
-            try:
-                self.calculate_and_store_periods(sm_id)
-            except Exception as e:
-                print(f"[WARN] Помилка перерахунку періодів для ID={sm_id}: {e}")
+            # 4. Перерахувати періоди тільки для осіб зі зміненими записами одним пакетом
+            print(f"\nПерерахунок періодів для {len(changed_servicemembers)} військовослужбовців...")
+            recalc_progress = None
+            if progress_callback:
+                def recalc_progress(done, total, message):
+                    progress_callback(total_records + done * total_records // max(total, 1), total_steps, message)
+
+            stats["recalculated"] = self._recalculate_periods_bulk(sorted(changed_servicemembers), recalc_progress)
+
+        if progress_callback:
+            progress_callback(total_steps, total_steps, "Імпорт завершено")
 
         return stats
 
+    def recalculate_all_periods(self, member_ids: Optional[List[int]] = None, progress_callback=None) -> int:
+        """
+        Set-based перерахунок періодів для всіх (або вказаних) військовослужбовців
+
+        Логіка:
+        1. Всі service_records читаються одним впорядкованим запитом (групування по servicemember_id)
+        2. Періоди (колонки *_ord, без парсингу дат) зливаються в пам'яті
+        3. periods та parsed_periods записуються через executemany в одній транзакції
+
+        Args:
+            member_ids: Список ID для перерахунку (None - всі військовослужбовці)
+            progress_callback: Функція для оновлення прогресу (current, total, message)
+
+        Returns:
+            Кількість оброблених військовослужбовців
+        """
+        with self.transaction():
+            return self._recalculate_periods_bulk(member_ids, progress_callback)
+
+    def recalculate_dirty(self, progress_callback=None) -> int:
+        """
+        Інкрементальний перерахунок: тільки особи, чиї service_records змінились
+        після останнього перерахунку (таблиця dirty_servicemembers, заповнюється тригерами)
+
+        Args:
+            progress_callback: Функція для оновлення прогресу (current, total, message)
+
+        Returns:
+            Кількість перерахованих військовослужбовців
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT servicemember_id FROM dirty_servicemembers ORDER BY servicemember_id")
+        member_ids = [row[0] for row in cursor.fetchall()]
+
+        if not member_ids:
+            return 0
+
+        with self.transaction():
+            return self._recalculate_periods_bulk(member_ids, progress_callback)
+
+    def get_dirty_count(self) -> int:
+        """Кількість осіб, що очікують перерахунку періодів"""
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM dirty_servicemembers")
+        return cursor.fetchone()[0]
+
+    def _recalculate_periods_bulk(self, member_ids: Optional[List[int]] = None, progress_callback=None) -> int:
+        """
+        Пакетний перерахунок періодів (аналог calculate_and_store_periods для списку осіб)
+
+        Commit НЕ виконується - викликається всередині transaction().
+        """
+        cursor = self.connection.cursor()
+        FLUSH_SIZE = 500  # Кількість осіб на один executemany / ліміт параметрів SQLite
+
+        if member_ids is None:
+            # Всі військовослужбовці: один потоковий запит по всій таблиці
+            cursor.execute("SELECT id FROM servicemembers ORDER BY id")
+            all_ids = [row[0] for row in cursor.fetchall()]
+            total = len(all_ids)
+
+            cursor.execute("DELETE FROM periods")
+            cursor.execute("DELETE FROM parsed_periods")
+            cursor.execute("DELETE FROM dirty_servicemembers")
+
+            read_cursor = self.connection.cursor()
+            read_cursor.execute("""
+                SELECT servicemember_id, start_100_ord, end_100_ord, start_30_ord, end_30_ord
+                FROM service_records
+                ORDER BY servicemember_id, month, id
+            """)
+
+            processed = 0
+            periods_by_member = {}
+            for sm_id, rows in groupby(read_cursor, key=lambda row: row[0]):
+                periods_by_member[sm_id] = self._collect_record_periods(rows)
+
+                if len(periods_by_member) >= FLUSH_SIZE:
+                    self._store_merged_periods(cursor, periods_by_member)
+                    processed += len(periods_by_member)
+                    periods_by_member = {}
+                    if progress_callback:
+                        progress_callback(processed, total, f"Перерахунок періодів {processed}/{total}")
+
+            self._store_merged_periods(cursor, periods_by_member)
+
+            if progress_callback:
+                progress_callback(total, total, f"Перерахунок періодів {total}/{total}")
+
+            return total
+
+        member_ids = list(member_ids)
+        total = len(member_ids)
+
+        for offset in range(0, total, FLUSH_SIZE):
+            chunk = member_ids[offset:offset + FLUSH_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+
+            cursor.execute(f"""
+                SELECT servicemember_id, start_100_ord, end_100_ord, start_30_ord, end_30_ord
+                FROM service_records
+                WHERE servicemember_id IN ({placeholders})
+                ORDER BY servicemember_id, month, id
+            """, chunk)
+
+            periods_by_member = {sm_id: ([], []) for sm_id in chunk}
+            for sm_id, rows in groupby(cursor.fetchall(), key=lambda row: row[0]):
+                periods_by_member[sm_id] = self._collect_record_periods(rows)
+
+            # Видалити старі періоди
+            cursor.execute(f"DELETE FROM periods WHERE servicemember_id IN ({placeholders})", chunk)
+            cursor.execute(f"DELETE FROM parsed_periods WHERE servicemember_id IN ({placeholders})", chunk)
+            cursor.execute(f"DELETE FROM dirty_servicemembers WHERE servicemember_id IN ({placeholders})", chunk)
+
+            self._store_merged_periods(cursor, periods_by_member)
+
+            if progress_callback:
+                done = offset + len(chunk)
+                progress_callback(done, total, f"Перерахунок періодів {done}/{total}")
+
+        return total
+
+    @staticmethod
+    def _collect_record_periods(rows) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Збирає періоди 100% та 30% з рядків
+        (servicemember_id, start_100_ord, end_100_ord, start_30_ord, end_30_ord)
+
+        Returns:
+            (periods_100, periods_30) - пари порядкових номерів днів
+        """
+        periods_100 = []
+        periods_30 = []
+
+        for _, start_100, end_100, start_30, end_30 in rows:
+            if start_100 is not None and end_100 is not None:
+                periods_100.append((start_100, end_100))
+
+            if start_30 is not None and end_30 is not None:
+                periods_30.append((start_30, end_30))
+
+        return periods_100, periods_30
+
+    @staticmethod
+    def _store_merged_periods(cursor, periods_by_member: Dict[int, Tuple[List, List]]):
+        """
+        Зливає періоди та записує їх в periods та parsed_periods через executemany
+
+        Args:
+            cursor: Курсор БД
+            periods_by_member: {servicemember_id: (periods_100, periods_30)} - пари порядкових номерів днів
+        """
+        periods_rows = []
+        parsed_rows = []
+
+        # Злиття для всіх осіб пакету одним викликом
+        groups = {}
+        for sm_id, (periods_100, periods_30) in periods_by_member.items():
+            groups[(sm_id, "100")] = periods_100
+            groups[(sm_id, "30")] = periods_30
+        merged = merge_ordinal_periods_bulk(groups)
+
+        for sm_id in periods_by_member:
+            merged_100 = merged[(sm_id, "100")]
+            merged_30 = merged[(sm_id, "30")]
+
+            formatted_100 = DataProcessor.format_periods_for_document(merged_100)
+            formatted_30 = DataProcessor.format_periods_for_document(merged_30)
+
+            if formatted_100:
+                periods_rows.append((sm_id, "100", formatted_100))
+            if formatted_30:
+                periods_rows.append((sm_id, "30", formatted_30))
+
+            for start, end in merged_100:
+                parsed_rows.append((sm_id, "100", start.isoformat(), end.isoformat()))
+            for start, end in merged_30:
+                parsed_rows.append((sm_id, "30", start.isoformat(), end.isoformat()))
+
+        cursor.executemany("""
+            INSERT INTO periods (servicemember_id, period_type, period_text)
+            VALUES (?, ?, ?)
+        """, periods_rows)
+
+        cursor.executemany("""
+            INSERT INTO parsed_periods (servicemember_id, period_type, start_date, end_date)
+            VALUES (?, ?, ?, ?)
+        """, parsed_rows)
+
+    # ==================== Dodatky (ЖБД, громади, НП) ====================
+
+    def sync_dodatky(self, file_path: str = None, force: bool = False) -> bool:
+        """
+        Завантажує Dodatky.xlsx в таблиці zbd, hromady, naseleni_punkty
+
+        Файл перечитується тільки якщо змінився: спочатку порівнюється mtime,
+        потім md5 вмісту (з sync_metadata).
+
+        Args:
+            file_path: Шлях до Dodatky.xlsx (None - стандартне розташування)
+            force: Перезавантажити навіть якщо файл не змінився
+
+        Returns:
+            True якщо таблиці було оновлено
+        """
+        if file_path is None:
+            file_path = get_dodatky_path()
+
+        if not os.path.exists(file_path):
+            print(f"[WARNING] Файл {file_path} не знайдено")
+            return False
+
+        entity_id = os.path.basename(file_path)
+        last_modified = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT id, last_modified, hash FROM sync_metadata
+            WHERE entity_type = ? AND entity_id = ?
+        """, (self.DODATKY_ENTITY, entity_id))
+        metadata = cursor.fetchone()
+
+        if metadata and not force and metadata["last_modified"] == last_modified:
+            return False
+
+        with open(file_path, "rb") as f:
+            file_hash = hashlib.md5(f.read()).hexdigest()
+
+        if metadata and not force and metadata["hash"] == file_hash:
+            # Змінився тільки mtime - вміст той самий
+            cursor.execute("""
+                UPDATE sync_metadata SET last_modified = ? WHERE id = ?
+            """, (last_modified, metadata["id"]))
+            self._commit()
+            return False
+
+        reader = DodatkyReader(file_path)
+        reader.load()
+
+        with self.transaction():
+            cursor.execute("DELETE FROM zbd")
+            cursor.execute("DELETE FROM hromady")
+            cursor.execute("DELETE FROM naseleni_punkty")
+
+            # Порядок вставки = порядок рядків у файлі (id використовується при пошуку)
+            cursor.executemany("""
+                INSERT INTO zbd (name, number, date) VALUES (?, ?, ?)
+            """, [(name, nomer, zbd_date.isoformat()) for name, nomer, zbd_date in reader.zbd_data])
+
+            cursor.executemany("""
+                INSERT INTO hromady (name, start_date, end_date) VALUES (?, ?, ?)
+            """, [(name, vid.isoformat(), do.isoformat()) for name, vid, do in reader.hromady_data])
+
+            cursor.executemany("""
+                INSERT INTO naseleni_punkty (name, start_date, end_date) VALUES (?, ?, ?)
+            """, [(name, vid.isoformat(), do.isoformat()) for name, vid, do in reader.np_data])
+
+            if metadata:
+                cursor.execute("""
+                    UPDATE sync_metadata
+                    SET last_modified = ?, hash = ?, sync_status = 'synced'
+                    WHERE id = ?
+                """, (last_modified, file_hash, metadata["id"]))
+            else:
+                cursor.execute("""
+                    INSERT INTO sync_metadata (entity_type, entity_id, last_modified, hash, sync_status)
+                    VALUES (?, ?, ?, ?, 'synced')
+                """, (self.DODATKY_ENTITY, entity_id, last_modified, file_hash))
+
+        self._dodatky_reader = None
+
+        print(f"[OK] Dodatky.xlsx синхронізовано: ЖБД {len(reader.zbd_data)}, "
+              f"громад {len(reader.hromady_data)}, НП {len(reader.np_data)}")
+        return True
+
+    def is_dodatky_synced(self) -> bool:
+        """Чи завантажено Dodatky.xlsx в БД"""
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT 1 FROM sync_metadata WHERE entity_type = ? LIMIT 1
+        """, (self.DODATKY_ENTITY,))
+        return cursor.fetchone() is not None
+
+    def get_dodatky(self) -> DodatkyReader:
+        """
+        Джерело ЖБД / громад / НП для рапортів
+
+        Returns:
+            DatabaseDodatkyReader якщо Dodatky.xlsx синхронізовано в БД,
+            інакше глобальний DodatkyReader (читання файлу)
+        """
+        if self._dodatky_reader is None:
+            if self.is_dodatky_synced():
+                self._dodatky_reader = DatabaseDodatkyReader(self.connection)
+            else:
+                return get_dodatky_reader()
+
+        return self._dodatky_reader
+
     # ==================== Утиліти ====================
 
     def is_empty(self) -> bool:
@@ -832,24 +2003,26 @@ class DatabaseManager:
         Returns:
             ID створеного service_record
         """
-        # Визначаємо поля для запису
-        record_data = {
-            "month": month,
-            "start_100": start_date if period_type == "100" else None,
-            "end_100": end_date if period_type == "100" else None,
-            "start_30": start_date if period_type == "30" else None,
-            "end_30": end_date if period_type == "30" else None,
-            "start_non": start_date if period_type == "non_involved" else None,
-            "end_non": end_date if period_type == "non_involved" else None,
-        }
+        # Запис та перерахунок - одна транзакція (або savepoint у зовнішньому transaction())
+        with self.transaction():
+            # Визначаємо поля для запису
+            record_data = {
+                "month": month,
+                "start_100": start_date if period_type == "100" else None,
+                "end_100": end_date if period_type == "100" else None,
+                "start_30": start_date if period_type == "30" else None,
+                "end_30": end_date if period_type == "30" else None,
+                "start_non": start_date if period_type == "non_involved" else None,
+                "end_non": end_date if period_type == "non_involved" else None,
+            }
 
-        # Додаємо service_record
-        record_id = self.add_service_record(servicemember_id, record_data)
+            # Додаємо service_record
+            record_id = self.add_service_record(servicemember_id, record_data)
 
-        # Перераховуємо всі періоди
-        self.calculate_and_store_periods(servicemember_id)
+            # Перераховуємо всі періоди
+            self.calculate_and_store_periods(servicemember_id)
 
-        return record_id
+            return record_id
 
     def get_servicemember_periods_detailed(self, servicemember_id: int) -> Dict[str, List[Dict]]:
         """
@@ -875,8 +2048,8 @@ class DatabaseManager:
         for row in cursor.fetchall():
             period_type = row[1]
             # Конвертуємо дату з ISO в DD.MM.YYYY
-            start_date = datetime.fromisoformat(row[2]).strftime("%d.%m.%Y")
-            end_date = datetime.fromisoformat(row[3]).strftime("%d.%m.%Y")
+            start_date = parse_date(row[2]).strftime("%d.%m.%Y")
+            end_date = parse_date(row[3]).strftime("%d.%m.%Y")
 
             if period_type in result:
                 result[period_type].append({
@@ -896,31 +2069,31 @@ class DatabaseManager:
             start_date: Нова дата початку (DD.MM.YYYY)
             end_date: Нова дата кінця (DD.MM.YYYY)
         """
-        cursor = self.connection.cursor()
-
-        # Конвертуємо дату в ISO формат
-        start_iso = datetime.strptime(start_date, "%d.%m.%Y").date().isoformat()
-        end_iso = datetime.strptime(end_date, "%d.%m.%Y").date().isoformat()
+        # Оновлення та перерахунок тексту - одна транзакція (або savepoint у зовнішньому transaction())
+        with self.transaction():
+            cursor = self.connection.cursor()
 
-        # Отримуємо servicemember_id перед оновленням
-        cursor.execute("SELECT servicemember_id FROM parsed_periods WHERE id = ?", (period_id,))
-        row = cursor.fetchone()
-        if not row:
-            raise ValueError(f"Період з ID {period_id} не знайдено")
+            # Конвертуємо дату в ISO формат
+            start_iso = datetime.strptime(start_date, "%d.%m.%Y").date().isoformat()
+            end_iso = datetime.strptime(end_date, "%d.%m.%Y").date().isoformat()
 
-        servicemember_id = row[0]
+            # Отримуємо servicemember_id перед оновленням
+            cursor.execute("SELECT servicemember_id FROM parsed_periods WHERE id = ?", (period_id,))
+            row = cursor.fetchone()
+            if not row:
+                raise ValueError(f"Період з ID {period_id} не знайдено")
 
-        # Оновлюємо період
-        cursor.execute("""
-            UPDATE parsed_periods
-            SET start_date = ?, end_date = ?
-            WHERE id = ?
-        """, (start_iso, end_iso, period_id))
+            servicemember_id = row[0]
 
-        self.connection.commit()
+            # Оновлюємо період
+            cursor.execute("""
+                UPDATE parsed_periods
+                SET start_date = ?, end_date = ?
+                WHERE id = ?
+            """, (start_iso, end_iso, period_id))
 
-        # Перераховуємо текстове представлення періодів
-        self._recalculate_period_text(servicemember_id)
+            # Перераховуємо текстове представлення періодів
+            self._recalculate_period_text(servicemember_id)
 
     def delete_period(self, period_id: int):
         """
@@ -929,22 +2102,23 @@ class DatabaseManager:
         Args:
             period_id: ID періоду в parsed_periods
         """
-        cursor = self.connection.cursor()
+        # Видалення та перерахунок тексту - одна транзакція (або savepoint у зовнішньому transaction())
+        with self.transaction():
+            cursor = self.connection.cursor()
 
-        # Отримуємо servicemember_id перед видаленням
-        cursor.execute("SELECT servicemember_id FROM parsed_periods WHERE id = ?", (period_id,))
-        row = cursor.fetchone()
-        if not row:
-            raise ValueError(f"Період з ID {period_id} не знайдено")
+            # Отримуємо servicemember_id перед видаленням
+            cursor.execute("SELECT servicemember_id FROM parsed_periods WHERE id = ?", (period_id,))
+            row = cursor.fetchone()
+            if not row:
+                raise ValueError(f"Період з ID {period_id} не знайдено")
 
-        servicemember_id = row[0]
+            servicemember_id = row[0]
 
-        # Видаляємо період
-        cursor.execute("DELETE FROM parsed_periods WHERE id = ?", (period_id,))
-        self.connection.commit()
+            # Видаляємо період
+            cursor.execute("DELETE FROM parsed_periods WHERE id = ?", (period_id,))
 
-        # Перераховуємо текстове представлення періодів
-        self._recalculate_period_text(servicemember_id)
+            # Перераховуємо текстове представлення періодів
+            self._recalculate_period_text(servicemember_id)
 
     def _recalculate_period_text(self, servicemember_id: int):
         """
@@ -963,8 +2137,8 @@ class DatabaseManager:
 
         periods_100 = []
         for row in cursor.fetchall():
-            start = datetime.fromisoformat(row[0]).date()
-            end = datetime.fromisoformat(row[1]).date()
+            start = parse_date(row[0])
+            end = parse_date(row[1])
             periods_100.append((start, end))
 
         # Отримуємо всі періоди 30%
@@ -976,8 +2150,8 @@ class DatabaseManager:
 
         periods_30 = []
         for row in cursor.fetchall():
-            start = datetime.fromisoformat(row[0]).date()
-            end = datetime.fromisoformat(row[1]).date()
+            start = parse_date(row[0])
+            end = parse_date(row[1])
             periods_30.append((start, end))
 
         # Злиття послідовних періодів
@@ -1003,7 +2177,7 @@ class DatabaseManager:
                 VALUES (?, '30', ?)
             """, (servicemember_id, formatted_30))
 
-        self.connection.commit()
+        self._commit()
 
     def get_unique_ranks(self) -> List[str]:
         """Отримати список унікальних звань"""
@@ -5,22 +5,124 @@
 - Населені пункти
 """
 from openpyxl import load_workbook
-from datetime import datetime, date
+from datetime import date
 from typing import List, Tuple, Dict, Optional
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 import os
 import re
 
+from core.xlsx_stream import XlsxStreamReader, iter_sheet_rows
+from utils.date_utils import parse_date
+
+
+class _IntervalIndex:
+    """
+    Статичне центроване дерево інтервалів
+
+    Зберігає закриті інтервали [початок, кінець] з індексом рядка і повертає
+    всі інтервали, що перетинаються з запитом, за O(log n + k).
+    """
+
+    def __init__(self, intervals: List[Tuple[date, date, int]]):
+        """
+        Args:
+            intervals: Список (початок, кінець, індекс_рядка), початок <= кінець
+        """
+        self._root = self._build(intervals)
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+
+        endpoints = sorted([start for start, _, _ in intervals] + [end for _, end, _ in intervals])
+        center = endpoints[len(endpoints) // 2]
+
+        left, right, overlapping = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                overlapping.append(interval)
+
+        return (
+            center,
+            sorted(overlapping, key=lambda x: x[0]),                # за початком
+            sorted(overlapping, key=lambda x: x[1], reverse=True),  # за кінцем (спадання)
+            self._build(left),
+            self._build(right)
+        )
+
+    def query(self, start: date, end: date) -> List[int]:
+        """
+        Індекси інтервалів, що перетинаються з [start, end]
+
+        Returns:
+            Список індексів рядків (без певного порядку)
+        """
+        result = []
+        stack = [self._root]
+
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+
+            center, by_start, by_end, left, right = node
+
+            if end < center:
+                # Інтервали вузла містять center > end - перетин, якщо початок <= end
+                for interval in by_start:
+                    if interval[0] > end:
+                        break
+                    result.append(interval[2])
+                stack.append(left)
+            elif start > center:
+                # Інтервали вузла містять center < start - перетин, якщо кінець >= start
+                for interval in by_end:
+                    if interval[1] < start:
+                        break
+                    result.append(interval[2])
+                stack.append(right)
+            else:
+                # center всередині запиту - перетинаються всі інтервали вузла
+                result.extend(interval[2] for interval in by_start)
+                stack.append(left)
+                stack.append(right)
+
+        return result
+
 
 class DodatkyReader:
     """Клас для читання даних з Dodatky.xlsx"""
 
-    def __init__(self, file_path: str = "Dodatky.xlsx"):
+    CACHE_SIZE = 2048  # Кількість різних наборів періодів у кеші результатів
+
+    def __init__(self, file_path: str = "Dodatky.xlsx", streaming: bool = True):
+        """
+        Args:
+            file_path: Шлях до Dodatky.xlsx
+            streaming: Читати аркуші через XlsxStreamReader (False - openpyxl read_only)
+        """
         self.file_path = file_path
+        self.streaming = streaming
         self.zbd_data = []  # [(назва, номер, дата), ...]
         self.hromady_data = []  # [(назва, дата_від, дата_до), ...]
         self.np_data = []  # [(назва, дата_від, дата_до), ...]
         self._loaded = False
 
+        # Індекси (будуються в load)
+        self._zbd_sorted = []  # Індекси zbd_data, відсортовані за (дата, порядок у файлі)
+        self._zbd_dates = []  # Дати ЖБД у тому ж порядку - для bisect
+        self._hromady_index = None
+        self._np_index = None
+
+        # Кеші (на екземпляр): текст періодів -> кортеж періодів, (тип, кортеж періодів) -> результат
+        self._periods_cache = lru_cache(maxsize=self.CACHE_SIZE)(self._parse_periods_key)
+        self._result_cache = lru_cache(maxsize=self.CACHE_SIZE)(self._compute_result)
+
     def load(self):
         """Завантажити дані з Excel"""
         if self._loaded:
@@ -30,13 +132,15 @@ class DodatkyReader:
             print(f"[WARNING] Файл {self.file_path} не знайдено")
             return
 
-        wb = load_workbook(self.file_path, read_only=True, data_only=True)
+        if self.streaming:
+            wb = XlsxStreamReader(self.file_path)
+        else:
+            wb = load_workbook(self.file_path, read_only=True, data_only=True)
 
         # Читаємо ЖБД
         if "ЖБД" in wb.sheetnames:
-            ws = wb["ЖБД"]
             current_name = None
-            for row in ws.iter_rows(min_row=2, values_only=True):
+            for row in iter_sheet_rows(wb, "ЖБД", min_row=2, columns=(0, 1, 2)):
                 if row[0]:  # Якщо є назва ЖБД
                     current_name = str(row[0]).strip()
                 if current_name and row[1] and row[2]:  # Номер і дата
@@ -53,8 +157,7 @@ class DodatkyReader:
                 break
 
         if hromady_sheet:
-            ws = wb[hromady_sheet]
-            for row in ws.iter_rows(min_row=2, values_only=True):
+            for row in iter_sheet_rows(wb, hromady_sheet, min_row=2, columns=(0, 1, 2)):
                 if row[0] and row[1] and row[2]:
                     nazva = str(row[0]).strip()
                     data_vid = self._parse_date(row[1])
@@ -70,8 +173,7 @@ class DodatkyReader:
                 break
 
         if np_sheet:
-            ws = wb[np_sheet]
-            for row in ws.iter_rows(min_row=2, values_only=True):
+            for row in iter_sheet_rows(wb, np_sheet, min_row=2, columns=(0, 1, 2)):
                 if row[0] and row[1] and row[2]:
                     nazva = str(row[0]).strip()
                     data_vid = self._parse_date(row[1])
@@ -80,30 +182,108 @@ class DodatkyReader:
                         self.np_data.append((nazva, data_vid, data_do))
 
         wb.close()
+        self._build_indexes()
+        self.clear_cache()
         self._loaded = True
 
-    def _parse_date(self, value) -> Optional[date]:
-        """Парсить дату з різних форматів"""
-        if value is None:
-            return None
+    def reload(self):
+        """Перечитати Dodatky.xlsx (кеш результатів скидається)"""
+        self.zbd_data = []
+        self.hromady_data = []
+        self.np_data = []
+        self._loaded = False
+        self.clear_cache()
+        self.load()
 
-        if isinstance(value, datetime):
-            return value.date()
+    def clear_cache(self):
+        """Скинути кеш результатів"""
+        self._periods_cache.cache_clear()
+        self._result_cache.cache_clear()
 
-        if isinstance(value, date):
-            return value
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Статистика кешу результатів
 
-        # Спробувати розпарсити рядок
-        date_str = str(value).strip()
-        formats = ["%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y"]
+        Returns:
+            {"hits", "misses", "size", "text_hits", "text_misses"} -
+            hits/misses по наборах періодів, text_* - по тексту періодів
+        """
+        results = self._result_cache.cache_info()
+        texts = self._periods_cache.cache_info()
+        return {
+            "hits": results.hits,
+            "misses": results.misses,
+            "size": results.currsize,
+            "text_hits": texts.hits,
+            "text_misses": texts.misses
+        }
+
+    def _build_indexes(self):
+        """Будує індекси для пошуку ЖБД, громад та НП"""
+        self._zbd_sorted = sorted(range(len(self.zbd_data)), key=lambda i: self.zbd_data[i][2])
+        self._zbd_dates = [self.zbd_data[i][2] for i in self._zbd_sorted]
+        self._hromady_index = self._build_range_index(self.hromady_data)
+        self._np_index = self._build_range_index(self.np_data)
+
+    @staticmethod
+    def _build_range_index(rows: List[Tuple[str, date, date]]):
+        """
+        Індекс для рядків (назва, дата_від, дата_до)
 
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
+        Returns:
+            (дерево інтервалів, список індексів рядків з дата_від > дата_до)
+        """
+        intervals = []
+        inverted = []
 
-        return None
+        for i, (_, data_vid, data_do) in enumerate(rows):
+            if data_vid <= data_do:
+                intervals.append((data_vid, data_do, i))
+            else:
+                inverted.append(i)
+
+        return _IntervalIndex(intervals), inverted
+
+    @staticmethod
+    def _query_range_index(index, rows, period_start: date, period_end: date) -> List[int]:
+        """
+        Індекси рядків, що перетинаються з періодом, у порядку рядків у файлі
+        """
+        tree, inverted = index
+
+        if period_start > period_end:
+            # Некоректний період - перевіряємо всі рядки початковою умовою
+            return [
+                i for i, (_, data_vid, data_do) in enumerate(rows)
+                if period_end >= data_vid and period_start <= data_do
+            ]
+
+        found = tree.query(period_start, period_end)
+
+        # Некоректні діапазони (від > до) - перевіряємо тією ж умовою, що й раніше
+        for i in inverted:
+            _, data_vid, data_do = rows[i]
+            if period_end >= data_vid and period_start <= data_do:
+                found.append(i)
+
+        found.sort()
+        return found
+
+    def _parse_date(self, value) -> Optional[date]:
+        """Парсить дату з різних форматів"""
+        return parse_date(value)
+
+    def _has_zbd(self) -> bool:
+        """Чи є дані ЖБД"""
+        return bool(self.zbd_data)
+
+    def _has_hromady(self) -> bool:
+        """Чи є дані громад"""
+        return bool(self.hromady_data)
+
+    def _has_np(self) -> bool:
+        """Чи є дані населених пунктів"""
+        return bool(self.np_data)
 
     def get_zbd(self, periods_text: str) -> str:
         """
@@ -122,50 +302,19 @@ class DodatkyReader:
         """
         self.load()
 
-        if not self.zbd_data or not periods_text:
+        if not self._has_zbd() or not periods_text:
             return ""
 
         # Парсимо періоди
-        periods = self._parse_periods_text(periods_text)
+        periods = self._periods_cache(periods_text)
         if not periods:
             return ""
 
-        # Знаходимо першу дату участі
-        first_date = min(p[0] for p in periods)
-
-        # Список для збору всіх ЖБД з повною інформацією (дата, назва, номер)
-        zbd_entries = []
-        used_keys = set()
-
-        # Знаходимо найближчий попередній ЖБД
-        closest_prev = None
-        closest_prev_date = None
-
-        for zbd_name, zbd_nomer, zbd_date in self.zbd_data:
-            # Перевіряємо чи ЖБД входить в хоча б один період
-            for period_start, period_end in periods:
-                if period_start <= zbd_date <= period_end:
-                    key = f"{zbd_name}||{zbd_date.isoformat()}||{zbd_nomer}"
-                    if key not in used_keys:
-                        used_keys.add(key)
-                        zbd_entries.append((zbd_date, zbd_name, zbd_nomer))
-                    break
-
-            # Перевіряємо чи це найближчий попередній
-            if zbd_date < first_date:
-                if closest_prev_date is None or zbd_date > closest_prev_date:
-                    closest_prev_date = zbd_date
-                    closest_prev = (zbd_name, zbd_nomer, zbd_date)
-
-        # Додаємо один попередній ЖБД
-        if closest_prev:
-            zbd_name, zbd_nomer, zbd_date = closest_prev
-            key = f"{zbd_name}||{zbd_date.isoformat()}||{zbd_nomer}"
-            if key not in used_keys:
-                zbd_entries.append((zbd_date, zbd_name, zbd_nomer))
+        return self._result_cache("zbd", periods)
 
-        # Сортуємо по даті
-        zbd_entries.sort(key=lambda x: x[0])
+    def _format_zbd(self, periods: Tuple[Tuple[date, date], ...]) -> str:
+        """Текст ЖБД для розпарсених періодів"""
+        zbd_entries = self._find_zbd(periods)
 
         # Формуємо результат - повторюємо назву для кожного номера
         # Формат: "ЖБД 1СБ №51/ВП від 11.05.2022, ЖБД 1СБ №173/ВП від 05.11.2022"
@@ -191,27 +340,18 @@ class DodatkyReader:
         """
         self.load()
 
-        if not self.hromady_data or not periods_text:
+        if not self._has_hromady() or not periods_text:
             return ""
 
-        periods = self._parse_periods_text(periods_text)
+        periods = self._periods_cache(periods_text)
         if not periods:
             return ""
 
-        # Збираємо громади з датами (дата_від, назва)
-        found = []
-        found_names = set()  # Щоб уникнути дублікатів
+        return self._result_cache("hromady", periods)
 
-        for period_start, period_end in periods:
-            for hromada_name, hromada_vid, hromada_do in self.hromady_data:
-                # Перевіряємо перетин періодів
-                if period_end >= hromada_vid and period_start <= hromada_do:
-                    if hromada_name not in found_names:
-                        found_names.add(hromada_name)
-                        found.append((hromada_vid, hromada_name))
-
-        # Сортуємо по даті початку (хронологічно)
-        found.sort(key=lambda x: x[0])
+    def _format_hromady(self, periods: Tuple[Tuple[date, date], ...]) -> str:
+        """Текст громад для розпарсених періодів"""
+        found = self._find_hromady(periods)
 
         # Повертаємо тільки назви, без дат
         return ", ".join([name for _, name in found])
@@ -228,22 +368,107 @@ class DodatkyReader:
         """
         self.load()
 
-        if not self.np_data or not periods_text:
+        if not self._has_np() or not periods_text:
             return ""
 
-        periods = self._parse_periods_text(periods_text)
+        periods = self._periods_cache(periods_text)
         if not periods:
             return ""
 
+        return self._result_cache("np", periods)
+
+    def _format_np(self, periods: Tuple[Tuple[date, date], ...]) -> str:
+        """Текст НП для розпарсених періодів"""
+        found = self._find_np(periods)
+
+        return ", ".join(sorted(found))
+
+    def _find_zbd(self, periods: List[Tuple[date, date]]) -> List[Tuple[date, str, str]]:
+        """
+        Знаходить ЖБД для періодів
+
+        1. Всі ЖБД, дата яких входить в хоча б один період (bisect по відсортованих датах)
+        2. Один попередній ЖБД - найближчий до першої дати участі (один бінарний пошук)
+
+        Returns:
+            Список (дата, назва, номер), відсортований по даті
+        """
+        # Позиції у відсортованому масиві = порядок (дата, порядок у файлі)
+        positions = set()
+        for period_start, period_end in periods:
+            lo = bisect_left(self._zbd_dates, period_start)
+            hi = bisect_right(self._zbd_dates, period_end)
+            positions.update(range(lo, hi))
+
+        # Список для збору всіх ЖБД з повною інформацією (дата, назва, номер)
+        zbd_entries = []
+        used_keys = set()
+
+        # Найближчий попередній ЖБД (дата < першої дати участі; при однакових датах - перший у файлі)
+        first_date = min(p[0] for p in periods)
+        prev_pos = bisect_left(self._zbd_dates, first_date) - 1
+        if prev_pos >= 0:
+            prev_pos = bisect_left(self._zbd_dates, self._zbd_dates[prev_pos])
+            zbd_name, zbd_nomer, zbd_date = self.zbd_data[self._zbd_sorted[prev_pos]]
+            used_keys.add(f"{zbd_name}||{zbd_date.isoformat()}||{zbd_nomer}")
+            zbd_entries.append((zbd_date, zbd_name, zbd_nomer))
+
+        for pos in sorted(positions):
+            zbd_name, zbd_nomer, zbd_date = self.zbd_data[self._zbd_sorted[pos]]
+            key = f"{zbd_name}||{zbd_date.isoformat()}||{zbd_nomer}"
+            if key not in used_keys:
+                used_keys.add(key)
+                zbd_entries.append((zbd_date, zbd_name, zbd_nomer))
+
+        return zbd_entries
+
+    def _find_hromady(self, periods: List[Tuple[date, date]]) -> List[Tuple[date, str]]:
+        """
+        Знаходить громади, що перетинаються з періодами
+
+        Returns:
+            Список (дата_від, назва) без дублікатів назв, відсортований по даті початку
+        """
+        found = []
+        found_names = set()  # Щоб уникнути дублікатів
+
+        for period_start, period_end in periods:
+            for i in self._query_range_index(self._hromady_index, self.hromady_data, period_start, period_end):
+                hromada_name, hromada_vid, _ = self.hromady_data[i]
+                if hromada_name not in found_names:
+                    found_names.add(hromada_name)
+                    found.append((hromada_vid, hromada_name))
+
+        # Сортуємо по даті початку (хронологічно)
+        found.sort(key=lambda x: x[0])
+        return found
+
+    def _find_np(self, periods: List[Tuple[date, date]]) -> set:
+        """
+        Знаходить населені пункти, що перетинаються з періодами
+
+        Returns:
+            Множина назв НП
+        """
         found = set()
 
         for period_start, period_end in periods:
-            for np_name, np_vid, np_do in self.np_data:
-                # Перевіряємо перетин періодів
-                if period_end >= np_vid and period_start <= np_do:
-                    found.add(np_name)
+            for i in self._query_range_index(self._np_index, self.np_data, period_start, period_end):
+                found.add(self.np_data[i][0])
 
-        return ", ".join(sorted(found))
+        return found
+
+    def _parse_periods_key(self, periods_text: str) -> Tuple[Tuple[date, date], ...]:
+        """Нормалізований ключ кешу: кортеж розпарсених періодів"""
+        return tuple(self._parse_periods_text(periods_text))
+
+    def _compute_result(self, kind: str, periods: Tuple[Tuple[date, date], ...]) -> str:
+        """Обчислення результату для кешу (kind: "zbd", "hromady" або "np")"""
+        if kind == "zbd":
+            return self._format_zbd(periods)
+        if kind == "hromady":
+            return self._format_hromady(periods)
+        return self._format_np(periods)
 
     def _parse_periods_text(self, periods_text: str) -> List[Tuple[date, date]]:
         """Парсить текст періодів в список кортежів (дата_початку, дата_кінця)"""
@@ -253,16 +478,155 @@ class DodatkyReader:
         matches = re.findall(r'з\s+(\d{2}\.\d{2}\.\d{4})\s+по\s+(\d{2}\.\d{2}\.\d{4})', periods_text)
 
         for start_str, end_str in matches:
-            try:
-                start = datetime.strptime(start_str, "%d.%m.%Y").date()
-                end = datetime.strptime(end_str, "%d.%m.%Y").date()
+            start = parse_date(start_str)
+            end = parse_date(end_str)
+            if start and end:
                 periods.append((start, end))
-            except ValueError:
-                continue
 
         return periods
 
 
+class DatabaseDodatkyReader(DodatkyReader):
+    """
+    DodatkyReader, що читає ЖБД/громади/НП з таблиць БД (zbd, hromady, naseleni_punkty)
+
+    Таблиці заповнює DatabaseManager.sync_dodatky. Пошук - індексовані SQL запити
+    по діапазонах дат, openpyxl не використовується.
+    """
+
+    def __init__(self, connection):
+        """
+        Args:
+            connection: Підключення sqlite3 (того потоку, в якому використовується reader)
+        """
+        super().__init__(file_path=None)
+        self.connection = connection
+        self._counts = {}
+
+    def load(self):
+        """Перевіряє наявність даних у таблицях"""
+        if self._loaded:
+            return
+
+        cursor = self.connection.cursor()
+        for table in ("zbd", "hromady", "naseleni_punkty"):
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+            self._counts[table] = cursor.fetchone()[0]
+
+        self._loaded = True
+
+    def _has_zbd(self) -> bool:
+        return bool(self._counts.get("zbd"))
+
+    def _has_hromady(self) -> bool:
+        return bool(self._counts.get("hromady"))
+
+    def _has_np(self) -> bool:
+        return bool(self._counts.get("naseleni_punkty"))
+
+    def _find_zbd(self, periods: List[Tuple[date, date]]) -> List[Tuple[date, str, str]]:
+        """
+        Знаходить ЖБД для періодів (id таблиці відповідає порядку рядків у файлі)
+
+        Returns:
+            Список (дата, назва, номер), відсортований по даті
+        """
+        cursor = self.connection.cursor()
+
+        # ЖБД, дата яких входить в хоча б один період: (дата, id) -> (назва, номер)
+        found = {}
+        for period_start, period_end in periods:
+            cursor.execute("""
+                SELECT id, name, number, date FROM zbd
+                WHERE date BETWEEN ? AND ?
+            """, (period_start.isoformat(), period_end.isoformat()))
+            for zbd_id, zbd_name, zbd_nomer, zbd_date in cursor.fetchall():
+                found[(zbd_date, zbd_id)] = (zbd_name, zbd_nomer)
+
+        zbd_entries = []
+        used_keys = set()
+
+        # Найближчий попередній ЖБД (при однакових датах - перший у файлі)
+        first_date = min(p[0] for p in periods)
+        cursor.execute("""
+            SELECT name, number, date FROM zbd
+            WHERE date < ?
+            ORDER BY date DESC, id ASC
+            LIMIT 1
+        """, (first_date.isoformat(),))
+        row = cursor.fetchone()
+        if row:
+            zbd_name, zbd_nomer, zbd_date = row
+            used_keys.add(f"{zbd_name}||{zbd_date}||{zbd_nomer}")
+            zbd_entries.append((parse_date(zbd_date), zbd_name, zbd_nomer))
+
+        for (zbd_date, _), (zbd_name, zbd_nomer) in sorted(found.items()):
+            key = f"{zbd_name}||{zbd_date}||{zbd_nomer}"
+            if key not in used_keys:
+                used_keys.add(key)
+                zbd_entries.append((parse_date(zbd_date), zbd_name, zbd_nomer))
+
+        return zbd_entries
+
+    def _find_ranges(self, table: str, period_start: date, period_end: date) -> List[Tuple[str, str]]:
+        """
+        Рядки таблиці діапазонів, що перетинаються з періодом, у порядку рядків у файлі
+
+        Returns:
+            Список (назва, дата_від)
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(f"""
+            SELECT name, start_date FROM {table}
+            WHERE start_date <= ? AND end_date >= ?
+            ORDER BY id
+        """, (period_end.isoformat(), period_start.isoformat()))
+        return cursor.fetchall()
+
+    def _find_hromady(self, periods: List[Tuple[date, date]]) -> List[Tuple[date, str]]:
+        found = []
+        found_names = set()  # Щоб уникнути дублікатів
+
+        for period_start, period_end in periods:
+            for hromada_name, hromada_vid in self._find_ranges("hromady", period_start, period_end):
+                if hromada_name not in found_names:
+                    found_names.add(hromada_name)
+                    found.append((parse_date(hromada_vid), hromada_name))
+
+        # Сортуємо по даті початку (хронологічно)
+        found.sort(key=lambda x: x[0])
+        return found
+
+    def _find_np(self, periods: List[Tuple[date, date]]) -> set:
+        found = set()
+
+        for period_start, period_end in periods:
+            for np_name, _ in self._find_ranges("naseleni_punkty", period_start, period_end):
+                found.add(np_name)
+
+        return found
+
+
+def get_dodatky_path() -> str:
+    """
+    Шлях до Dodatky.xlsx відносно виконуваного файлу
+
+    Returns:
+        Абсолютний шлях до Dodatky.xlsx
+    """
+    import sys
+
+    # Визначаємо базову директорію (для exe та для звичайного Python)
+    if getattr(sys, 'frozen', False):
+        # Запущено як exe (PyInstaller)
+        base_dir = sys._MEIPASS
+    else:
+        # Запущено як Python скрипт
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    return os.path.join(base_dir, "Dodatky.xlsx")
+
+
 # Глобальний екземпляр для кешування
 _dodatky_reader = None
 
@@ -272,18 +636,7 @@ def get_dodatky_reader(file_path: str = None) -> DodatkyReader:
     if _dodatky_reader is None:
         # Якщо шлях не вказано, шукаємо файл відносно виконуваного файлу
         if file_path is None:
-            import os
-            import sys
-
-            # Визначаємо базову директорію (для exe та для звичайного Python)
-            if getattr(sys, 'frozen', False):
-                # Запущено як exe (PyInstaller)
-                base_dir = sys._MEIPASS
-            else:
-                # Запущено як Python скрипт
-                base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-            file_path = os.path.join(base_dir, "Dodatky.xlsx")
+            file_path = get_dodatky_path()
 
         _dodatky_reader = DodatkyReader(file_path)
     return _dodatky_reader
@@ -2,28 +2,58 @@
 Модуль для читання та парсингу Excel файлу з даними військовослужбовців
 """
 from openpyxl import load_workbook
+from datetime import datetime
 from typing import Optional
 import os
 
+from core.data_table import DataSheetTable
+from core.xlsx_stream import XlsxStreamReader, iter_sheet_rows
+
 
 class ExcelReader:
     """
     Клас для читання даних з Excel файлу
+
+    Читання: книга відкривається read_only=True, кожен аркуш парситься один раз
+    і кешується разом з індексами ПІБ -> рядки та підрозділ -> рядки.
+    Аркуш Data зберігається компактно у DataSheetTable (колонки, інтерновані
+    рядки, дати як порядкові номери) з власними індексами.
+    При streaming=True аркуші читаються XlsxStreamReader (без openpyxl) і тільки
+    потрібні стовпці.
+    Запис: книга відкривається у режимі запису тільки при першому зверненні
+    до workbook (add_servicemember_data, add_period, save).
     """
 
-    def __init__(self, file_path: str):
+    _PERIOD_SHEETS = ["Періоди на 100", "Періоди на 30", "Періоди не залучення"]
+
+    # Стовпці (0-based), що читаються з аркушів
+    # Data: A-N (місяць ... статус) + AB (дата народження, позиція 14 у кортежі)
+    _DATA_COLUMNS = tuple(range(14)) + (27,)
+    # Аркуші періодів: A=місяць, B=ПІБ, C=періоди
+    _PERIOD_COLUMNS = (0, 1, 2)
+
+    def __init__(self, file_path: str, streaming: bool = True):
         """
         Ініціалізація читача Excel
 
         Args:
             file_path: Шлях до Excel файлу
+            streaming: Читати аркуші потоково через XlsxStreamReader
+                (False - через openpyxl read_only)
         """
         self.file_path = file_path
-        self.workbook = None
+        self.streaming = streaming
+        self.sheetnames = []
+        self._workbook = None      # Книга у режимі запису (відкривається на вимогу)
+        self._sheet_cache = {}     # {аркуш: [рядки] або DataSheetTable}
+        self._name_index = {}      # {аркуш: {ПІБ: [рядки]}}
+        self._unit_index = {}      # {аркуш: {підрозділ: [рядки]}}
 
     def load_workbook(self):
         """
-        Завантаження Excel файлу
+        Завантаження Excel файлу (перелік аркушів; дані аркушів читаються на вимогу)
+
+        Повторний виклик перечитує файл: кеші та незбережені зміни скидаються.
 
         Raises:
             FileNotFoundError: Якщо файл не знайдено
@@ -32,36 +62,137 @@ class ExcelReader:
         if not os.path.exists(self.file_path):
             raise FileNotFoundError(f"Файл не знайдено: {self.file_path}")
 
+        self.close()
+
         try:
-            self.workbook = load_workbook(
-                self.file_path,
-                read_only=False,  # Дозволяємо запис для додавання даних
-                data_only=True,   # Читати значення, а не формули
-                keep_vba=False    # Не завантажувати VBA макроси - ШВИДШЕ
-            )
+            workbook = self._open_read_only()
+            try:
+                self.sheetnames = list(workbook.sheetnames)
+            finally:
+                workbook.close()
         except Exception as e:
             raise Exception(f"Помилка при відкритті файлу: {str(e)}")
 
+    @property
+    def workbook(self):
+        """
+        Книга у режимі запису (відкривається при першому зверненні)
+
+        Звернення скидає кеші аркушів - викликач може змінювати клітинки.
+        """
+        if self._workbook is None:
+            if not os.path.exists(self.file_path):
+                raise FileNotFoundError(f"Файл не знайдено: {self.file_path}")
+
+            try:
+                self._workbook = load_workbook(
+                    self.file_path,
+                    read_only=False,  # Дозволяємо запис для додавання даних
+                    data_only=True,   # Читати значення, а не формули
+                    keep_vba=False    # Не завантажувати VBA макроси - ШВИДШЕ
+                )
+            except Exception as e:
+                raise Exception(f"Помилка при відкритті файлу: {str(e)}")
+            self.sheetnames = list(self._workbook.sheetnames)
+
+        self._invalidate_cache()
+        return self._workbook
+
+    def _open_read_only(self):
+        """Відкриває книгу тільки для читання (потоково, без об'єктів клітинок у пам'яті)"""
+        if self.streaming:
+            return XlsxStreamReader(self.file_path)
+        return load_workbook(self.file_path, read_only=True, data_only=True, keep_vba=False)
+
+    def _invalidate_cache(self, sheet_name: str = None):
+        """Скидає кеш аркуша (або всіх аркушів)"""
+        if sheet_name is None:
+            self._sheet_cache.clear()
+            self._name_index.clear()
+            self._unit_index.clear()
+        else:
+            self._sheet_cache.pop(sheet_name, None)
+            self._name_index.pop(sheet_name, None)
+            self._unit_index.pop(sheet_name, None)
+
     def get_sheet_data(self, sheet_name: str) -> list[dict]:
         """
         Отримати всі дані з конкретного аркуша
 
+        Аркуш парситься один раз; повертається кешований список (не змінювати).
+
         Args:
             sheet_name: Назва аркуша
 
         Returns:
-            Список словників з даними
+            Список словників з даними (для Data - DataSheetTable з рядками-DataRow)
 
         Raises:
             ValueError: Якщо аркуш не знайдено
         """
-        if not self.workbook:
+        data = self._sheet_cache.get(sheet_name)
+        if data is not None:
+            return data
+
+        if not self.sheetnames:
             self.load_workbook()
 
-        if sheet_name not in self.workbook.sheetnames:
+        if sheet_name not in self.sheetnames:
             raise ValueError(f"Аркуш '{sheet_name}' не знайдено")
 
-        sheet = self.workbook[sheet_name]
+        if self._workbook is not None:
+            # Є незбережені зміни - читаємо з книги в пам'яті
+            data = self._parse_sheet(self._workbook, sheet_name)
+        else:
+            workbook = self._open_read_only()
+            try:
+                data = self._parse_sheet(workbook, sheet_name)
+            finally:
+                workbook.close()
+
+        self._sheet_cache[sheet_name] = data
+
+        if not isinstance(data, DataSheetTable):
+            # DataSheetTable має власні індекси
+            name_index = {}
+            unit_index = {}
+            for row in data:
+                if row.get("name"):
+                    name_index.setdefault(row["name"], []).append(row)
+                if row.get("unit"):
+                    unit_index.setdefault(row["unit"], []).append(row)
+
+            self._name_index[sheet_name] = name_index
+            self._unit_index[sheet_name] = unit_index
+
+        return data
+
+    def _rows_by(self, sheet_name: str, column: str, value: str) -> list:
+        """Рядки аркуша з заданим ПІБ (column="name") або підрозділом (column="unit")"""
+        data = self.get_sheet_data(sheet_name)
+        if isinstance(data, DataSheetTable):
+            return data.filter(**{column: value})
+
+        index = self._name_index if column == "name" else self._unit_index
+        return list(index[sheet_name].get(value, []))
+
+    def _unique(self, sheet_name: str, column: str) -> list[str]:
+        """Відсортовані унікальні ПІБ або підрозділи аркуша"""
+        data = self.get_sheet_data(sheet_name)
+        if isinstance(data, DataSheetTable):
+            return data.unique(column)
+
+        index = self._name_index if column == "name" else self._unit_index
+        return sorted(index[sheet_name])
+
+    def _parse_sheet(self, workbook, sheet_name: str):
+        """
+        Парсить рядки аркуша у список словників (Data - у DataSheetTable)
+
+        Args:
+            workbook: XlsxStreamReader або книга openpyxl
+            sheet_name: Назва аркуша
+        """
         data = []
 
         # Залежно від аркуша, читаємо різні стовпці
@@ -69,17 +200,18 @@ class ExcelReader:
             # Стовпці: A=місяць, B=підрозділ, D=звання, E=ПІБ, F=РНОКПП, G=посада
             # H=початок 100%, I=кінець 100%, J=початок 30%, K=кінець 30%
             # L=початок не залучення, M=кінець не залучення, N=статус
-            # AB=дата народження (індекс 27)
-            for row_idx, row in enumerate(sheet.iter_rows(min_row=4, values_only=True), start=4):
+            # AB=дата народження (позиція 14 у кортежі)
+            data = DataSheetTable()
+            rows = iter_sheet_rows(workbook, sheet_name, min_row=4, columns=self._DATA_COLUMNS)
+            for row_idx, row in enumerate(rows, start=4):
                 if row[4]:  # Якщо є ПІБ (стовпець E, індекс 4)
-                    # Форматуємо дату народження зі стовпця AB (індекс 27)
+                    # Форматуємо дату народження зі стовпця AB
                     birth_date = None
-                    if len(row) > 27 and row[27]:
-                        from datetime import datetime
-                        if isinstance(row[27], datetime):
-                            birth_date = row[27].strftime("%d.%m.%Y")
+                    if row[14]:
+                        if isinstance(row[14], datetime):
+                            birth_date = row[14].strftime("%d.%m.%Y")
                         else:
-                            birth_date = str(row[27])
+                            birth_date = str(row[14])
 
                     data.append({
                         "month": str(row[0]) if row[0] else None,
@@ -95,19 +227,19 @@ class ExcelReader:
                         "end_30": row[10],
                         "start_non": row[11],
                         "end_non": row[12],
-                        "status": str(row[13]) if len(row) > 13 and row[13] else None,
-                        "row_number": row_idx  # НОВЕ: для синхронізації
-                    })
+                        "status": str(row[13]) if row[13] else None
+                    }, row_idx)  # row_number - для синхронізації
 
-        elif sheet_name in ["Періоди на 100", "Періоди на 30", "Періоди не залучення"]:
+        elif sheet_name in self._PERIOD_SHEETS:
             # Стовпці: A=№ п/п або місяць, B=ПІБ, C=періоди (текст)
             # ВАЖЛИВО: Дані починаються з рядка 2, рядок 1 - заголовки
-            for row_idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+            rows = iter_sheet_rows(workbook, sheet_name, min_row=2, columns=self._PERIOD_COLUMNS)
+            for row_idx, row in enumerate(rows, start=2):
                 if row[1]:  # Якщо є ПІБ (стовпець B, індекс 1)
                     data.append({
                         "month": str(row[0]) if row[0] else None,
                         "name": str(row[1]) if row[1] else None,
-                        "periods": str(row[2]) if len(row) > 2 and row[2] else None,
+                        "periods": str(row[2]) if row[2] else None,
                         "row_number": row_idx  # НОВЕ: для синхронізації
                     })
 
@@ -123,14 +255,7 @@ class ExcelReader:
         Returns:
             Відсортований список унікальних ПІБ
         """
-        data = self.get_sheet_data(sheet_name)
-        names = set()
-
-        for row in data:
-            if row.get("name"):
-                names.add(row["name"])
-
-        return sorted(list(names))
+        return self._unique(sheet_name, "name")
 
     def get_unique_units(self) -> list[str]:
         """
@@ -139,14 +264,25 @@ class ExcelReader:
         Returns:
             Відсортований список унікальних підрозділів
         """
-        data = self.get_sheet_data("Data")
-        units = set()
+        return self._unique("Data", "unit")
+
+    def get_unit_names(self, unit: str, sheet_name: str = "Data") -> list[str]:
+        """
+        Отримати унікальні ПІБ підрозділу (в порядку першої появи)
+
+        Args:
+            unit: Назва підрозділу
+            sheet_name: Назва аркуша
 
-        for row in data:
-            if row.get("unit"):
-                units.add(row["unit"])
+        Returns:
+            Список ПІБ
+        """
+        data = self.get_sheet_data(sheet_name)
+        if isinstance(data, DataSheetTable):
+            return data.unique_in_order("name", data.indices(unit=unit))
 
-        return sorted(list(units))
+        rows = self._unit_index[sheet_name].get(unit, [])
+        return list(dict.fromkeys(row["name"] for row in rows if row.get("name")))
 
     def get_servicemember_data(self, name: str, sheet_name: str) -> list[dict]:
         """
@@ -159,8 +295,7 @@ class ExcelReader:
         Returns:
             Список словників з даними для військовослужбовця
         """
-        data = self.get_sheet_data(sheet_name)
-        return [row for row in data if row.get("name") == name]
+        return self._rows_by(sheet_name, "name", name)
 
     def get_unit_data(self, unit: str, sheet_name: str) -> list[dict]:
         """
@@ -173,8 +308,7 @@ class ExcelReader:
         Returns:
             Список словників з даними для підрозділу
         """
-        data = self.get_sheet_data(sheet_name)
-        return [row for row in data if row.get("unit") == unit]
+        return self._rows_by(sheet_name, "unit", unit)
 
     def get_servicemember_info_from_data(self, name: str) -> Optional[dict]:
         """
@@ -188,10 +322,8 @@ class ExcelReader:
         Returns:
             Словник з інформацією або None
         """
-        data = self.get_sheet_data("Data")
-
         # Знаходимо всі записи для цього військовослужбовця
-        matching_rows = [row for row in data if row.get("name") == name]
+        matching_rows = self._rows_by("Data", "name", name)
 
         if not matching_rows:
             return None
@@ -318,8 +450,12 @@ class ExcelReader:
         Returns:
             True якщо успішно, False якщо помилка
         """
+        if self._workbook is None:
+            # Книга не відкривалась для запису - змін немає
+            return True
+
         try:
-            self.workbook.save(self.file_path)
+            self._workbook.save(self.file_path)
             return True
         except Exception as e:
             print(f"Помилка при збереженні файлу: {str(e)}")
@@ -329,6 +465,7 @@ class ExcelReader:
         """
         Закрити workbook
         """
-        if self.workbook:
-            self.workbook.close()
-            self.workbook = None
+        if self._workbook:
+            self._workbook.close()
+            self._workbook = None
+        self._invalidate_cache()
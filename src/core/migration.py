@@ -1,11 +1,124 @@
 """
 Одноразова міграція даних з Excel в SQLite базу даних
 """
-from typing import Dict
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import os
 from core.excel_reader import ExcelReader
 from core.database import DatabaseManager
 from core.data_processor import DataProcessor
+from utils.name_utils import normalize_name
+
+
+# Аркуші періодів та їх тип у БД
+PERIOD_SHEETS = [
+    ("Періоди на 100", "100"),
+    ("Періоди на 30", "30"),
+]
+
+
+# ==================== Парсинг аркушів (воркери) ====================
+
+def data_sheet_rows(excel_reader: ExcelReader) -> List[Tuple]:
+    """
+    Рядки аркуша Data у вигляді кортежів для вставки
+
+    Args:
+        excel_reader: ExcelReader з доступом до файлу
+
+    Returns:
+        Список (name, month, unit, rank, position, rnokpp, birth_date,
+        start_100, end_100, start_30, end_30, start_non, end_non, status,
+        start_100_ord, ..., end_non_ord)
+    """
+    date_columns = DatabaseManager.RECORD_DATE_COLUMNS
+    rows = []
+
+    for row in excel_reader.get_sheet_data("Data"):
+        dates = tuple(row.get(column) for column in date_columns)
+        rows.append((
+            row.get("name"),
+            row.get("month"),
+            row.get("unit"),
+            row.get("rank"),
+            row.get("position"),
+            row.get("rnokpp"),
+            row.get("birth_date"),
+            *dates,
+            row.get("status"),
+            *DatabaseManager.date_ordinals(*dates)
+        ))
+
+    return rows
+
+
+def period_sheet_entries(excel_reader: ExcelReader, sheet_name: str) -> Optional[List[Tuple]]:
+    """
+    Розпарсені та злиті періоди аркуша періодів по військовослужбовцях
+
+    Args:
+        excel_reader: ExcelReader з доступом до файлу
+        sheet_name: "Періоди на 100" або "Періоди на 30"
+
+    Returns:
+        Список (name, [(start_iso, end_iso), ...], текст періодів) в порядку
+        першої появи ПІБ, або None якщо аркуша немає
+    """
+    if sheet_name not in excel_reader.sheetnames:
+        return None
+
+    # Агрегувати періоди по військовослужбовцях
+    # {name: [period_text1, period_text2, ...]}
+    aggregated = {}
+    for row in excel_reader.get_sheet_data(sheet_name):
+        name = row.get("name")
+        periods_text = row.get("periods")
+
+        if name and periods_text:
+            aggregated.setdefault(name, []).append(periods_text)
+
+    entries = []
+    for name, periods_list in aggregated.items():
+        # Об'єднати всі періоди в один текст та розпарсити
+        parsed = DataProcessor.parse_periods("\n".join(periods_list))
+        if not parsed:
+            entries.append((name, None, None))
+            continue
+
+        # Злити послідовні періоди
+        merged = DataProcessor.merge_consecutive_periods(parsed)
+        entries.append((
+            name,
+            [(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")) for start, end in merged],
+            DataProcessor.format_periods_for_document(merged)
+        ))
+
+    return entries
+
+
+def parse_sheet_in_worker(file_path: str, sheet_name: str):
+    """
+    Парсить аркуш в окремому процесі (для ProcessPoolExecutor)
+
+    Книга відкривається read_only; повертаються тільки компактні кортежі.
+
+    Args:
+        file_path: Шлях до Excel файлу
+        sheet_name: "Data" або назва аркуша періодів
+
+    Returns:
+        Результат data_sheet_rows або period_sheet_entries
+    """
+    excel_reader = ExcelReader(file_path)
+    excel_reader.load_workbook()
+    try:
+        if sheet_name == "Data":
+            return data_sheet_rows(excel_reader)
+        return period_sheet_entries(excel_reader, sheet_name)
+    finally:
+        excel_reader.close()
 
 
 class DataMigration:
@@ -13,16 +126,20 @@ class DataMigration:
     Клас для міграції даних з Excel файлу в SQLite базу даних
     """
 
-    def __init__(self, excel_reader: ExcelReader, db_manager: DatabaseManager):
+    def __init__(self, excel_reader: ExcelReader, db_manager: DatabaseManager, max_workers: Optional[int] = None):
         """
         Ініціалізація міграції
 
         Args:
             excel_reader: Екземпляр ExcelReader
             db_manager: Екземпляр DatabaseManager
+            max_workers: Кількість процесів для парсингу аркушів
+                (None - за кількістю ядер, 1 - послідовно в цьому процесі)
         """
         self.excel_reader = excel_reader
         self.db_manager = db_manager
+        self.max_workers = max_workers
+        self._data_names = None  # Унікальні ПІБ з аркуша Data (для валідації)
         self.stats = {
             "servicemembers": 0,
             "service_records": 0,
@@ -32,32 +149,44 @@ class DataMigration:
             "errors": 0
         }
 
-    def migrate_full_database(self) -> Dict[str, int]:
+    def migrate_full_database(self, progress_callback: Callable[[int, int, str], None] = None) -> Dict[str, int]:
         """
         Повна міграція всіх аркушів Excel → БД
 
+        Аркуші Data та періодів парсяться паралельно в процесах-воркерах,
+        вставку робить один записувач (це з'єднання) по мірі готовності.
+
+        Args:
+            progress_callback: Функція (current, total, message) для прогресу
+
         Returns:
             Статистика: {"servicemembers": 1594, "service_records": 22125, ...}
         """
+        def report(step: int, message: str):
+            if progress_callback:
+                progress_callback(step, 4, message)
+
         print("=" * 60)
         print("ПОЧАТОК МІГРАЦІЇ ДАНИХ З EXCEL В БД")
         print("=" * 60)
 
-        # Phase 1: Міграція аркуша "Data"
-        print("\n[1/4] Міграція аркуша 'Data'...")
-        self._migrate_data_sheet()
-
-        # Phase 2: Міграція аркушів періодів (100% та 30%)
-        print("\n[2/4] Міграція аркушів періодів...")
-        self._migrate_period_sheets()
+        # Phase 1-2: Парсинг аркушів (паралельно) та вставка
+        workers = self._get_worker_count()
+        if workers > 1:
+            self._migrate_sheets_parallel(workers, report)
+        else:
+            self._migrate_sheets_serial(report)
 
         # Phase 3: Ініціалізація sync_metadata
         print("\n[3/4] Ініціалізація метаданих синхронізації...")
+        report(2, "Ініціалізація метаданих синхронізації...")
         self._init_sync_metadata()
 
         # Phase 4: Валідація
         print("\n[4/4] Валідація міграції...")
+        report(3, "Валідація міграції...")
         validation_result = self.validate_migration()
+        report(4, "Міграцію завершено")
 
         print("\n" + "=" * 60)
         print("МІГРАЦІЯ ЗАВЕРШЕНА")
@@ -73,6 +202,83 @@ class DataMigration:
 
         return self.db_manager.get_record_count()
 
+    def _get_worker_count(self) -> int:
+        """
+        Кількість процесів для парсингу аркушів
+
+        Returns:
+            1 - послідовний парсинг в цьому процесі
+        """
+        workers = self.max_workers or os.cpu_count() or 1
+        return max(1, min(workers, 1 + len(PERIOD_SHEETS)))
+
+    def _migrate_sheets_serial(self, report: Callable[[int, str], None]):
+        """
+        Послідовний парсинг та вставка аркушів у цьому процесі
+        """
+        print("\n[1/4] Міграція аркуша 'Data'...")
+        report(0, "Міграція аркуша Data...")
+        self._migrate_data_sheet()
+
+        print("\n[2/4] Міграція аркушів періодів...")
+        report(1, "Міграція аркушів періодів...")
+        self._migrate_period_sheets()
+
+    def _migrate_sheets_parallel(self, workers: int, report: Callable[[int, str], None]):
+        """
+        Паралельний парсинг аркушів у пулі процесів, вставка - в цьому процесі
+
+        Data вставляється першою (аркушам періодів потрібні servicemember_id),
+        далі аркуші періодів у фіксованому порядку - вміст БД такий самий,
+        як при послідовній міграції.
+        """
+        file_path = self.excel_reader.file_path
+        if not self.excel_reader.sheetnames:
+            self.excel_reader.load_workbook()
+
+        print(f"\n[1/4] Міграція аркуша 'Data' (парсинг аркушів у {workers} процесах)...")
+        report(0, "Міграція аркуша Data...")
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                data_future = executor.submit(parse_sheet_in_worker, file_path, "Data")
+                period_futures = [
+                    (sheet_name, period_type, executor.submit(parse_sheet_in_worker, file_path, sheet_name))
+                    for sheet_name, period_type in PERIOD_SHEETS
+                    if sheet_name in self.excel_reader.sheetnames
+                ]
+
+                data_rows = data_future.result()
+                self._insert_data_rows(data_rows)
+                del data_rows
+
+                print("\n[2/4] Міграція аркушів періодів...")
+                report(1, "Міграція аркушів періодів...")
+                self._skip_missing_period_sheets()
+                name_to_id = self._get_name_to_id()
+                for sheet_name, period_type, future in period_futures:
+                    print(f"  Обробка аркуша '{sheet_name}'...")
+                    self._insert_period_entries(period_type, future.result(), name_to_id)
+
+        except BrokenProcessPool as e:
+            # Пул процесів недоступний - мігруємо послідовно з чистого стану
+            print(f"[ERROR] Пул процесів зупинився, продовжуємо послідовно: {e}")
+            self._reset_migrated_data()
+            self._migrate_sheets_serial(report)
+            return
+
+        self._count_parsed_periods()
+
+    def _reset_migrated_data(self):
+        """Видаляє частково мігровані дані та скидає статистику вставки"""
+        with self.db_manager.transaction():
+            cursor = self.db_manager.connection.cursor()
+            cursor.execute("DELETE FROM servicemembers")  # Каскадно: записи, періоди, кеш
+            cursor.execute("DELETE FROM dirty_servicemembers")
+
+        for key in ("servicemembers", "service_records", "periods_100", "periods_30", "parsed_periods", "errors"):
+            self.stats[key] = 0
+
     def _migrate_data_sheet(self):
         """
         Міграція аркуша "Data" → servicemembers + service_records
@@ -83,14 +289,23 @@ class DataMigration:
         2. Групуємо в batch по 500 рядків
         3. Використовуємо executemany для швидкого вставлення
         """
-        # Отримати всі дані з аркуша Data
-        data_rows = self.excel_reader.get_sheet_data("Data")
+        self._insert_data_rows(data_sheet_rows(self.excel_reader))
+
+    def _insert_data_rows(self, data_rows: List[Tuple]):
+        """
+        Вставка рядків аркуша Data (результат data_sheet_rows)
+
+        Args:
+            data_rows: Кортежі рядків Data
+        """
         print(f"  Знайдено {len(data_rows)} рядків в аркуші Data")
 
         cursor = self.db_manager.connection.cursor()
 
         # Відстежування унікальних ПІБ
-        seen_names = {}  # name -> (id, rank, position)
+        seen_names = {}  # name -> id
+        # Ключі записів (повторні рядки Data - без ключа, як при міграції record_key)
+        seen_keys = set()  # (id, month, record_key)
 
         # Batch для service_records
         service_records_batch = []
@@ -100,7 +315,7 @@ class DataMigration:
             if i % 5000 == 0:
                 print(f"  Оброблено {i}/{len(data_rows)} рядків...")
 
-            name = row.get("name")
+            name = row[0]
             if not name:
                 continue
 
@@ -108,15 +323,16 @@ class DataMigration:
                 # Створити servicemember якщо ще не існує
                 if name not in seen_names:
                     cursor.execute("""
-                        INSERT INTO servicemembers (name, rank, position, rnokpp, unit, birth_date)
-                        VALUES (?, ?, ?, ?, ?, ?)
+                        INSERT INTO servicemembers (name, name_key, rank, position, rnokpp, unit, birth_date)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
                     """, (
                         name,
-                        row.get("rank"),
-                        row.get("position"),
-                        row.get("rnokpp"),
-                        row.get("unit"),
-                        row.get("birth_date")
+                        normalize_name(name),
+                        row[3],  # rank
+                        row[4],  # position
+                        row[5],  # rnokpp
+                        row[2],  # unit
+                        row[6]   # birth_date
                     ))
                     sm_id = cursor.lastrowid
                     seen_names[name] = sm_id
@@ -125,34 +341,18 @@ class DataMigration:
                     sm_id = seen_names[name]
 
                 # Додати service_record в batch
-                service_records_batch.append((
-                    sm_id,
-                    row.get("month"),
-                    row.get("unit"),
-                    row.get("rank"),
-                    row.get("position"),
-                    row.get("rnokpp"),
-                    row.get("birth_date"),
-                    row.get("start_100"),
-                    row.get("end_100"),
-                    row.get("start_30"),
-                    row.get("end_30"),
-                    row.get("start_non"),
-                    row.get("end_non"),
-                    row.get("status"),
-                    None  # excel_row_number
-                ))
+                # (month..status, excel_row_number, *_ord, record_key)
+                record_key = self.db_manager.record_key(row[7:13], row[14:20])
+                if (sm_id, row[1], record_key) in seen_keys:
+                    record_key = None
+                else:
+                    seen_keys.add((sm_id, row[1], record_key))
+                service_records_batch.append((sm_id, *row[1:14], None, *row[14:], record_key))
                 self.stats["service_records"] += 1
 
                 # Коли batch заповнений - вставляємо
                 if len(service_records_batch) >= BATCH_SIZE:
-                    cursor.executemany("""
-                        INSERT INTO service_records
-                        (servicemember_id, month, unit, rank, position, rnokpp, birth_date,
-                         start_100, end_100, start_30, end_30, start_non, end_non, status, excel_row_number)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, service_records_batch)
-                    self.db_manager.connection.commit()
+                    self._insert_service_records(cursor, service_records_batch)
                     service_records_batch = []
 
             except Exception as e:
@@ -161,17 +361,32 @@ class DataMigration:
 
         # Вставити залишок batch
         if service_records_batch:
-            cursor.executemany("""
-                INSERT INTO service_records
-                (servicemember_id, month, unit, rank, position, rnokpp, birth_date,
-                 start_100, end_100, start_30, end_30, start_non, end_non, status, excel_row_number)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, service_records_batch)
-            self.db_manager.connection.commit()
+            self._insert_service_records(cursor, service_records_batch)
+
+        self._data_names = {row[0] for row in data_rows if row[0]}
 
         print(f"  [OK] Мігровано {self.stats['servicemembers']} військовослужбовців")
         print(f"  [OK] Мігровано {self.stats['service_records']} записів")
 
+    def _insert_service_records(self, cursor, batch: List[Tuple]):
+        """
+        Вставка пачки service_records та commit
+
+        Тригер mark_dirty_on_service_insert позначає осіб для перерахунку з колонок
+        дат Data; міграція бере періоди з аркушів періодів, тому позначки знімаються
+        в тій самій транзакції (інакше recalculate_dirty() перезаписав би їх)
+        """
+        cursor.executemany("""
+            INSERT INTO service_records
+            (servicemember_id, month, unit, rank, position, rnokpp, birth_date,
+             start_100, end_100, start_30, end_30, start_non, end_non, status, excel_row_number,
+             start_100_ord, end_100_ord, start_30_ord, end_30_ord, start_non_ord, end_non_ord,
+             record_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, batch)
+        cursor.execute("DELETE FROM dirty_servicemembers")
+        self.db_manager.connection.commit()
+
     def _migrate_period_sheets(self):
         """
         Міграція аркушів "Періоди на 100" та "Періоди на 30" → parsed_periods + periods
@@ -181,89 +396,91 @@ class DataMigration:
         Аркуші періодів мають правильний текстовий формат:
           "з DD.MM.YYYY по DD.MM.YYYY"
         """
-        cursor = self.db_manager.connection.cursor()
+        self._skip_missing_period_sheets()
+        name_to_id = self._get_name_to_id()
 
-        # Отримати словник servicemember_id по імені
-        cursor.execute("SELECT id, name FROM servicemembers")
-        name_to_id = {row[1]: row[0] for row in cursor.fetchall()}
-
-        # Обробка аркушів
-        sheets_config = [
-            ("Періоди на 100", "100"),
-            ("Періоди на 30", "30"),
-        ]
-
-        for sheet_name, period_type in sheets_config:
-            if sheet_name not in self.excel_reader.workbook.sheetnames:
-                print(f"  [SKIP] Аркуш '{sheet_name}' не знайдено")
+        for sheet_name, period_type in PERIOD_SHEETS:
+            if sheet_name not in self.excel_reader.sheetnames:
                 continue
 
             print(f"  Обробка аркуша '{sheet_name}'...")
+            entries = period_sheet_entries(self.excel_reader, sheet_name)
+            self._insert_period_entries(period_type, entries, name_to_id)
 
-            # Отримати дані з аркуша
-            sheet_data = self.excel_reader.get_sheet_data(sheet_name)
+        self._count_parsed_periods()
 
-            # Агрегувати періоди по військовослужбовцях
-            # {name: [period_text1, period_text2, ...]}
-            aggregated = {}
-            for row in sheet_data:
-                name = row.get("name")
-                periods_text = row.get("periods")
-
-                if name and periods_text:
-                    if name not in aggregated:
-                        aggregated[name] = []
-                    aggregated[name].append(periods_text)
+    def _skip_missing_period_sheets(self):
+        """Повідомляє про відсутні аркуші періодів"""
+        for sheet_name, _ in PERIOD_SHEETS:
+            if sheet_name not in self.excel_reader.sheetnames:
+                print(f"  [SKIP] Аркуш '{sheet_name}' не знайдено")
 
-            print(f"    Знайдено {len(aggregated)} військовослужбовців з періодами")
+    def _get_name_to_id(self) -> Dict[str, int]:
+        """
+        Словник servicemember_id по імені та по ключу normalize_name
+        (ПІБ в аркушах періодів можуть відрізнятися регістром / апострофом)
 
-            # Для кожного військовослужбовця парсимо та зберігаємо
-            saved_count = 0
-            for name, periods_list in aggregated.items():
-                sm_id = name_to_id.get(name)
-                if not sm_id:
-                    # Спробувати знайти схоже ім'я
-                    continue
+        Returns:
+            {ПІБ: id, normalize_name(ПІБ): id} - точні імена мають пріоритет
+        """
+        cursor = self.db_manager.connection.cursor()
+        cursor.execute("SELECT id, name, name_key FROM servicemembers ORDER BY id")
+        rows = cursor.fetchall()
 
-                # Об'єднати всі періоди в один текст
-                all_periods_text = "\n".join(periods_list)
+        name_to_id = {row[1]: row[0] for row in rows}
+        for sm_id, _, name_key in rows:
+            if name_key:
+                name_to_id.setdefault(name_key, sm_id)
+        return name_to_id
 
-                # Парсити через DataProcessor
-                parsed = DataProcessor.parse_periods(all_periods_text)
+    def _insert_period_entries(self, period_type: str, entries: List[Tuple], name_to_id: Dict[str, int]):
+        """
+        Вставка періодів аркуша (результат period_sheet_entries)
 
-                if not parsed:
-                    continue
+        Args:
+            period_type: "100" або "30"
+            entries: Кортежі (name, [(start_iso, end_iso), ...], текст періодів)
+            name_to_id: {ПІБ або ключ ПІБ: servicemember_id} (результат _get_name_to_id)
+        """
+        cursor = self.db_manager.connection.cursor()
 
-                # Злити послідовні періоди
-                merged = DataProcessor.merge_consecutive_periods(parsed)
+        print(f"    Знайдено {len(entries)} військовослужбовців з періодами")
 
-                # Зберегти кожен період в parsed_periods
-                for start_date, end_date in merged:
-                    cursor.execute("""
-                        INSERT INTO parsed_periods (servicemember_id, period_type, start_date, end_date)
-                        VALUES (?, ?, ?, ?)
-                    """, (sm_id, period_type, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")))
+        # Для кожного військовослужбовця зберігаємо розпарсені періоди
+        saved_count = 0
+        for name, merged, formatted_text in entries:
+            sm_id = name_to_id.get(name) or name_to_id.get(normalize_name(name))
+            if not sm_id or not merged:
+                continue
 
-                # Сформувати текстове представлення для periods таблиці
-                formatted_text = DataProcessor.format_periods_for_document(merged)
+            # Зберегти кожен період в parsed_periods
+            cursor.executemany("""
+                INSERT INTO parsed_periods (servicemember_id, period_type, start_date, end_date)
+                VALUES (?, ?, ?, ?)
+            """, [(sm_id, period_type, start_date, end_date) for start_date, end_date in merged])
 
-                # Зберегти в periods
-                cursor.execute("""
-                    INSERT OR REPLACE INTO periods (servicemember_id, period_type, period_text)
-                    VALUES (?, ?, ?)
-                """, (sm_id, period_type, formatted_text))
+            # Зберегти в periods
+            cursor.execute("""
+                INSERT INTO periods (servicemember_id, period_type, period_text)
+                VALUES (?, ?, ?)
+                ON CONFLICT(servicemember_id, period_type) DO UPDATE SET
+                    period_text = excluded.period_text,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (sm_id, period_type, formatted_text))
 
-                saved_count += 1
+            saved_count += 1
 
-                if period_type == "100":
-                    self.stats["periods_100"] += 1
-                else:
-                    self.stats["periods_30"] += 1
+            if period_type == "100":
+                self.stats["periods_100"] += 1
+            else:
+                self.stats["periods_30"] += 1
 
-            self.db_manager.connection.commit()
-            print(f"    [OK] Збережено періоди для {saved_count} військовослужбовців")
+        self.db_manager.connection.commit()
+        print(f"    [OK] Збережено періоди для {saved_count} військовослужбовців")
 
-        # Підрахунок parsed_periods
+    def _count_parsed_periods(self):
+        """Підрахунок parsed_periods"""
+        cursor = self.db_manager.connection.cursor()
         cursor.execute("SELECT COUNT(*) FROM parsed_periods")
         self.stats["parsed_periods"] = cursor.fetchone()[0]
 
@@ -274,35 +491,32 @@ class DataMigration:
         Розрахунок та збереження періодів для всіх військовослужбовців
 
         Логіка:
-        1. Отримати всіх servicemembers
-        2. Для кожного розрахувати періоди
-        3. Зберегти в periods та parsed_periods
+        1. Одним запитом прочитати всі service_records
+        2. Злити періоди в пам'яті
+        3. Зберегти в periods та parsed_periods (одна транзакція)
         """
-        servicemembers = self.db_manager.get_all_servicemembers()
-        print(f"  Розрахунок періодів для {len(servicemembers)} військовослужбовців...")
-
-        for i, sm in enumerate(servicemembers, 1):
-            if i % 100 == 0:
-                print(f"  Оброблено {i}/{len(servicemembers)}...")
-
-            try:
-                self.db_manager.calculate_and_store_periods(sm["id"])
-
-                # Підрахунок статистики
-                periods_100 = self.db_manager.get_periods(sm["id"], "100")
-                periods_30 = self.db_manager.get_periods(sm["id"], "30")
+        def report_progress(current, total, message):
+            print(f"  {message}...")
 
-                if periods_100:
-                    self.stats["periods_100"] += 1
-                if periods_30:
-                    self.stats["periods_30"] += 1
+        try:
+            total = self.db_manager.recalculate_all_periods(progress_callback=report_progress)
+            print(f"  Розраховано періоди для {total} військовослужбовців")
+        except Exception as e:
+            print(f"  [ERROR] Помилка при розрахунку періодів: {e}")
+            self.stats["errors"] += 1
 
-            except Exception as e:
-                print(f"  [ERROR] Помилка при розрахунку періодів для {sm['name']}: {e}")
-                self.stats["errors"] += 1
+        # Підрахунок статистики
+        cursor = self.db_manager.connection.cursor()
+        cursor.execute("""
+            SELECT period_type, COUNT(DISTINCT servicemember_id)
+            FROM periods
+            WHERE period_type IN ('100', '30')
+            GROUP BY period_type
+        """)
+        for period_type, count in cursor.fetchall():
+            self.stats[f"periods_{period_type}"] += count
 
         # Підрахунок parsed_periods
-        cursor = self.db_manager.connection.cursor()
         cursor.execute("SELECT COUNT(*) FROM parsed_periods")
         self.stats["parsed_periods"] = cursor.fetchone()[0]
 
@@ -348,7 +562,10 @@ class DataMigration:
         """
         try:
             # 1. Порівняти кількість унікальних ПІБ
-            excel_names = set(self.excel_reader.get_unique_names("Data"))
+            if self._data_names is not None:
+                excel_names = self._data_names
+            else:
+                excel_names = set(self.excel_reader.get_unique_names("Data"))
             db_names = set(self.db_manager.get_unique_names())
 
             print(f"  Excel унікальних ПІБ: {len(excel_names)}")
@@ -413,6 +630,12 @@ class DataMigration:
             if orphans:
                 print(f"  [WARN] Знайдено {len(orphans)} службовців без записів")
 
+            # 4. Періоди з аркушів періодів не повинні чекати перерахунку з Data
+            dirty_count = self.db_manager.get_dirty_count()
+            if dirty_count:
+                print(f"  [ERROR] Після міграції {dirty_count} осіб позначено для перерахунку періодів")
+                return False
+
             return True
 
         except Exception as e:
@@ -0,0 +1,232 @@
+"""
+Пакетне злиття періодів над цілими порядковими номерами днів (NumPy)
+
+Періоди багатьох військовослужбовців зливаються за один прохід:
+сортування (lexsort) + diff (+ накопичувальний максимум для перетинів).
+
+Режими:
+- merge_overlapping=False (за замовчуванням) - результат ідентичний
+  DataProcessor.merge_consecutive_periods: зливаються тільки періоди,
+  де наступний починається на наступний день після кінця попереднього
+- merge_overlapping=True - зливаються також періоди, що перетинаються
+  (об'єднання інтервалів)
+
+Якщо NumPy недоступний - використовується еквівалентна реалізація на Python.
+"""
+from datetime import date
+from typing import Dict, Hashable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - збірка без NumPy
+    np = None
+
+
+Period = Tuple[date, date]
+
+# Зсув між групами для сегментованого накопичувального максимуму
+# (порядковий номер дати < 2**22, тому групи не перетинаються)
+_GROUP_STRIDE = 1 << 23
+
+
+def merge_periods(periods: List[Period], merge_overlapping: bool = False) -> List[Period]:
+    """
+    Злити періоди одного військовослужбовця
+
+    Args:
+        periods: Список кортежів (start_date, end_date)
+        merge_overlapping: Зливати також періоди, що перетинаються
+
+    Returns:
+        Список злитих періодів
+    """
+    return merge_periods_bulk({None: periods}, merge_overlapping)[None]
+
+
+def merge_periods_bulk(
+    groups: Dict[Hashable, List[Period]],
+    merge_overlapping: bool = False
+) -> Dict[Hashable, List[Period]]:
+    """
+    Злити періоди для багатьох груп (наприклад, військовослужбовців) одночасно
+
+    Args:
+        groups: {ключ: [(start_date, end_date), ...]}
+        merge_overlapping: Зливати також періоди, що перетинаються
+
+    Returns:
+        {ключ: [злиті періоди]} - для кожного ключа з groups (порожній список якщо періодів немає)
+    """
+    if np is None:
+        return {
+            key: _merge_python(periods, merge_overlapping)
+            for key, periods in groups.items()
+        }
+
+    keys = list(groups)
+    counts = [len(groups[key]) for key in keys]
+    flat = [day.toordinal() for key in keys for period in groups[key] for day in period]
+    return _merge_flat(keys, counts, flat, merge_overlapping)
+
+
+def merge_ordinal_periods_bulk(
+    groups: Dict[Hashable, List[Tuple[int, int]]],
+    merge_overlapping: bool = False
+) -> Dict[Hashable, List[Period]]:
+    """
+    Те ж, що merge_periods_bulk, але періоди задані порядковими номерами днів
+
+    Використовується для колонок *_ord у service_records - дати не парсяться,
+    в date перетворюються тільки злиті періоди.
+
+    Args:
+        groups: {ключ: [(start_ordinal, end_ordinal), ...]}
+        merge_overlapping: Зливати також періоди, що перетинаються
+
+    Returns:
+        {ключ: [злиті періоди (date, date)]}
+    """
+    if np is None:
+        fromordinal = date.fromordinal
+        return {
+            key: _merge_python(
+                [(fromordinal(start), fromordinal(end)) for start, end in periods],
+                merge_overlapping
+            )
+            for key, periods in groups.items()
+        }
+
+    keys = list(groups)
+    counts = [len(groups[key]) for key in keys]
+    flat = [day for key in keys for period in groups[key] for day in period]
+    return _merge_flat(keys, counts, flat, merge_overlapping)
+
+
+def _merge_flat(keys: List[Hashable], counts: List[int], flat: List[int],
+                merge_overlapping: bool) -> Dict[Hashable, List[Period]]:
+    """
+    Злиття над плоским списком [start, end, start, end, ...] порядкових номерів
+
+    Args:
+        keys: Ключі груп
+        counts: Кількість періодів у кожній групі (в порядку keys)
+        flat: Порядкові номери днів початків та кінців
+        merge_overlapping: Зливати також періоди, що перетинаються
+
+    Returns:
+        {ключ: [злиті періоди (date, date)]}
+    """
+    result = {key: [] for key in keys}
+
+    total = sum(counts)
+    if total == 0:
+        return result
+
+    # Плоскі масиви: номер групи, початок, кінець (порядкові номери днів)
+    group_codes = np.repeat(np.arange(len(keys), dtype=np.int32), counts)
+    ordinals = np.array(flat, dtype=np.int32).reshape(total, 2)
+    starts = ordinals[:, 0]
+    ends = ordinals[:, 1]
+
+    merged_codes, merged_starts, merged_ends = merge_ordinals(group_codes, starts, ends, merge_overlapping)
+
+    # Однакові порядкові номери перетворюються в date один раз
+    fromordinal = date.fromordinal
+    unique_days, inverse = np.unique(np.concatenate((merged_starts, merged_ends)), return_inverse=True)
+    days = [fromordinal(day) for day in unique_days.tolist()]
+    merged_count = len(merged_starts)
+    start_days = inverse[:merged_count].tolist()
+    end_days = inverse[merged_count:].tolist()
+
+    for code, start, end in zip(merged_codes.tolist(), start_days, end_days):
+        result[keys[code]].append((days[start], days[end]))
+
+    return result
+
+
+def merge_ordinals(group_codes, starts, ends, merge_overlapping: bool = False):
+    """
+    Злиття періодів, заданих масивами порядкових номерів днів (потрібен NumPy)
+
+    Args:
+        group_codes: Масив номерів груп (наприклад, servicemember_id)
+        starts: Масив початків (date.toordinal())
+        ends: Масив кінців (date.toordinal())
+        merge_overlapping: Зливати також періоди, що перетинаються
+
+    Returns:
+        (номери груп, початки, кінці) злитих періодів, відсортовані по групі та початку
+    """
+    group_codes = np.asarray(group_codes)
+    starts = np.asarray(starts, dtype=np.int32)
+    ends = np.asarray(ends, dtype=np.int32)
+
+    total = len(starts)
+    if total == 0:
+        return group_codes[:0], starts[:0], ends[:0]
+
+    # Стабільне сортування: група, потім початок, потім вихідний порядок
+    order = np.lexsort((np.arange(total), starts, group_codes))
+    group_codes = group_codes[order]
+    starts = starts[order]
+    ends = ends[order]
+
+    # Початок нової групи злиття
+    new_group = np.empty(total, dtype=bool)
+    new_group[0] = True
+    same_member = group_codes[1:] == group_codes[:-1]
+
+    if merge_overlapping:
+        # Сегментований накопичувальний максимум кінців
+        _, dense_codes = np.unique(group_codes, return_inverse=True)
+        offset = dense_codes.astype(np.int64) * _GROUP_STRIDE
+        running_end = np.maximum.accumulate(ends.astype(np.int64) + offset) - offset
+        new_group[1:] = ~same_member | (starts[1:].astype(np.int64) > running_end[:-1] + 1)
+        last_in_group = np.append(np.flatnonzero(new_group[1:]), total - 1)
+        merged_ends = running_end[last_in_group]
+    else:
+        # Як у merge_consecutive_periods: тільки start == попередній end + 1
+        new_group[1:] = ~same_member | (starts[1:] != ends[:-1] + 1)
+        last_in_group = np.append(np.flatnonzero(new_group[1:]), total - 1)
+        merged_ends = ends[last_in_group]
+
+    first_in_group = np.flatnonzero(new_group)
+    return group_codes[first_in_group], starts[first_in_group], merged_ends
+
+
+def _merge_python(periods: List[Period], merge_overlapping: bool) -> List[Period]:
+    """Реалізація на Python (без NumPy) з тією ж семантикою"""
+    if not periods:
+        return []
+
+    sorted_periods = sorted(periods, key=lambda x: x[0])
+
+    merged = []
+    current_start, current_end = sorted_periods[0]
+    current_last = current_end.toordinal()
+    current_max = current_last
+
+    for next_start, next_end in sorted_periods[1:]:
+        start_ordinal = next_start.toordinal()
+        end_ordinal = next_end.toordinal()
+
+        if merge_overlapping:
+            joined = start_ordinal <= current_max + 1
+        else:
+            joined = start_ordinal == current_last + 1
+
+        if joined:
+            current_last = end_ordinal
+            current_max = max(current_max, end_ordinal)
+        else:
+            merged.append((current_start, _end_date(current_last, current_max, merge_overlapping)))
+            current_start = next_start
+            current_last = current_max = end_ordinal
+
+    merged.append((current_start, _end_date(current_last, current_max, merge_overlapping)))
+    return merged
+
+
+def _end_date(last_ordinal: int, max_ordinal: int, merge_overlapping: bool) -> date:
+    """Кінець злитого періоду: максимум (перетини) або кінець останнього (послідовні)"""
+    return date.fromordinal(max_ordinal if merge_overlapping else last_ordinal)
@@ -2,10 +2,25 @@
 Генерація Word документів на основі шаблонів
 """
 from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from copy import deepcopy
 from datetime import datetime
+import io
 import os
 import re
-from typing import Dict, List, Tuple
+import threading
+import zipfile
+from typing import Dict, List, Tuple, Optional
+
+
+# Патерн для пошуку періодів
+PERIOD_PATTERN = r'з\s+\d{2}\.\d{2}\.\d{4}\s+по\s+\d{2}\.\d{2}\.\d{4}'
+
+# Патерн MANUAL маркерів
+MANUAL_PATTERN = r'\{\{MANUAL:([^}]+)\}\}'
+
+_RPR_TAG = qn('w:rPr')
 
 
 class ReportGenerator:
@@ -13,30 +28,35 @@ class ReportGenerator:
     Клас для генерації Word документів
     """
 
-    def __init__(self, template_path: str):
+    def __init__(self, template_path: str, fast_writer: bool = True):
         """
         Ініціалізація генератора
 
         Args:
             template_path: Шлях до шаблону Word
+            fast_writer: Зберігати через швидкий запис document.xml (False - через python-docx)
         """
         self.template_path = template_path
+        self.fast_writer = fast_writer
 
         if not os.path.exists(template_path):
             raise FileNotFoundError(f"Шаблон не знайдено: {template_path}")
 
-    def find_manual_markers(self, doc: Document) -> List[str]:
+    def find_manual_markers(self, doc: Document = None) -> List[str]:
         """
         Знаходить всі MANUAL маркери в документі
 
         Args:
-            doc: Об'єкт Document
+            doc: Об'єкт Document (None - маркери скомпільованого шаблону)
 
         Returns:
             Список унікальних MANUAL маркерів
         """
+        if doc is None:
+            return list(get_compiled_template(self.template_path).manual_markers)
+
         markers = set()
-        pattern = r'\{\{MANUAL:([^}]+)\}\}'
+        pattern = MANUAL_PATTERN
 
         # Шукаємо в параграфах
         for paragraph in doc.paragraphs:
@@ -64,6 +84,34 @@ class ReportGenerator:
             data: Словник з даними для заміни
             manual_data: Словник з вручну введеними даними (для MANUAL маркерів)
         """
+        placeholders = self._build_placeholders(data, manual_data)
+
+        # Заміна в параграфах
+        for paragraph in doc.paragraphs:
+            self._replace_in_paragraph(paragraph, placeholders)
+
+        # Заміна в таблицях
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    for paragraph in cell.paragraphs:
+                        self._replace_in_paragraph(paragraph, placeholders)
+
+        # Після заміни всіх плейсхолдерів виділяємо періоди, ЖБД та громади
+        self._format_special_content(doc, data.get("zbd", ""), data.get("hromady", ""))
+
+    @staticmethod
+    def _build_placeholders(data: Dict, manual_data: Dict = None) -> Dict[str, str]:
+        """
+        Формує мапінг плейсхолдерів до даних
+
+        Args:
+            data: Словник з даними для заміни
+            manual_data: Словник з вручну введеними даними (для MANUAL маркерів)
+
+        Returns:
+            Словник {плейсхолдер: значення}
+        """
         if manual_data is None:
             manual_data = {}
 
@@ -106,21 +154,10 @@ class ReportGenerator:
             else:
                 placeholders[f"{{{{MANUAL:{key}}}}}"] = value
 
-        # Заміна в параграфах
-        for paragraph in doc.paragraphs:
-            self._replace_in_paragraph(paragraph, placeholders)
-
-        # Заміна в таблицях
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        self._replace_in_paragraph(paragraph, placeholders)
+        return placeholders
 
-        # Після заміни всіх плейсхолдерів виділяємо періоди, ЖБД та громади
-        self._format_special_content(doc, data.get("zbd", ""), data.get("hromady", ""))
-
-    def _replace_in_paragraph(self, paragraph, placeholders):
+    @staticmethod
+    def _replace_in_paragraph(paragraph, placeholders):
         """
         Заміняє плейсхолдери в параграфі, навіть якщо вони розбиті між runs
         """
@@ -159,8 +196,7 @@ class ReportGenerator:
             zbd_text: Текст ЖБД (підкреслення)
             hromady_text: Текст громад (жирний)
         """
-        # Патерн для пошуку періодів
-        period_pattern = r'з\s+\d{2}\.\d{2}\.\d{4}\s+по\s+\d{2}\.\d{2}\.\d{4}'
+        period_pattern = PERIOD_PATTERN
 
         # Обробляємо параграфи
         for paragraph in doc.paragraphs:
@@ -173,7 +209,8 @@ class ReportGenerator:
                     for paragraph in cell.paragraphs:
                         self._format_paragraph_content(paragraph, period_pattern, zbd_text, hromady_text)
 
-    def _format_paragraph_content(self, paragraph, period_pattern: str, zbd_text: str, hromady_text: str) -> None:
+    @staticmethod
+    def _format_paragraph_content(paragraph, period_pattern: str, zbd_text: str, hromady_text: str) -> None:
         """
         Форматує контент в одному параграфі
 
@@ -267,14 +304,12 @@ class ReportGenerator:
         Raises:
             Exception: Будь-яка помилка при генерації (шаблон, збереження, тощо)
         """
-        # Завантажуємо шаблон
-        doc = Document(self.template_path)
-
-        # Заміняємо плейсхолдери
-        self.replace_placeholders(doc, servicemember_data, manual_data)
-
-        # Зберігаємо документ
-        doc.save(output_path)
+        # Шаблон парситься один раз - далі тільки копія XML та заміна в проіндексованих параграфах
+        template = get_compiled_template(self.template_path)
+        if self.fast_writer:
+            template.render_fast(servicemember_data, output_path, manual_data)
+        else:
+            template.render(servicemember_data, output_path, manual_data)
 
         return True
 
@@ -318,3 +353,254 @@ class ReportGenerator:
                 error_count += 1
 
         return (success_count, error_count)
+
+
+class CompiledTemplate:
+    """
+    Попередньо скомпільований шаблон Word
+
+    Шаблон читається один раз, при компіляції індексуються параграфи з {{...}} маркерами.
+    Рендеринг відновлює тіло документа з закешованої копії XML і змінює тільки
+    проіндексовані параграфи - результат такий самий, як у ReportGenerator.replace_placeholders.
+    """
+
+    def __init__(self, template_path: str):
+        """
+        Компіляція шаблону
+
+        Args:
+            template_path: Шлях до шаблону Word
+        """
+        self.template_path = template_path
+        self.document = Document(template_path)
+        self._lock = threading.Lock()
+        self._document_member = self.document.part.partname.membername
+        self._package_prefix = None  # Архів без document.xml (для render_fast)
+
+        body = self.document.element.body
+        self._pristine_body = [deepcopy(child) for child in body]
+
+        positions = {p: i for i, p in enumerate(body.iter(qn('w:p')))}
+
+        # Параграфи в тому ж порядку, в якому їх обходить replace_placeholders:
+        # (позиція в body, текст, є маркер, можна замінювати по runs, є період)
+        self._slots = []
+        markers = set()
+
+        for paragraph in self._iter_paragraphs(self.document):
+            text = paragraph.text
+            has_marker = "{{" in text
+            runs_only = has_marker and text == "".join(run.text for run in paragraph.runs)
+            has_period = re.search(PERIOD_PATTERN, text) is not None
+
+            self._slots.append((positions[paragraph._p], text, has_marker, runs_only, has_period))
+            markers.update(re.findall(MANUAL_PATTERN, text))
+
+        self.manual_markers = sorted(markers)
+
+    @staticmethod
+    def _iter_paragraphs(doc: Document):
+        """Параграфи документа, потім параграфи клітинок таблиць"""
+        yield from doc.paragraphs
+
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    yield from cell.paragraphs
+
+    def render(self, servicemember_data: Dict, output_path: str, manual_data: Dict = None) -> None:
+        """
+        Рендерить рапорт і зберігає його через python-docx (Document.save)
+
+        Args:
+            servicemember_data: Словник з даними військовослужбовця
+            output_path: Шлях для збереження документу
+            manual_data: Словник з вручну введеними даними
+        """
+        with self._lock:
+            self._render_body(servicemember_data, manual_data)
+            self.document.save(output_path)
+
+    def render_fast(self, servicemember_data: Dict, output_path: str, manual_data: Dict = None) -> None:
+        """
+        Швидкий рендеринг: перезаписується тільки word/document.xml
+
+        Решта частин пакета береться з архіву, який python-docx один раз зберіг
+        при компіляції, і копіюється без повторного стиснення. Вміст частин
+        такий самий, як після render().
+
+        Args:
+            servicemember_data: Словник з даними військовослужбовця
+            output_path: Шлях для збереження документу
+            manual_data: Словник з вручну введеними даними
+        """
+        with self._lock:
+            if self._package_prefix is None:
+                self._package_prefix = self._build_package_prefix()
+
+            self._render_body(servicemember_data, manual_data)
+            document_xml = self.document.part.blob
+
+        buffer = io.BytesIO(self._package_prefix)
+        with zipfile.ZipFile(buffer, "a", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(self._document_member, document_xml)
+
+        with open(output_path, "wb") as f:
+            f.write(buffer.getvalue())
+
+    def _build_package_prefix(self) -> bytes:
+        """
+        Архів шаблону без word/document.xml у тому вигляді, як його пише python-docx
+
+        Викликається до першого рендерингу (тіло документа ще чисте).
+        """
+        saved = io.BytesIO()
+        self.document.save(saved)
+
+        prefix = io.BytesIO()
+        with zipfile.ZipFile(saved) as source, \
+                zipfile.ZipFile(prefix, "w", compression=zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                if info.filename != self._document_member:
+                    target.writestr(info, source.read(info))
+
+        return prefix.getvalue()
+
+    def _render_body(self, servicemember_data: Dict, manual_data: Dict = None) -> None:
+        """
+        Відновлює тіло документа з чистої копії та заповнює плейсхолдери
+
+        Викликається під self._lock.
+        """
+        placeholders = ReportGenerator._build_placeholders(servicemember_data, manual_data)
+        zbd_text = servicemember_data.get("zbd", "")
+        hromady_text = servicemember_data.get("hromady", "")
+        check_hromady = bool(hromady_text and hromady_text.strip())
+
+        # Відновлюємо тіло документа з чистої копії шаблону
+        body = self.document.element.body
+        for child in list(body):
+            body.remove(child)
+        for child in self._pristine_body:
+            body.append(deepcopy(child))
+
+        all_paragraphs = list(body.iter(qn('w:p')))
+        parent = self.document._body
+
+        # Заміна плейсхолдерів тільки в параграфах з маркерами
+        visited = set()
+        for position, text, has_marker, runs_only, _ in self._slots:
+            if not has_marker:
+                continue
+
+            paragraph = Paragraph(all_paragraphs[position], parent)
+            if runs_only:
+                # При першому зверненні текст параграфу збігається з текстом шаблону
+                self._replace_in_runs(paragraph, placeholders, None if position in visited else text)
+                visited.add(position)
+            else:
+                ReportGenerator._replace_in_paragraph(paragraph, placeholders)
+
+        # Виділення періодів та громад - там, де вони можуть бути
+        for position, text, has_marker, _, has_period in self._slots:
+            if has_marker or has_period or (check_hromady and hromady_text in text):
+                paragraph = Paragraph(all_paragraphs[position], parent)
+                ReportGenerator._format_paragraph_content(paragraph, PERIOD_PATTERN, zbd_text, hromady_text)
+
+    @staticmethod
+    def _replace_in_runs(paragraph, placeholders: Dict[str, str], full_text: str = None) -> None:
+        """
+        Заміна плейсхолдерів з одним читанням тексту параграфу
+
+        Аналог ReportGenerator._replace_in_paragraph для параграфів, текст яких
+        повністю складається з runs (без гіперпосилань тощо).
+
+        Args:
+            paragraph: Параграф для обробки
+            placeholders: Словник {плейсхолдер: значення}
+            full_text: Поточний текст параграфу, якщо відомий (None - прочитати)
+        """
+        if full_text is None:
+            full_text = paragraph.text
+        changed = False
+
+        for placeholder, value in placeholders.items():
+            if placeholder in full_text:
+                new_text = full_text.replace(placeholder, str(value))
+                if new_text != full_text:
+                    # Очищуємо подвійні пробіли
+                    full_text = re.sub(r'\s{2,}', ' ', new_text)
+                    changed = True
+
+        if changed:
+            # Очищаємо всі runs (форматування rPr зберігається), текст - у перший run
+            r_elements = paragraph._p.r_lst
+            for r in r_elements:
+                for child in list(r):
+                    if child.tag != _RPR_TAG:
+                        r.remove(child)
+            paragraph.runs[0].text = full_text
+
+# Скомпільовані шаблони (по одному на файл шаблону)
+_compiled_templates: Dict[Tuple[str, float], CompiledTemplate] = {}
+_compiled_templates_lock = threading.Lock()
+
+
+def get_compiled_template(template_path: str) -> CompiledTemplate:
+    """
+    Повертає скомпільований шаблон (компілює при першому зверненні або якщо файл змінився)
+
+    Args:
+        template_path: Шлях до шаблону Word
+
+    Returns:
+        Екземпляр CompiledTemplate
+    """
+    key = (os.path.abspath(template_path), os.path.getmtime(template_path))
+
+    with _compiled_templates_lock:
+        template = _compiled_templates.get(key)
+        if template is None:
+            # Прибираємо застарілі версії цього ж шаблону
+            for stale_key in [k for k in _compiled_templates if k[0] == key[0]]:
+                del _compiled_templates[stale_key]
+
+            template = CompiledTemplate(template_path)
+            _compiled_templates[key] = template
+
+    return template
+
+
+# Генератори, закешовані в процесі-воркері (по одному на шаблон)
+_worker_generators: Dict[str, ReportGenerator] = {}
+
+
+def render_report_jobs(template_path: str, jobs: List[Tuple[Dict, str, Dict]]) -> List[Optional[str]]:
+    """
+    Рендерить рапорти в окремому процесі (для ProcessPoolExecutor)
+
+    Функція рівня модуля - щоб її можна було передати у воркер (pickle).
+    Рапорти з однаковим output_path передаються одним списком і рендеряться
+    послідовно - результат такий самий, як при послідовній генерації.
+
+    Args:
+        template_path: Шлях до шаблону Word
+        jobs: Список (servicemember_data, output_path, manual_data)
+
+    Returns:
+        Список результатів у порядку jobs: None якщо успішно, інакше текст помилки
+    """
+    generator = _worker_generators.get(template_path)
+    if generator is None:
+        generator = ReportGenerator(template_path)
+        _worker_generators[template_path] = generator
+
+    results = []
+    for servicemember_data, output_path, manual_data in jobs:
+        try:
+            generator.generate_report(servicemember_data, output_path, manual_data)
+            results.append(None)
+        except Exception as e:
+            results.append(str(e))
+
+    return results
@@ -0,0 +1,357 @@
+"""
+Потокове читання аркушів XLSX без об'єктів клітинок openpyxl
+
+Файл xlsx - це zip-архів: аркуш (xl/worksheets/sheetN.xml) читається через
+iterparse рядок за рядком, рядки спільних рядків (sharedStrings.xml) та
+формати дат зі стилів (styles.xml) завантажуються один раз. Повертаються
+звичайні кортежі значень тільки для потрібних стовпців; оброблені XML-елементи
+одразу звільняються, тому пам'ять не росте з розміром аркуша.
+
+Значення ідентичні openpyxl (load_workbook(read_only=True, data_only=True),
+iter_rows(values_only=True)): числа int/float, дати datetime/time/timedelta
+за форматом стилю, bool, текст.
+"""
+import posixpath
+import zipfile
+from typing import Iterator, List, Optional, Sequence
+from xml.etree.ElementTree import iterparse, parse
+
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, WINDOWS_EPOCH, from_excel, from_ISO8601
+
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW_TAG = _MAIN_NS + "row"
+_CELL_TAG = _MAIN_NS + "c"
+_VALUE_TAG = _MAIN_NS + "v"
+_INLINE_TAG = _MAIN_NS + "is"
+_TEXT_TAG = _MAIN_NS + "t"
+_RUN_TAG = _MAIN_NS + "r"
+_SHARED_STRING_TAG = _MAIN_NS + "si"
+_SHEET_DATA_TAG = _MAIN_NS + "sheetData"
+_DIMENSION_TAG = _MAIN_NS + "dimension"
+
+
+class XlsxStreamReader:
+    """
+    Потоковий читач аркушів XLSX
+
+    Використання:
+        with XlsxStreamReader(path) as reader:
+            for row in reader.iter_rows("Data", min_row=4, columns=(0, 4, 27)):
+                ...
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Відкриває архів та читає перелік аркушів
+
+        Args:
+            file_path: Шлях до xlsx/xlsm файлу
+
+        Raises:
+            FileNotFoundError: Якщо файл не знайдено
+            Exception: Якщо файл не є коректним xlsx
+        """
+        self.file_path = file_path
+        self._zip = zipfile.ZipFile(file_path)
+        self._sheet_paths = {}  # {назва аркуша: шлях у архіві}
+        self._shared_strings_path = None
+        self._styles_path = None
+        self._epoch = WINDOWS_EPOCH
+
+        # Завантажуються при першому читанні аркуша
+        self._shared_strings = None
+        self._date_styles = None
+        self._timedelta_styles = None
+
+        try:
+            self._read_workbook()
+        except Exception:
+            self._zip.close()
+            raise
+
+    # ==================== Структура книги ====================
+
+    def _read_workbook(self):
+        """Читає workbook.xml та його зв'язки: аркуші, спільні рядки, стилі"""
+        targets = {}
+        rels_path = "xl/_rels/workbook.xml.rels"
+        if rels_path in self._zip.NameToInfo:
+            with self._zip.open(rels_path) as source:
+                for rel in parse(source).getroot().iter(_PACKAGE_REL_NS + "Relationship"):
+                    target = self._resolve_target(rel.get("Target"))
+                    rel_type = rel.get("Type", "")
+                    targets[rel.get("Id")] = target
+
+                    if rel_type.endswith("/sharedStrings"):
+                        self._shared_strings_path = target
+                    elif rel_type.endswith("/styles"):
+                        self._styles_path = target
+
+        with self._zip.open("xl/workbook.xml") as source:
+            root = parse(source).getroot()
+
+        properties = root.find(_MAIN_NS + "workbookPr")
+        if properties is not None and properties.get("date1904") in ("1", "true"):
+            self._epoch = CALENDAR_MAC_1904
+
+        for sheet in root.iter(_MAIN_NS + "sheet"):
+            target = targets.get(sheet.get(_REL_NS + "id"))
+            if target:
+                self._sheet_paths[sheet.get("name")] = target
+
+    @staticmethod
+    def _resolve_target(target: str) -> str:
+        """Шлях у архіві для Target з workbook.xml.rels"""
+        if target.startswith("/"):
+            return target[1:]
+        return posixpath.normpath(posixpath.join("xl", target))
+
+    @property
+    def sheetnames(self) -> List[str]:
+        """Назви аркушів у порядку книги"""
+        return list(self._sheet_paths)
+
+    def _load_shared_strings(self):
+        """Таблиця спільних рядків (текст без форматування, як у openpyxl)"""
+        strings = []
+        path = self._shared_strings_path
+        if path and path in self._zip.NameToInfo:
+            with self._zip.open(path) as source:
+                for _, element in iterparse(source):
+                    if element.tag == _SHARED_STRING_TAG:
+                        strings.append(self._element_text(element).replace("x005F_", ""))
+                        element.clear()
+        self._shared_strings = strings
+
+    def _load_styles(self):
+        """Індекси стилів клітинок з форматом дати/тривалості"""
+        date_styles = set()
+        timedelta_styles = set()
+
+        path = self._styles_path
+        if path and path in self._zip.NameToInfo:
+            with self._zip.open(path) as source:
+                root = parse(source).getroot()
+
+            custom_formats = {}
+            num_fmts = root.find(_MAIN_NS + "numFmts")
+            if num_fmts is not None:
+                for num_fmt in num_fmts.iter(_MAIN_NS + "numFmt"):
+                    custom_formats[int(num_fmt.get("numFmtId"))] = num_fmt.get("formatCode")
+
+            cell_xfs = root.find(_MAIN_NS + "cellXfs")
+            if cell_xfs is not None:
+                for index, xf in enumerate(cell_xfs.iter(_MAIN_NS + "xf")):
+                    num_fmt_id = int(xf.get("numFmtId", 0))
+                    fmt = custom_formats.get(num_fmt_id) or builtin_format_code(num_fmt_id)
+                    if fmt and is_date_format(fmt):
+                        date_styles.add(index)
+                    if fmt and is_timedelta_format(fmt):
+                        timedelta_styles.add(index)
+
+        self._date_styles = date_styles
+        self._timedelta_styles = timedelta_styles
+
+    @staticmethod
+    def _element_text(element) -> str:
+        """Текст <si>/<is>: <t> або <r><t> (фонетичні підказки <rPh> пропускаються)"""
+        snippets = []
+        for child in element:
+            if child.tag == _TEXT_TAG:
+                snippets.append(child.text or "")
+            elif child.tag == _RUN_TAG:
+                text = child.find(_TEXT_TAG)
+                if text is not None and text.text is not None:
+                    snippets.append(text.text)
+        return "".join(snippets)
+
+    # ==================== Читання рядків ====================
+
+    def iter_rows(self, sheet_name: str, min_row: int = 1,
+                  columns: Optional[Sequence[int]] = None) -> Iterator[tuple]:
+        """
+        Рядки аркуша як кортежі значень
+
+        Пропущені в XML рядки повертаються як порожні (як у openpyxl), тому
+        номер рядка = min_row + порядковий номер кортежу.
+
+        Args:
+            sheet_name: Назва аркуша
+            min_row: Перший рядок (1-based)
+            columns: Індекси стовпців (0-based) у потрібному порядку;
+                None - всі стовпці (ширина за <dimension> аркуша, як у openpyxl)
+
+        Yields:
+            Кортеж значень (для columns - завжди довжини len(columns))
+
+        Raises:
+            KeyError: Якщо аркуш не знайдено
+        """
+        if sheet_name not in self._sheet_paths:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+        if self._shared_strings is None:
+            self._load_shared_strings()
+        if self._date_styles is None:
+            self._load_styles()
+
+        if columns is not None:
+            positions = {column: position for position, column in enumerate(columns)}
+            empty_row = (None,) * len(columns)
+        else:
+            positions = None
+            empty_row = ()
+
+        next_row = min_row
+        with self._zip.open(self._sheet_paths[sheet_name]) as source:
+            sheet_data = None
+            row_counter = 0
+
+            for event, element in iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if element.tag == _SHEET_DATA_TAG:
+                        sheet_data = element
+                    elif element.tag == _DIMENSION_TAG and positions is None:
+                        # Ширина рядків - до останнього стовпця аркуша
+                        last_cell = element.get("ref", "").split(":")[-1]
+                        if last_cell[:1].isalpha():
+                            empty_row = (None,) * (_column_index(last_cell) + 1)
+                    continue
+
+                if element.tag != _ROW_TAG:
+                    continue
+
+                row_ref = element.get("r")
+                row_counter = int(row_ref) if row_ref else row_counter + 1
+
+                if row_counter >= min_row:
+                    # Пропущені рядки
+                    while next_row < row_counter:
+                        yield empty_row
+                        next_row += 1
+
+                    yield self._parse_row(element, positions, empty_row)
+                    next_row += 1
+
+                # Звільняємо оброблені рядки
+                if sheet_data is not None:
+                    sheet_data.clear()
+                else:
+                    element.clear()
+
+    def _parse_row(self, row_element, positions, empty_row) -> tuple:
+        """Значення клітинок рядка (тільки стовпці з positions, якщо задано)"""
+        values = list(empty_row)
+        column = -1
+
+        for cell in row_element:
+            if cell.tag != _CELL_TAG:
+                continue
+
+            ref = cell.get("r")
+            column = _column_index(ref) if ref else column + 1
+
+            if positions is not None:
+                position = positions.get(column)
+                if position is None:
+                    continue
+                values[position] = self._cell_value(cell)
+            else:
+                if column >= len(values):
+                    values.extend([None] * (column + 1 - len(values)))
+                values[column] = self._cell_value(cell)
+
+        return tuple(values)
+
+    def _cell_value(self, cell):
+        """Значення клітинки (семантика openpyxl data_only=True)"""
+        data_type = cell.get("t", "n")
+
+        if data_type == "inlineStr":
+            inline = cell.find(_INLINE_TAG)
+            return self._element_text(inline) if inline is not None else None
+
+        value = cell.findtext(_VALUE_TAG) or None
+        if value is None:
+            return None
+
+        if data_type == "n":
+            value = float(value) if ("." in value or "E" in value or "e" in value) else int(value)
+            style = cell.get("s")
+            if style and int(style) in self._date_styles:
+                try:
+                    return from_excel(value, self._epoch, timedelta=int(style) in self._timedelta_styles)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+
+        if data_type == "s":
+            return self._shared_strings[int(value)]
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return from_ISO8601(value)
+
+        # "str" (результат формули), "e" (помилка)
+        return value
+
+    # ==================== Закриття ====================
+
+    def close(self):
+        """Закрити архів"""
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Кеш: літери стовпця -> індекс (0-based)
+_COLUMN_INDEXES = {}
+
+
+def _column_index(ref: str) -> int:
+    """Індекс стовпця (0-based) з посилання клітинки ("AB12" -> 27)"""
+    letters = ref.rstrip("0123456789")
+    index = _COLUMN_INDEXES.get(letters)
+    if index is None:
+        index = 0
+        for char in letters:
+            index = index * 26 + (ord(char) - 64)
+        index -= 1
+        _COLUMN_INDEXES[letters] = index
+    return index
+
+
+def iter_sheet_rows(workbook, sheet_name: str, min_row: int = 1,
+                    columns: Optional[Sequence[int]] = None) -> Iterator[tuple]:
+    """
+    Рядки аркуша з XlsxStreamReader або книги openpyxl в однаковому форматі
+
+    Args:
+        workbook: XlsxStreamReader або openpyxl Workbook
+        sheet_name: Назва аркуша
+        min_row: Перший рядок (1-based)
+        columns: Індекси стовпців (0-based); None - всі стовпці;
+            від'ємний індекс - стовпець не обрано (завжди None)
+
+    Yields:
+        Кортежі значень
+    """
+    if isinstance(workbook, XlsxStreamReader):
+        yield from workbook.iter_rows(sheet_name, min_row=min_row, columns=columns)
+        return
+
+    for row in workbook[sheet_name].iter_rows(min_row=min_row, values_only=True):
+        if columns is None:
+            yield row
+        else:
+            width = len(row)
+            yield tuple(row[column] if 0 <= column < width else None for column in columns)
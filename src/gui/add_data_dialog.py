@@ -380,9 +380,7 @@ class AddDataDialog(QDialog):
             elif mode == "За підрозділом":
                 unit = self.mass_unit_combo.currentText()
                 if unit:
-                    unit_data = self.excel_reader.get_unit_data(unit, "Data")
-                    unique_names = set([row["name"] for row in unit_data if row.get("name")])
-                    count = len(unique_names)
+                    count = len(self.excel_reader.get_unit_names(unit, "Data"))
             elif mode == "Вручну":
                 count = len(self.mass_names_list.selectedItems())
         except:
@@ -420,8 +418,7 @@ class AddDataDialog(QDialog):
                 if not unit:
                     QMessageBox.warning(self, "Помилка", "Оберіть підрозділ!")
                     return
-                unit_data = self.excel_reader.get_unit_data(unit, "Data")
-                names = list(set([row["name"] for row in unit_data if row.get("name")]))
+                names = self.excel_reader.get_unit_names(unit, "Data")
             elif mode == "Вручну":
                 selected_items = self.mass_names_list.selectedItems()
                 if not selected_items:
@@ -6,11 +6,222 @@ from PySide6.QtWidgets import (
     QLineEdit, QPushButton, QComboBox, QMessageBox,
     QFileDialog, QGroupBox, QProgressDialog, QStackedWidget, QCheckBox, QWidget
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThread, Signal
 from openpyxl import load_workbook
-from datetime import datetime
+from datetime import date
+from itertools import groupby
 import os
+import time
 from utils.paths import get_base_dir
+from utils.date_utils import parse_date
+from core.database import DatabaseManager
+from core.xlsx_stream import XlsxStreamReader, iter_sheet_rows
+
+
+def format_date(date_value):
+    """
+    Форматує дату в DD.MM.YYYY
+    """
+    parsed = parse_date(date_value)
+    if parsed:
+        return parsed.strftime("%d.%m.%Y")
+
+    # Нерозпізнаний формат - зберігаємо як є
+    if isinstance(date_value, str):
+        return date_value
+    else:
+        return str(date_value) if date_value else None
+
+
+class ImportCancelled(Exception):
+    """Імпорт скасовано користувачем"""
+
+
+class _ImportThread(QThread):
+    """
+    Базовий потік імпорту: скасування та прогрес з обмеженою частотою
+    """
+    progress = Signal(int, int, str)  # (поточний, всього, повідомлення)
+    cancelled = Signal()
+    error = Signal(str)
+
+    PROGRESS_INTERVAL = 0.1  # Мінімальний інтервал між сигналами прогресу (секунди)
+
+    def __init__(self):
+        super().__init__()
+        self._cancel_requested = False
+        self._last_progress = 0.0
+
+    def cancel(self):
+        """Запит на скасування (перевіряється в потоці)"""
+        self._cancel_requested = True
+
+    def _report(self, current: int, total: int, message: str, force: bool = False):
+        """Надсилає прогрес не частіше PROGRESS_INTERVAL (force - завжди)"""
+        now = time.monotonic()
+        if force or now - self._last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress.emit(current, total, message)
+
+    def _check_cancelled(self):
+        """Перериває роботу потоку, якщо запитано скасування"""
+        if self._cancel_requested:
+            raise ImportCancelled()
+
+
+class ImportParseThread(_ImportThread):
+    """
+    Потік читання записів з файлів джерел (до трьох кроків: 100, 30, не залучення)
+    """
+    finished = Signal(list)  # записи для import_month_data
+
+    def __init__(self, steps):
+        """
+        Args:
+            steps: Список (step_key, step_label, workbook, sheet_name, columns), де
+                columns - індекси (0-based, -1 - не обрано) стовпців
+                ПІБ, підрозділ, звання, посада, початок, кінець
+        """
+        super().__init__()
+        self.steps = steps
+
+    def run(self):
+        try:
+            all_records = []
+            total_steps = len(self.steps)
+
+            for step_index, (step_key, step_label, workbook, sheet_name, columns) in enumerate(self.steps):
+                self._report(step_index, total_steps, f"Читання '{step_label}'...", force=True)
+
+                rows = iter_sheet_rows(workbook, sheet_name, min_row=2, columns=columns)
+                for row_index, row in enumerate(rows, 1):
+                    self._check_cancelled()
+                    all_records.extend(self._row_records(step_key, row))
+                    self._report(
+                        step_index, total_steps,
+                        f"Читання '{step_label}': {row_index} рядків, {len(all_records)} записів"
+                    )
+
+            self._report(total_steps, total_steps, f"Прочитано {len(all_records)} записів", force=True)
+            self.finished.emit(all_records)
+
+        except ImportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+    @staticmethod
+    def _row_records(step_key: str, row) -> list:
+        """Записи з одного рядка джерела (у клітинці може бути кілька періодів)"""
+        name_val, unit_val, rank_val, position_val, start_val, end_val = row
+
+        name = str(name_val) if name_val else None
+        if not name or name == "None":
+            return []
+
+        unit = str(unit_val) if unit_val else ""
+        rank = str(rank_val) if rank_val else ""
+        position = str(position_val) if position_val else ""
+
+        if not start_val or not end_val:
+            return []
+
+        # НОВА ЛОГІКА: Парсимо кілька періодів з однієї клітинки
+        # Формат: в клітинці може бути кілька рядків (Alt+Enter в Excel):
+        #   Початок:     Кінець:
+        #   01.08.2025   10.08.2025
+        #   17.08.2025   31.08.2025
+        # ВАЖЛИВО: openpyxl може повернути це як "01.08.2025\n17.08.2025"
+        #          або як "01.08.2025 17.08.2025" (через пробіл!)
+
+        start_str = str(start_val).strip()
+        end_str = str(end_val).strip()
+
+        # Розбиваємо по \n (переноси рядків) або по пробілах
+        # Якщо є \n - використовуємо його, інакше - пробіли
+        if '\n' in start_str:
+            start_dates = start_str.split('\n')
+        else:
+            start_dates = start_str.split()
+
+        if '\n' in end_str:
+            end_dates = end_str.split('\n')
+        else:
+            end_dates = end_str.split()
+
+        # Для кожної пари (початок, кінець) створюємо окремий запис
+        records = []
+        for start_date_str, end_date_str in zip(start_dates, end_dates):
+            start_date_str = start_date_str.strip()
+            end_date_str = end_date_str.strip()
+
+            if not start_date_str or not end_date_str:
+                continue
+
+            record = {
+                "name": name,
+                "unit": unit,
+                "rank": rank,
+                "position": position,
+                "start_100": None,
+                "end_100": None,
+                "start_30": None,
+                "end_30": None,
+                "start_non": None,
+                "end_non": None
+            }
+
+            record[f"start_{step_key}"] = format_date(start_date_str)
+            record[f"end_{step_key}"] = format_date(end_date_str)
+
+            records.append(record)
+
+        return records
+
+
+class MonthImportThread(_ImportThread):
+    """
+    Потік запису даних за місяць в БД (DatabaseManager.import_month_data)
+    Створює власне підключення до БД (SQLite threading); скасування відкочує транзакцію
+    """
+    finished = Signal(dict)  # статистика import_month_data
+
+    def __init__(self, db_path: str, connection_profile, month: str, records: list,
+                 replace_month: bool = False):
+        super().__init__()
+        self.db_path = db_path
+        self.connection_profile = connection_profile
+        self.month = month
+        self.records = records
+        self.replace_month = replace_month
+
+    def run(self):
+        db_manager = None
+        try:
+            db_manager = DatabaseManager(self.db_path, self.connection_profile)
+            db_manager.connect()
+
+            stats = db_manager.import_month_data(
+                self.month, self.records,
+                progress_callback=self._on_progress,
+                replace_month=self.replace_month
+            )
+            self.finished.emit(stats)
+
+        except ImportCancelled:
+            print("[WARNING] Імпорт скасовано, зміни відкочено")
+            self.cancelled.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            if db_manager:
+                db_manager.close()
+
+    def _on_progress(self, current: int, total: int, message: str):
+        """Callback import_month_data: прогрес + точка скасування (до commit)"""
+        if current < total:
+            self._check_cancelled()
+        self._report(current, total, message, force=current >= total)
 
 
 class ImportDataDialog(QDialog):
@@ -19,6 +230,11 @@ class ImportDataDialog(QDialog):
     АДАПТОВАНО: працює з ExcelReader або DatabaseManager
     """
 
+    # Читати файли джерел через XlsxStreamReader (False - openpyxl)
+    STREAMING_READER = True
+    # Масштаб QProgressDialog (прогрес потоків перераховується у 0..PROGRESS_SCALE)
+    PROGRESS_SCALE = 1000
+
     def __init__(self, data_source, use_database=False, parent=None):
         super().__init__(parent)
         self.data_source = data_source  # ExcelReader або DatabaseManager
@@ -68,6 +284,9 @@ class ImportDataDialog(QDialog):
         self.current_step = 0
         self.month = ""
 
+        self._worker = None  # Активний потік імпорту
+        self._progress = None  # QProgressDialog активного потоку
+
         self.init_ui()
 
     def init_ui(self):
@@ -285,11 +504,9 @@ class ImportDataDialog(QDialog):
             return
 
         try:
-            sheet = workbook[sheet_name]
-
             # Отримуємо заголовки з першого рядка
             headers = []
-            first_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), [])
+            first_row = next(iter_sheet_rows(workbook, sheet_name, min_row=1), [])
             for col_idx, cell in enumerate(first_row, 1):
                 col_letter = self.index_to_column_letter(col_idx)
                 header_text = str(cell) if cell else f"(Колонка {col_letter})"
@@ -373,7 +590,10 @@ class ImportDataDialog(QDialog):
                 # Спробуємо різні параметри для проблемних файлів
                 workbook = None
                 try:
-                    workbook = load_workbook(file_path, data_only=True)
+                    if self.STREAMING_READER:
+                        workbook = XlsxStreamReader(file_path)
+                    else:
+                        workbook = load_workbook(file_path, data_only=True)
                 except Exception:
                     try:
                         workbook = load_workbook(file_path, read_only=True, data_only=True)
@@ -464,10 +684,10 @@ class ImportDataDialog(QDialog):
             QMessageBox.warning(self, "Помилка", "Оберіть хоча б один тип періодів для імпорту!")
             return
 
-        # Збираємо дані з кожного кроку
+        # Збираємо налаштування кожного кроку
         # ЗМІНА: all_data тепер список записів, а не словник по іменах
         # Це дозволяє мати кілька записів для однієї людини з різними періодами
-        all_records = []
+        steps = []
 
         for step_key, step_label in [("100", "100 тис."), ("30", "30 тис."), ("non", "не залучення")]:
             if not self.step_data[step_key]["enabled"]:
@@ -482,8 +702,6 @@ class ImportDataDialog(QDialog):
                 QMessageBox.warning(self, "Помилка", f"Не обрано файл або аркуш для '{step_label}'!")
                 return
 
-            sheet = workbook[sheet_name]
-
             # Отримуємо мапінг стовпців з комбобоксів
             try:
                 unit_combo = getattr(self, f"unit_combo_{step_key}")
@@ -512,78 +730,73 @@ class ImportDataDialog(QDialog):
                 QMessageBox.critical(self, "Помилка", f"Помилка при отриманні колонок для '{step_label}': {str(e)}")
                 return
 
-            # Читаємо дані з файлу (індекси вже 1-based з currentData)
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                name = str(row[name_col - 1]) if name_col <= len(row) and row[name_col - 1] else None
-                if not name or name == "None":
-                    continue
-
-                unit = str(row[unit_col - 1]) if unit_col and unit_col <= len(row) and row[unit_col - 1] else ""
-                rank = str(row[rank_col - 1]) if rank_col and rank_col <= len(row) and row[rank_col - 1] else ""
-                position = str(row[position_col - 1]) if position_col and position_col <= len(row) and row[position_col - 1] else ""
-
-                # Отримуємо значення періодів
-                start_val = row[start_col - 1] if start_col <= len(row) else None
-                end_val = row[end_col - 1] if end_col <= len(row) else None
-
-                if not start_val or not end_val:
-                    continue
-
-                # НОВА ЛОГІКА: Парсимо кілька періодів з однієї клітинки
-                # Формат: в клітинці може бути кілька рядків (Alt+Enter в Excel):
-                #   Початок:     Кінець:
-                #   01.08.2025   10.08.2025
-                #   17.08.2025   31.08.2025
-                # ВАЖЛИВО: openpyxl може повернути це як "01.08.2025\n17.08.2025"
-                #          або як "01.08.2025 17.08.2025" (через пробіл!)
-
-                start_str = str(start_val).strip()
-                end_str = str(end_val).strip()
-
-                # Розбиваємо по \n (переноси рядків) або по пробілах
-                # Якщо є \n - використовуємо його, інакше - пробіли
-                if '\n' in start_str:
-                    start_dates = start_str.split('\n')
-                else:
-                    start_dates = start_str.split()
-
-                if '\n' in end_str:
-                    end_dates = end_str.split('\n')
-                else:
-                    end_dates = end_str.split()
-
-                # Для кожної пари (початок, кінець) створюємо окремий запис
-                for start_date_str, end_date_str in zip(start_dates, end_dates):
-                    start_date_str = start_date_str.strip()
-                    end_date_str = end_date_str.strip()
-
-                    if not start_date_str or not end_date_str:
-                        continue
+            # Читаються тільки обрані стовпці (індекси з currentData 1-based;
+            # необрані стовпці читаються як порожні)
+            columns = [
+                (col - 1) if col else -1
+                for col in (name_col, unit_col, rank_col, position_col, start_col, end_col)
+            ]
+            steps.append((step_key, step_label, workbook, sheet_name, columns))
 
-                    record = {
-                        "name": name,
-                        "unit": unit,
-                        "rank": rank,
-                        "position": position,
-                        "start_100": None,
-                        "end_100": None,
-                        "start_30": None,
-                        "end_30": None,
-                        "start_non": None,
-                        "end_non": None
-                    }
-
-                    if step_key == "100":
-                        record["start_100"] = self.format_date(start_date_str)
-                        record["end_100"] = self.format_date(end_date_str)
-                    elif step_key == "30":
-                        record["start_30"] = self.format_date(start_date_str)
-                        record["end_30"] = self.format_date(end_date_str)
-                    elif step_key == "non":
-                        record["start_non"] = self.format_date(start_date_str)
-                        record["end_non"] = self.format_date(end_date_str)
-
-                    all_records.append(record)
+        # Читання файлів - у фоновому потоці
+        worker = ImportParseThread(steps)
+        worker.finished.connect(self._on_records_parsed)
+        self._start_worker(worker, "Читання файлів джерел...", "Читання даних")
+
+    def _start_worker(self, worker: _ImportThread, label: str, title: str):
+        """
+        Запускає потік імпорту з progress dialog (кнопка "Скасувати" - cancel потоку)
+        """
+        progress = QProgressDialog(label, "Скасувати", 0, self.PROGRESS_SCALE, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setWindowTitle(title)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.setMinimumDuration(0)
+        progress.canceled.connect(worker.cancel)
+        progress.canceled.connect(lambda: progress.setLabelText("Скасування..."))
+
+        worker.progress.connect(self._on_worker_progress)
+        worker.cancelled.connect(self._on_worker_cancelled)
+        worker.error.connect(self._on_worker_error)
+
+        self._worker = worker
+        self._progress = progress
+        progress.show()
+        worker.start()
+
+    def _finish_worker(self):
+        """Закриває progress dialog потоку, що завершився"""
+        if self._progress:
+            self._progress.close()
+            self._progress = None
+        if self._worker:
+            self._worker.wait()
+            self._worker = None
+
+    def _on_worker_progress(self, current: int, total: int, message: str):
+        """Прогрес потоку (сигнали вже обмежені по частоті)"""
+        if not self._progress or self._progress.wasCanceled():
+            return
+        self._progress.setLabelText(message)
+        if total > 0:
+            self._progress.setValue(min(self.PROGRESS_SCALE, current * self.PROGRESS_SCALE // total))
+
+    def _on_worker_cancelled(self):
+        """Потік зупинено користувачем"""
+        self._finish_worker()
+        QMessageBox.information(self, "Імпорт скасовано", "Імпорт скасовано. Зміни в базі даних не внесено.")
+
+    def _on_worker_error(self, message: str):
+        """Помилка в потоці"""
+        self._finish_worker()
+        QMessageBox.critical(self, "Помилка", f"Помилка при імпорті:\n{message}")
+
+    def _on_records_parsed(self, all_records: list):
+        """
+        Записи прочитано - підтвердження та запис (в БД - у фоновому потоці)
+        """
+        self._finish_worker()
 
         if not all_records:
             QMessageBox.warning(self, "Помилка", "Не знайдено даних для імпорту!")
@@ -592,7 +805,9 @@ class ImportDataDialog(QDialog):
         # Підрахунок унікальних осіб
         unique_names = set(r["name"] for r in all_records)
 
-        # ПЕРЕВІРКА НА ДУБЛІКАТИ: Чи вже є записи за цей місяць?
+        # Місяць вже імпортовано? Імпорт ідемпотентний (однакові записи не дублюються),
+        # потрібно лише обрати: замінити місяць чи доповнити його
+        replace_month = False
         if self.use_database:
             cursor = self.db_manager.connection.cursor()
             cursor.execute("""
@@ -601,18 +816,20 @@ class ImportDataDialog(QDialog):
             existing_count = cursor.fetchone()[0]
 
             if existing_count > 0:
-                reply = QMessageBox.warning(
+                reply = QMessageBox.question(
                     self,
-                    "Увага! Дублікати!",
-                    f"За місяць {self.month} вже є {existing_count} записів в базі даних!\n\n"
-                    f"Імпортування додасть ще {len(all_records)} записів, що створить дублікати.\n\n"
-                    f"Продовжити імпорт?",
-                    QMessageBox.Yes | QMessageBox.No,
-                    QMessageBox.No
+                    "Місяць вже імпортовано",
+                    f"За місяць {self.month} вже є {existing_count} записів в базі даних.\n\n"
+                    f"Так - замінити місяць: записи, яких немає у файлах, буде видалено.\n"
+                    f"Ні - доповнити: нові записи буде додано, змінені - оновлено.\n\n"
+                    f"Однакові записи в обох випадках не дублюються.",
+                    QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
+                    QMessageBox.Cancel
                 )
 
-                if reply != QMessageBox.Yes:
+                if reply == QMessageBox.Cancel:
                     return
+                replace_month = reply == QMessageBox.Yes
 
         # Підтвердження
         reply = QMessageBox.question(
@@ -625,95 +842,101 @@ class ImportDataDialog(QDialog):
         if reply != QMessageBox.Yes:
             return
 
-        # Імпорт даних
-        try:
-            if self.use_database:
-                # НОВИЙ ШЛЯХ: Імпорт в БД з прогресом
-                # Розраховуємо максимум: кількість записів + перерахунок періодів
-                max_progress = len(all_records) * 2  # Приблизно
-
-                progress = QProgressDialog("Імпорт даних в базу даних...", None, 0, max_progress, self)
-                progress.setWindowModality(Qt.WindowModal)
-                progress.setWindowTitle("Імпорт даних")
-                progress.show()
+        if self.use_database:
+            # НОВИЙ ШЛЯХ: Імпорт в БД у фоновому потоці з власним підключенням
+            worker = MonthImportThread(
+                self.db_manager.db_path,
+                self.db_manager.connection_profile,
+                self.month,
+                all_records,
+                replace_month
+            )
+            worker.finished.connect(self._on_import_finished)
+            self._start_worker(worker, "Імпорт даних в базу даних...", "Імпорт даних")
+        else:
+            self._import_to_excel(all_records)
+
+    def _on_import_finished(self, stats: dict):
+        """Імпорт в БД завершено"""
+        self._finish_worker()
+
+        # Показуємо результат
+        message = f"Дані успішно імпортовано в базу даних!\n\n"
+        message += f"Додано записів: {stats['added']}\n"
+        if stats['changed'] > 0:
+            message += f"Оновлено записів: {stats['changed']}\n"
+        if stats['unchanged'] > 0:
+            message += f"Без змін: {stats['unchanged']}\n"
+        if stats['removed'] > 0:
+            message += f"Видалено записів: {stats['removed']}\n"
+        if stats['errors'] > 0:
+            message += f"Помилок: {stats['errors']}\n"
+        message += f"\n✓ Періоди автоматично розраховані для {stats['recalculated']} осіб"
+
+        QMessageBox.information(
+            self,
+            "Імпорт завершено",
+            message
+        )
 
-                # Callback для оновлення прогресу
-                def update_progress(current, total, message):
-                    progress.setLabelText(message)
-                    progress.setValue(current)
-                    from PySide6.QtWidgets import QApplication
-                    QApplication.processEvents()
+        self.accept()
 
-                # Викликаємо імпорт з callback (передаємо список записів)
-                stats = self.db_manager.import_month_data(self.month, all_records, progress_callback=update_progress)
+    def _import_to_excel(self, all_records: list):
+        """
+        СТАРИЙ ШЛЯХ: Імпорт в Excel (книга ExcelReader - в цьому потоці)
+        """
+        progress = QProgressDialog("Імпорт в Excel файл...", None, 0, 100, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setWindowTitle("Імпорт даних")
+        progress.show()
 
-                progress.setValue(max_progress)
+        try:
+            success_count = 0
+            error_count = 0
 
-                progress.close()
+            target_sheet = self.excel_reader.workbook["Data"]
+            next_row = target_sheet.max_row + 1
 
-                # Показуємо результат
-                message = f"Дані успішно імпортовано в базу даних!\n\n"
-                message += f"Додано записів: {stats['added']}\n"
-                if stats['errors'] > 0:
-                    message += f"Помилок: {stats['errors']}\n"
-                message += f"\n✓ Періоди автоматично розраховані для {stats['added']} осіб"
+            for i, record in enumerate(all_records):
+                progress.setValue(30 + int(i / len(all_records) * 60))
 
-                QMessageBox.information(
-                    self,
-                    "Імпорт завершено",
-                    message
-                )
+                try:
+                    name = record["name"]
+
+                    # Додаємо рядок
+                    target_sheet.cell(row=next_row, column=1, value=self.month)  # A - місяць
+                    target_sheet.cell(row=next_row, column=4, value=record["rank"])  # D - звання
+                    target_sheet.cell(row=next_row, column=5, value=name)  # E - ПІБ
+                    target_sheet.cell(row=next_row, column=7, value=record["position"])  # G - посада
+                    target_sheet.cell(row=next_row, column=8, value=record["start_100"])  # H - початок 100
+                    target_sheet.cell(row=next_row, column=9, value=record["end_100"])  # I - кінець 100
+                    target_sheet.cell(row=next_row, column=10, value=record["start_30"])  # J - початок 30
+                    target_sheet.cell(row=next_row, column=11, value=record["end_30"])  # K - кінець 30
+                    target_sheet.cell(row=next_row, column=12, value=record["start_non"])  # L - початок не залучення
+                    target_sheet.cell(row=next_row, column=13, value=record["end_non"])  # M - кінець не залучення
+
+                    next_row += 1
+                    success_count += 1
+                except Exception as e:
+                    print(f"Помилка для {name}: {str(e)}")
+                    error_count += 1
+
+            progress.setValue(90)
+
+            # Зберігаємо
+            if self.excel_reader.save():
+                progress.close()
+                message = f"Дані успішно імпортовано!\n\n"
+                message += f"Додано записів: {success_count}\n"
+                if error_count > 0:
+                    message += f"Помилок: {error_count}\n"
+                message += f"\n⚠️ Не забудь вказати статуси під час не залучення!"
 
+                QMessageBox.information(self, "Успіх", message)
                 self.accept()
-
             else:
-                # СТАРИЙ ШЛЯХ: Імпорт в Excel
-                progress.setLabelText("Імпорт в Excel файл...")
-                success_count = 0
-                error_count = 0
-
-                target_sheet = self.excel_reader.workbook["Data"]
-                next_row = target_sheet.max_row + 1
-
-                for i, record in enumerate(all_records):
-                    progress.setValue(30 + int(i / len(all_records) * 60))
-
-                    try:
-                        name = record["name"]
-
-                        # Додаємо рядок
-                        target_sheet.cell(row=next_row, column=1, value=self.month)  # A - місяць
-                        target_sheet.cell(row=next_row, column=4, value=record["rank"])  # D - звання
-                        target_sheet.cell(row=next_row, column=5, value=name)  # E - ПІБ
-                        target_sheet.cell(row=next_row, column=7, value=record["position"])  # G - посада
-                        target_sheet.cell(row=next_row, column=8, value=record["start_100"])  # H - початок 100
-                        target_sheet.cell(row=next_row, column=9, value=record["end_100"])  # I - кінець 100
-                        target_sheet.cell(row=next_row, column=10, value=record["start_30"])  # J - початок 30
-                        target_sheet.cell(row=next_row, column=11, value=record["end_30"])  # K - кінець 30
-                        target_sheet.cell(row=next_row, column=12, value=record["start_non"])  # L - початок не залучення
-                        target_sheet.cell(row=next_row, column=13, value=record["end_non"])  # M - кінець не залучення
-
-                        next_row += 1
-                        success_count += 1
-                    except Exception as e:
-                        print(f"Помилка для {name}: {str(e)}")
-                        error_count += 1
-
-                progress.setValue(90)
-
-                # Зберігаємо
-                if self.excel_reader.save():
-                    message = f"Дані успішно імпортовано!\n\n"
-                    message += f"Додано записів: {success_count}\n"
-                    if error_count > 0:
-                        message += f"Помилок: {error_count}\n"
-                    message += f"\n⚠️ Не забудь вказати статуси під час не залучення!"
-
-                    QMessageBox.information(self, "Успіх", message)
-                    progress.setValue(100)
-                    self.accept()
-                else:
-                    QMessageBox.critical(self, "Помилка", "Не вдалось зберегти дані!")
+                progress.close()
+                QMessageBox.critical(self, "Помилка", "Не вдалось зберегти дані!")
 
         except Exception as e:
             progress.close()
@@ -722,10 +945,15 @@ class ImportDataDialog(QDialog):
     def _update_periods_from_excel(self):
         """
         Оновлює періоди з основного Excel файлу після імпорту
+
+        Set-based: аркуші періодів читаються одним проходом (групування по ПІБ),
+        periods / parsed_periods записуються через executemany, дати 30% для
+        service_records місяця - одним згрупованим запитом та одним executemany
+        (все в одній транзакції)
         """
         try:
             from core.excel_reader import ExcelReader
-            from core.data_processor import DataProcessor
+            from core.migration import period_sheet_entries
 
             # Знаходимо основний Excel файл
             base_dir = get_base_dir()
@@ -746,7 +974,6 @@ class ImportDataDialog(QDialog):
             progress.show()
 
             from PySide6.QtWidgets import QApplication
-            QApplication.processEvents()
 
             # Завантажуємо Excel
             progress.setLabelText("Завантаження Excel файлу...")
@@ -756,143 +983,72 @@ class ImportDataDialog(QDialog):
             excel_reader = ExcelReader(excel_path)
             excel_reader.load_workbook()
 
+            # Періоди з Excel по ПІБ: {name: ([(start_iso, end_iso), ...], текст)}
+            sheet_periods = {}
+            for period_type, sheet_name in (("100", "Періоди на 100"), ("30", "Періоди на 30")):
+                entries = period_sheet_entries(excel_reader, sheet_name) or []
+                sheet_periods[period_type] = {
+                    name: (periods, text) for name, periods, text in entries if periods
+                }
+
             progress.setLabelText("Оновлення періодів...")
-            progress.setValue(30)
+            progress.setValue(60)
             QApplication.processEvents()
 
-            # Отримуємо всіх servicemembers
-            all_members = self.db_manager.get_all_servicemembers()
-            total = len(all_members)
-
-            updated_count = 0
-            for i, member in enumerate(all_members):
-                if i % 50 == 0:
-                    progress.setValue(30 + int(i / total * 60))
-                    QApplication.processEvents()
-
-                name = member["name"]
-                member_id = member["id"]
-
-                # Отримати періоди з Excel
-                periods_100_data = excel_reader.get_servicemember_data(name, "Періоди на 100")
-                periods_30_data = excel_reader.get_servicemember_data(name, "Періоди на 30")
-
-                # Збір та парсинг періодів
-                periods_100 = []
-                periods_30 = []
-
-                for row in periods_100_data:
-                    if row.get("periods"):
-                        parsed = DataProcessor.parse_periods(row["periods"])
-                        periods_100.extend(parsed)
-
-                for row in periods_30_data:
-                    if row.get("periods"):
-                        parsed = DataProcessor.parse_periods(row["periods"])
-                        periods_30.extend(parsed)
-
-                if not periods_100 and not periods_30:
-                    continue
-
-                # Злиття та форматування
-                merged_100 = DataProcessor.merge_consecutive_periods(periods_100)
-                merged_30 = DataProcessor.merge_consecutive_periods(periods_30)
-                formatted_100 = DataProcessor.format_periods_for_document(merged_100)
-                formatted_30 = DataProcessor.format_periods_for_document(merged_30)
+            # Тільки особи, для яких є періоди в Excel
+            name_to_id = {member["name"]: member["id"] for member in self.db_manager.get_all_servicemembers()}
+            member_ids = {}  # id -> name (порядок servicemembers)
+            for name, member_id in name_to_id.items():
+                if name in sheet_periods["100"] or name in sheet_periods["30"]:
+                    member_ids[member_id] = name
+
+            periods_rows = []
+            parsed_rows = []
+            for member_id, name in member_ids.items():
+                for period_type in ("100", "30"):
+                    entry = sheet_periods[period_type].get(name)
+                    if not entry:
+                        continue
+                    periods, text = entry
+                    periods_rows.append((member_id, period_type, text))
+                    parsed_rows.extend((member_id, period_type, start, end) for start, end in periods)
 
-                # Оновити БД
+            with self.db_manager.transaction():
                 cursor = self.db_manager.connection.cursor()
-                cursor.execute("DELETE FROM periods WHERE servicemember_id = ?", (member_id,))
-                cursor.execute("DELETE FROM parsed_periods WHERE servicemember_id = ?", (member_id,))
-
-                if formatted_100:
-                    cursor.execute("""
-                        INSERT INTO periods (servicemember_id, period_type, period_text)
-                        VALUES (?, '100', ?)
-                    """, (member_id, formatted_100))
-
-                if formatted_30:
-                    cursor.execute("""
-                        INSERT INTO periods (servicemember_id, period_type, period_text)
-                        VALUES (?, '30', ?)
-                    """, (member_id, formatted_30))
-
-                for start, end in merged_100:
-                    cursor.execute("""
-                        INSERT INTO parsed_periods (servicemember_id, period_type, start_date, end_date)
-                        VALUES (?, '100', ?, ?)
-                    """, (member_id, start.isoformat(), end.isoformat()))
-
-                for start, end in merged_30:
-                    cursor.execute("""
-                        INSERT INTO parsed_periods (servicemember_id, period_type, start_date, end_date)
-                        VALUES (?, '30', ?, ?)
-                    """, (member_id, start.isoformat(), end.isoformat()))
-
-                self.db_manager.connection.commit()
-                updated_count += 1
-
-            # ОНОВЛЕННЯ SERVICE_RECORDS ДЛЯ ІМПОРТОВАНОГО МІСЯЦЯ
-            # Після оновлення parsed_periods потрібно також оновити service_records
-            # для імпортованого місяця з датами start_30/end_30
-            progress.setLabelText("Оновлення service_records з датами 30%...")
-            progress.setValue(95)
-            QApplication.processEvents()
-
-            cursor = self.db_manager.connection.cursor()
-
-            # Отримуємо всі service_records для імпортованого місяця
-            cursor.execute("""
-                SELECT sr.id, sr.servicemember_id
-                FROM service_records sr
-                WHERE sr.month = ?
-            """, (self.month,))
-
-            month_records = cursor.fetchall()
-
-            for record_id, member_id in month_records:
-                # Знаходимо parsed_periods типу '30' для цього servicemember
-                # які перетинаються з імпортованим місяцем
-                cursor.execute("""
-                    SELECT start_date, end_date
-                    FROM parsed_periods
-                    WHERE servicemember_id = ? AND period_type = '30'
-                    ORDER BY start_date
-                """, (member_id,))
-
-                periods_30 = cursor.fetchall()
-
-                if not periods_30:
-                    continue
-
-                # Парсимо місяць (формат YYYY-MM)
-                from datetime import datetime
-                year, month = map(int, self.month.split('-'))
 
-                # Знаходимо перший та останній періоди, що потрапляють в цей місяць
-                start_30 = None
-                end_30 = None
-
-                for start_str, end_str in periods_30:
-                    start = datetime.fromisoformat(start_str)
-                    end = datetime.fromisoformat(end_str)
-
-                    # Перевіряємо, чи період потрапляє в імпортований місяць
-                    if start.year == year and start.month == month:
-                        if start_30 is None:
-                            start_30 = start
-                    if end.year == year and end.month == month:
-                        end_30 = end
+                cursor.executemany(
+                    "DELETE FROM periods WHERE servicemember_id = ?",
+                    [(member_id,) for member_id in member_ids]
+                )
+                cursor.executemany(
+                    "DELETE FROM parsed_periods WHERE servicemember_id = ?",
+                    [(member_id,) for member_id in member_ids]
+                )
+                cursor.executemany("""
+                    INSERT INTO periods (servicemember_id, period_type, period_text)
+                    VALUES (?, ?, ?)
+                """, periods_rows)
+                cursor.executemany("""
+                    INSERT INTO parsed_periods (servicemember_id, period_type, start_date, end_date)
+                    VALUES (?, ?, ?, ?)
+                """, parsed_rows)
+
+                # ОНОВЛЕННЯ SERVICE_RECORDS ДЛЯ ІМПОРТОВАНОГО МІСЯЦЯ
+                # Після оновлення parsed_periods потрібно також оновити service_records
+                # для імпортованого місяця з датами start_30/end_30
+                progress.setLabelText("Оновлення service_records з датами 30%...")
+                progress.setValue(90)
+                QApplication.processEvents()
 
-                # Оновлюємо service_record
-                if start_30 and end_30:
-                    cursor.execute("""
-                        UPDATE service_records
-                        SET start_30 = ?, end_30 = ?
-                        WHERE id = ?
-                    """, (start_30.strftime("%d.%m.%Y"), end_30.strftime("%d.%m.%Y"), record_id))
+                self._update_month_30_dates(cursor)
 
-            self.db_manager.connection.commit()
+                # UPDATE service_records позначив осіб для перерахунку (тригер
+                # mark_dirty_on_service_update) - періоди цих осіб щойно взято з Excel,
+                # recalculate_dirty() не повинен замінити їх розрахованими з Data
+                cursor.executemany(
+                    "DELETE FROM dirty_servicemembers WHERE servicemember_id = ?",
+                    [(member_id,) for member_id in member_ids]
+                )
 
             progress.setValue(100)
             progress.close()
@@ -900,7 +1056,7 @@ class ImportDataDialog(QDialog):
             QMessageBox.information(
                 self,
                 "Успіх",
-                f"Періоди оновлено для {updated_count} військовослужбовців!"
+                f"Періоди оновлено для {len(member_ids)} військовослужбовців!"
             )
 
         except Exception as e:
@@ -911,16 +1067,96 @@ class ImportDataDialog(QDialog):
                 f"Запустіть оновлення вручну через update_periods.bat"
             )
 
-    def format_date(self, date_value):
+    def _update_month_30_dates(self, cursor):
         """
-        Форматує дату в DD.MM.YYYY
+        Дати start_30/end_30 записів імпортованого місяця з parsed_periods (тип '30')
+
+        start_30 - початок першого періоду, що починається в місяці,
+        end_30 - кінець останнього періоду, що закінчується в місяці.
+        Періоди всіх осіб місяця читаються одним запитом (тільки ті, що перетинають місяць).
+
+        Args:
+            cursor: Курсор БД (всередині transaction())
         """
-        if isinstance(date_value, datetime):
-            return date_value.strftime("%d.%m.%Y")
-        elif isinstance(date_value, str):
-            return date_value
-        else:
-            return str(date_value) if date_value else None
+        # Вікно місяця (формат YYYY-MM)
+        year, month = map(int, self.month.split('-'))
+        month_start = date(year, month, 1)
+        next_month = date(year + month // 12, month % 12 + 1, 1)
+
+        cursor.execute("""
+            SELECT servicemember_id, start_date, end_date
+            FROM parsed_periods
+            WHERE period_type = '30'
+              AND end_date >= ? AND start_date < ?
+              AND servicemember_id IN (
+                  SELECT DISTINCT servicemember_id FROM service_records WHERE month = ?
+              )
+            ORDER BY servicemember_id, start_date
+        """, (month_start.isoformat(), next_month.isoformat(), self.month))
+
+        dates_30 = {}  # id особи -> (start_30, end_30)
+        for member_id, rows in groupby(cursor.fetchall(), key=lambda row: row[0]):
+            start_30 = None
+            end_30 = None
+
+            for _, start_str, end_str in rows:
+                start = date.fromisoformat(start_str[:10])
+                end = date.fromisoformat(end_str[:10])
+
+                # Перевіряємо, чи період потрапляє в імпортований місяць
+                if start_30 is None and month_start <= start < next_month:
+                    start_30 = start
+                if month_start <= end < next_month:
+                    end_30 = end
+
+            if start_30 and end_30:
+                dates_30[member_id] = (start_30, end_30)
+
+        # Дати 30% входять у record_key - ключі записів перераховуються
+        # (однакові після оновлення записи особи - без ключа, як при міграції)
+        cursor.execute("""
+            SELECT id, servicemember_id, start_100, end_100, start_non, end_non,
+                   start_100_ord, end_100_ord, start_non_ord, end_non_ord
+            FROM service_records
+            WHERE month = ?
+            ORDER BY id
+        """, (self.month,))
+
+        updates = []
+        seen_keys = set()
+        for record_id, member_id, *values in cursor.fetchall():
+            if member_id not in dates_30:
+                continue
+
+            start_30, end_30 = dates_30[member_id]
+            start_30_text = start_30.strftime("%d.%m.%Y")
+            end_30_text = end_30.strftime("%d.%m.%Y")
+
+            record_key = DatabaseManager.record_key(
+                (values[0], values[1], start_30_text, end_30_text, values[2], values[3]),
+                (values[4], values[5], start_30.toordinal(), end_30.toordinal(), values[6], values[7])
+            )
+            if (member_id, record_key) in seen_keys:
+                record_key = None
+            else:
+                seen_keys.add((member_id, record_key))
+
+            updates.append((
+                start_30_text, end_30_text,
+                start_30.toordinal(), end_30.toordinal(),
+                record_key, record_id
+            ))
+
+        # Спочатку знімаємо старі ключі, щоб проміжний стан не порушив унікальність
+        cursor.executemany(
+            "UPDATE service_records SET record_key = NULL WHERE id = ?",
+            [(update[-1],) for update in updates]
+        )
+        cursor.executemany("""
+            UPDATE service_records
+            SET start_30 = ?, end_30 = ?, start_30_ord = ?, end_30_ord = ?, record_key = ?
+            WHERE id = ?
+        """, updates)
 
     def close_all_workbooks(self):
         """Закриває всі відкриті workbooks щоб звільнити файли"""
@@ -934,7 +1170,10 @@ class ImportDataDialog(QDialog):
                 self.step_data[step_key]["workbook"] = None
 
     def reject(self):
-        """Закриття діалогу - звільняємо файли"""
+        """Закриття діалогу - зупиняємо потік імпорту та звільняємо файли"""
+        if self._worker and self._worker.isRunning():
+            self._worker.cancel()
+            self._worker.wait()
         self.close_all_workbooks()
         super().reject()
 
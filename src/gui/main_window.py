@@ -9,7 +9,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QThread, Signal
 import os
 import json
-from docx import Document
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 from gui.selection_dialog import SelectionDialog
 from gui.add_data_dialog import AddDataDialog
@@ -22,11 +23,15 @@ from core.excel_reader import ExcelReader
 from core.database import DatabaseManager
 from core.migration import DataMigration
 from core.data_processor import DataProcessor
-from core.report_generator import ReportGenerator
+from core.report_generator import ReportGenerator, render_report_jobs
 from utils.validators import validate_excel_file
 from utils.paths import get_base_dir, get_resources_dir, get_config_path, get_template_path, get_database_path, get_output_dir
 
 
+class RecalculationCancelled(Exception):
+    """Перерахунок періодів скасовано користувачем"""
+
+
 class ReportGeneratorThread(QThread):
     """
     Потік для генерації рапортів у фоновому режимі
@@ -37,7 +42,10 @@ class ReportGeneratorThread(QThread):
     finished = Signal(int, int, list)  # (успішно, помилок, список_помилок)
     error = Signal(str)
 
-    def __init__(self, data_source, names, sheet_names, template_path, output_dir, manual_data=None, report_type="", use_database=False, db_path=None, passport_data_source=None):
+    PREFETCH_SIZE = 100  # Кількість осіб на один пакетний запит до БД
+    PARALLEL_THRESHOLD = 20  # Мінімум рапортів для паралельного рендерингу
+
+    def __init__(self, data_source, names, sheet_names, template_path, output_dir, manual_data=None, report_type="", use_database=False, db_path=None, passport_data_source=None, max_workers=None, connection_profile=None):
         super().__init__()
         self.data_source = data_source  # ExcelReader або None (якщо БД)
         self.use_database = use_database  # Чи використовувати БД
@@ -49,6 +57,8 @@ class ReportGeneratorThread(QThread):
         self.manual_data = manual_data or {}
         self.report_type = report_type
         self.passport_data_source = passport_data_source  # PassportDataDialog або None
+        self.max_workers = max_workers  # Кількість процесів рендерингу (None - кількість ядер)
+        self.connection_profile = connection_profile  # PRAGMA-налаштування підключення до БД
 
     @staticmethod
     def get_initials(full_name: str) -> str:
@@ -110,35 +120,58 @@ class ReportGeneratorThread(QThread):
         # Повертаємо позначення з мапи, або "4шб" якщо підрозділ не знайдено
         return unit_map.get(unit, "4шб")
 
+    @staticmethod
+    def _prefetch_batch(db_manager, names):
+        """
+        Завантажує дані пакету військовослужбовців одним get_complete_data_batch
+
+        Returns:
+            Словник {ПІБ: дані} або None якщо пакет не вдалося завантажити
+            (тоді кожне ПІБ обробляється окремо, щоб помилка потрапила у звіт по особі)
+        """
+        try:
+            return db_manager.get_complete_data_batch(names)
+        except Exception as e:
+            print(f"[ERROR] Помилка пакетного завантаження даних: {e}")
+            return None
+
     def run(self):
         db_manager = None
         try:
-            success_count = 0
-            error_count = 0
-            errors_list = []  # Список помилок
             total = len(self.names)
+            errors = {}  # {індекс ПІБ: текст помилки} - для впорядкованого списку помилок
+            self._done_count = 0
 
             # Створюємо папку output якщо її немає
             os.makedirs(self.output_dir, exist_ok=True)
 
             # ВИПРАВЛЕННЯ: Створюємо DatabaseManager всередині потоку (SQLite threading fix)
             if self.use_database and self.db_path:
-                db_manager = DatabaseManager(self.db_path)
+                db_manager = DatabaseManager(self.db_path, self.connection_profile)
                 db_manager.connect()
                 data_source = db_manager
             else:
                 data_source = self.data_source
 
-            generator = ReportGenerator(self.template_path)
+            # 1. Агрегація даних (одне підключення, в цьому потоці)
+            jobs = []  # [(індекс, ПІБ, дані, output_path, manual_data), ...]
+            prefetched = {}  # Дані з БД, отримані пакетом
 
             for i, name in enumerate(self.names):
                 try:
-                    # Агрегуємо дані (АДАПТОВАНО: працює з Excel або БД)
-                    data = DataProcessor.aggregate_servicemember_data(
-                        data_source,
-                        name,
-                        self.sheet_names
-                    )
+                    # Пакетне завантаження з БД наперед (замість N+1 запитів)
+                    if db_manager and i % self.PREFETCH_SIZE == 0:
+                        prefetched = self._prefetch_batch(db_manager, self.names[i:i + self.PREFETCH_SIZE])
+
+                    if db_manager and prefetched is not None:
+                        data = prefetched.get(name)
+                    else:
+                        # Агрегуємо дані (АДАПТОВАНО: працює з Excel або БД)
+                        data = DataProcessor.aggregate_servicemember_data(
+                            data_source,
+                            name,
+                            self.sheet_names
+                        )
 
                     if data:
                         # Генеруємо рапорт з новим форматом назви
@@ -155,20 +188,28 @@ class ReportGeneratorThread(QThread):
                             passport_data = self.passport_data_source.get_passport_for_name(name)
                             current_manual_data.update(passport_data)
 
-                        # Генеруємо рапорт (може кинути exception з детальною помилкою)
-                        generator.generate_report(data, output_path, current_manual_data)
-                        success_count += 1
-                    else:
-                        error_count += 1
-                        errors_list.append(f"{name}: Дані не знайдено")
+                        jobs.append((i, name, data, output_path, current_manual_data))
+                        continue
+
+                    errors[i] = f"{name}: Дані не знайдено"
                 except Exception as e:
-                    error_count += 1
-                    errors_list.append(f"{name}: {str(e)}")
+                    errors[i] = f"{name}: {str(e)}"
 
-                # Оновлюємо прогрес
-                self.progress.emit(i + 1, total)
+                self._report_done(1, total)
 
-            self.finished.emit(success_count, error_count, errors_list)
+            # 2. Рендеринг рапортів
+            workers = self._get_worker_count(len(jobs))
+            if workers > 1:
+                self._render_parallel(jobs, workers, errors, total)
+            else:
+                self._render_serial(jobs, errors, total)
+
+            if db_manager:
+                self._print_dodatky_cache_stats(db_manager)
+
+            errors_list = [errors[i] for i in sorted(errors)]
+            success_count = total - len(errors)
+            self.finished.emit(success_count, len(errors), errors_list)
 
         except Exception as e:
             self.error.emit(str(e))
@@ -177,6 +218,91 @@ class ReportGeneratorThread(QThread):
             if db_manager:
                 db_manager.close()
 
+    @staticmethod
+    def _print_dodatky_cache_stats(db_manager):
+        """Виводить статистику кешу ЖБД / громад після генерації"""
+        try:
+            info = db_manager.get_dodatky().cache_info()
+            print(f"[OK] Кеш Dodatky: влучань {info['hits']}, промахів {info['misses']}, "
+                  f"записів {info['size']} (текст періодів: влучань {info['text_hits']}, "
+                  f"промахів {info['text_misses']})")
+        except Exception as e:
+            print(f"[WARNING] Не вдалося отримати статистику кешу Dodatky: {e}")
+
+    def _report_done(self, count: int, total: int):
+        """Оновлює прогрес на count оброблених ПІБ"""
+        self._done_count += count
+        self.progress.emit(self._done_count, total)
+
+    def _get_worker_count(self, jobs_count: int) -> int:
+        """
+        Кількість процесів для рендерингу
+
+        Returns:
+            1 - послідовна генерація (мало рапортів або одне ядро)
+        """
+        if jobs_count < self.PARALLEL_THRESHOLD:
+            return 1
+
+        workers = self.max_workers or os.cpu_count() or 1
+        return max(1, min(workers, jobs_count))
+
+    def _render_serial(self, jobs, errors: dict, total: int):
+        """
+        Послідовний рендеринг в цьому потоці
+        """
+        generator = ReportGenerator(self.template_path)
+
+        for i, name, data, output_path, manual_data in jobs:
+            try:
+                # Генеруємо рапорт (може кинути exception з детальною помилкою)
+                generator.generate_report(data, output_path, manual_data)
+            except Exception as e:
+                errors[i] = f"{name}: {str(e)}"
+
+            self._report_done(1, total)
+
+    def _render_parallel(self, jobs, workers: int, errors: dict, total: int):
+        """
+        Паралельний рендеринг у пулі процесів
+
+        Рапорти з однаковим output_path групуються в одне завдання і рендеряться
+        по порядку - файл на диску такий самий, як при послідовній генерації.
+        """
+        # Групуємо завдання по output_path (порядок груп - порядок першої появи)
+        groups = {}
+        for job in jobs:
+            groups.setdefault(job[3], []).append(job)
+
+        pending = list(groups.values())
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        render_report_jobs,
+                        self.template_path,
+                        [(data, output_path, manual_data) for _, _, data, output_path, manual_data in group]
+                    ): group
+                    for group in pending
+                }
+
+                for future in as_completed(futures):
+                    group = futures[future]
+                    results = future.result()
+
+                    for (i, name, _, _, _), error in zip(group, results):
+                        if error is not None:
+                            errors[i] = f"{name}: {error}"
+
+                    pending.remove(group)
+                    self._report_done(len(group), total)
+
+        except BrokenProcessPool as e:
+            # Пул процесів недоступний - догенеровуємо решту в цьому потоці
+            print(f"[ERROR] Пул процесів зупинився, продовжуємо послідовно: {e}")
+            self._render_serial([job for group in pending for job in group], errors, total)
+
 
 class MainWindow(QMainWindow):
     """
@@ -334,9 +460,19 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Підключення до БД...")
             QApplication.processEvents()
 
-            self.db_manager = DatabaseManager(db_absolute_path)
+            self.db_manager = DatabaseManager(db_absolute_path, db_config.get("connection_profile"))
             self.db_manager.connect()
 
+            # Dodatky.xlsx -> БД (тільки якщо файл змінився)
+            self.status_bar.showMessage("Синхронізація Dodatky.xlsx...")
+            QApplication.processEvents()
+            self._sync_dodatky()
+
+            # Перерахунок періодів тільки для змінених осіб
+            self.status_bar.showMessage("Перерахунок змінених періодів...")
+            QApplication.processEvents()
+            self._recalculate_dirty_periods()
+
             # Перевірити чи використовувати БД
             self.use_database = db_config.get("use_database_primary", True)
 
@@ -474,6 +610,32 @@ class MainWindow(QMainWindow):
             self.db_manager = None
             self.status_bar.showMessage("Помилка ініціалізації")
 
+    def _sync_dodatky(self):
+        """
+        Синхронізує Dodatky.xlsx в БД, щоб потоки генерації читали ЖБД та громади з БД
+        """
+        if not self.db_manager:
+            return
+
+        try:
+            self.db_manager.sync_dodatky()
+        except Exception as e:
+            print(f"[ERROR] Помилка синхронізації Dodatky.xlsx: {e}")
+
+    def _recalculate_dirty_periods(self):
+        """
+        Перераховує періоди тільки для осіб, змінених після останнього перерахунку
+        """
+        if not self.db_manager:
+            return
+
+        try:
+            count = self.db_manager.recalculate_dirty()
+            if count:
+                print(f"[OK] Перераховано періоди для {count} змінених військовослужбовців")
+        except Exception as e:
+            print(f"[ERROR] Помилка інкрементального перерахунку періодів: {e}")
+
     def _perform_initial_migration(self):
         """
         Одноразова міграція Excel → БД з progress dialog
@@ -489,12 +651,13 @@ class MainWindow(QMainWindow):
         try:
             migrator = DataMigration(self.excel_reader, self.db_manager)
 
-            # Виконуємо міграцію
-            progress.setLabelText("Міграція аркуша Data...")
-            progress.setValue(25)
-            QApplication.processEvents()
+            def update_progress(current, total, message):
+                progress.setLabelText(message)
+                progress.setValue(int(current / total * 100))
+                QApplication.processEvents()
 
-            stats = migrator.migrate_full_database()
+            # Виконуємо міграцію (аркуші парсяться паралельно в процесах)
+            stats = migrator.migrate_full_database(progress_callback=update_progress)
 
             progress.setValue(100)
             progress.close()
@@ -560,10 +723,13 @@ class MainWindow(QMainWindow):
             return
 
         # Отримання списку ПІБ (АДАПТОВАНО: з БД або Excel)
+        overview = None
         try:
             if self.use_database:
-                names = self.db_manager.get_unique_names()
-                units = self.db_manager.get_unique_units()
+                # Один прохід по v_servicemember_complete: ПІБ, підрозділи, фільтр за підрозділом
+                overview = self.db_manager.get_servicemembers_overview()
+                names = [sm["name"] for sm in overview]
+                units = sorted({sm["unit"] for sm in overview if sm["unit"] is not None})
             else:
                 names = self.excel_reader.get_unique_names("Data")
                 units = self.excel_reader.get_unique_units()
@@ -589,12 +755,10 @@ class MainWindow(QMainWindow):
             elif mode == "unit":
                 # Отримати всі ПІБ з обраного підрозділу
                 if self.use_database:
-                    # Для БД - фільтруємо з усіх servicemembers
-                    all_members = self.db_manager.get_all_servicemembers()
-                    selected_names = [sm["name"] for sm in all_members if sm.get("unit") == value]
+                    # Для БД - фільтруємо з уже прочитаного огляду
+                    selected_names = [sm["name"] for sm in overview if sm.get("unit") == value]
                 else:
-                    unit_data = self.excel_reader.get_unit_data(value, "Data")
-                    selected_names = list(set([row["name"] for row in unit_data if row.get("name")]))
+                    selected_names = self.excel_reader.get_unit_names(value, "Data")
 
             if not selected_names:
                 QMessageBox.warning(self, "Попередження", "Не обрано жодного військовослужбовця.")
@@ -626,14 +790,19 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Помилка", f"Шаблон не знайдено: {template_path}")
             return
 
+        # Підхоплюємо зміни Dodatky.xlsx (перевірка mtime - дешева)
+        # та перераховуємо періоди осіб, чиї записи змінились
+        if self.use_database:
+            self._sync_dodatky()
+            self._recalculate_dirty_periods()
+
         # Перевірка на MANUAL маркери в шаблоні
         manual_data = {}
         passport_data_source = None  # Для масової генерації з файлом паспортів
 
         try:
-            doc = Document(template_path)
             generator = ReportGenerator(template_path)
-            manual_markers = generator.find_manual_markers(doc)
+            manual_markers = generator.find_manual_markers()
 
             if manual_markers:
                 # Перевіряємо чи є паспортні маркери
@@ -730,7 +899,9 @@ class MainWindow(QMainWindow):
             report_type,
             use_database=self.use_database,  # НОВИЙ параметр
             db_path=db_path,  # НОВИЙ параметр - шлях до БД
-            passport_data_source=passport_data_source  # Джерело паспортних даних
+            passport_data_source=passport_data_source,  # Джерело паспортних даних
+            max_workers=self.config.get("reports", {}).get("parallel_workers") or None,
+            connection_profile=self.config.get("database", {}).get("connection_profile")
         )
 
         self.thread.progress.connect(self.on_progress)
@@ -972,51 +1143,39 @@ class MainWindow(QMainWindow):
 
             from PySide6.QtWidgets import QApplication
 
-            # Перераховуємо періоди для кожного
-            success_count = 0
-            error_count = 0
-
-            for i, servicemember in enumerate(all_servicemembers, 1):
-                # Перевіряємо чи користувач скасував
-                if progress.wasCanceled():
-                    break
-
-                sm_id = servicemember["id"]
-                sm_name = servicemember["name"]
-
-                # Оновлюємо прогрес
-                progress.setLabelText(f"Обробка {i}/{total}: {sm_name}")
-                progress.setValue(i)
+            def update_progress(current, total_members, message):
                 QApplication.processEvents()
+                # Скасування: виняток до останнього кроку відкочує всю транзакцію перерахунку
+                if progress.wasCanceled() and current < total_members:
+                    raise RecalculationCancelled()
+                progress.setLabelText(message)
+                progress.setValue(current)
+
+            # Перераховуємо періоди для всіх одним пакетом
+            was_canceled = False
+            try:
+                success_count = self.db_manager.recalculate_all_periods(
+                    progress_callback=update_progress
+                )
+            except RecalculationCancelled:
+                was_canceled = True
+            finally:
+                progress.setValue(total)
+                progress.close()
 
-                try:
-                    self.db_manager.calculate_and_store_periods(sm_id)
-                    success_count += 1
-                except Exception as e:
-                    print(f"[ERROR] Помилка для {sm_name}: {e}")
-                    error_count += 1
-
-            # Зберігаємо стан скасування ПЕРЕД закриттям діалогу
-            was_canceled = progress.wasCanceled()
-
-            progress.setValue(total)
-            progress.close()
-
-            # Показуємо результат
             if was_canceled:
                 QMessageBox.information(
                     self,
                     "Скасовано",
-                    f"Перерахунок скасовано.\n\nОновлено: {success_count} осіб"
+                    "Перерахунок скасовано.\n\nЗміни відкочено, періоди залишились без змін."
                 )
-            else:
-                message = f"Перерахунок завершено!\n\n"
-                message += f"Успішно оновлено: {success_count}\n"
-                if error_count > 0:
-                    message += f"Помилок: {error_count}\n"
-                message += f"\nТепер періоди актуальні для всіх військовослужбовців."
+                return
 
-                QMessageBox.information(self, "Успіх", message)
+            message = f"Перерахунок завершено!\n\n"
+            message += f"Успішно оновлено: {success_count}\n"
+            message += f"\nТепер періоди актуальні для всіх військовослужбовців."
+
+            QMessageBox.information(self, "Успіх", message)
 
         except Exception as e:
             QMessageBox.critical(
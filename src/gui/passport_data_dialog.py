@@ -10,6 +10,9 @@ from PySide6.QtCore import Qt
 from openpyxl import load_workbook
 from typing import Dict, Optional
 
+from core.xlsx_stream import XlsxStreamReader, iter_sheet_rows
+from utils.name_utils import normalize_name
+
 
 class PassportDataDialog(QDialog):
     """
@@ -19,6 +22,9 @@ class PassportDataDialog(QDialog):
     3. Пропустити (без паспортних даних)
     """
 
+    # Читати файл через XlsxStreamReader (False - openpyxl)
+    STREAMING_READER = True
+
     def __init__(self, count: int, parent=None):
         """
         Args:
@@ -27,6 +33,7 @@ class PassportDataDialog(QDialog):
         super().__init__(parent)
         self.count = count
         self.passport_data = {}  # {ПІБ: {"СЕРІЯ": ..., "НОМЕР": ...}}
+        self.passport_data_by_key = {}  # {normalize_name(ПІБ): {"СЕРІЯ": ..., "НОМЕР": ...}}
         self.manual_data = {}  # {"СЕРІЯ": ..., "НОМЕР": ...} для всіх
         self.mode = "skip"  # "manual", "file", "skip"
         self.workbook = None  # Завантажений Excel файл
@@ -210,7 +217,7 @@ class PassportDataDialog(QDialog):
 
         if file_path:
             try:
-                self.workbook = load_workbook(file_path, data_only=True)
+                self.workbook = self._open_workbook(file_path)
                 self.file_label.setText(file_path)
                 self.file_label.setStyleSheet("color: green;")
 
@@ -227,6 +234,15 @@ class PassportDataDialog(QDialog):
                 self.load_status.setStyleSheet("color: red;")
                 self.workbook = None
 
+    def _open_workbook(self, file_path: str):
+        """Відкриває файл: потоково, якщо не вдалось - через openpyxl"""
+        if self.STREAMING_READER:
+            try:
+                return XlsxStreamReader(file_path)
+            except Exception:
+                pass
+        return load_workbook(file_path, data_only=True)
+
     def on_sheet_changed(self):
         """Обробник зміни аркуша - заповнює список колонок"""
         if not self.workbook:
@@ -237,11 +253,9 @@ class PassportDataDialog(QDialog):
             return
 
         try:
-            sheet = self.workbook[sheet_name]
-
             # Отримуємо заголовки з першого рядка
             headers = []
-            for col_idx, cell in enumerate(next(sheet.iter_rows(min_row=1, max_row=1, values_only=True)), 1):
+            for col_idx, cell in enumerate(next(iter_sheet_rows(self.workbook, sheet_name, min_row=1)), 1):
                 col_letter = self.index_to_column_letter(col_idx)
                 header_text = str(cell) if cell else f"(Колонка {col_letter})"
                 headers.append((col_idx, f"{col_letter}: {header_text}"))
@@ -311,8 +325,6 @@ class PassportDataDialog(QDialog):
             if not sheet_name:
                 return
 
-            sheet = self.workbook[sheet_name]
-
             # Отримуємо індекси колонок з комбобоксів (1-based)
             name_col = self.name_col_combo.currentData()
             series_col = self.series_col_combo.currentData()
@@ -323,39 +335,32 @@ class PassportDataDialog(QDialog):
                 self.load_status.setStyleSheet("color: orange;")
                 return
 
-            # Конвертуємо в 0-based для доступу до row[]
-            name_col = name_col - 1
-            series_col = (series_col - 1) if series_col else None
-            number_col = (number_col - 1) if number_col else None
+            # Читаємо тільки обрані колонки (0-based; -1 - колонку не обрано)
+            columns = (
+                name_col - 1,
+                (series_col - 1) if series_col else -1,
+                (number_col - 1) if number_col else -1
+            )
 
             self.passport_data = {}
+            self.passport_data_by_key = {}
             count = 0
 
-            # Визначаємо максимальний індекс колонки
-            max_col = name_col
-            if series_col is not None:
-                max_col = max(max_col, series_col)
-            if number_col is not None:
-                max_col = max(max_col, number_col)
-
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                if len(row) <= max_col:
-                    continue
-
-                name = str(row[name_col]).strip() if row[name_col] else None
+            for name_val, series_val, number_val in iter_sheet_rows(self.workbook, sheet_name, min_row=2, columns=columns):
+                name = str(name_val).strip() if name_val else None
                 if not name or name == "None":
                     continue
 
                 series = ""
                 number = ""
 
-                if series_col is not None and series_col < len(row) and row[series_col]:
-                    series = str(row[series_col]).strip().upper()
+                if series_val:
+                    series = str(series_val).strip().upper()
                     if series == "NONE":
                         series = ""
 
-                if number_col is not None and number_col < len(row) and row[number_col]:
-                    number = str(row[number_col]).strip()
+                if number_val:
+                    number = str(number_val).strip()
                     if number == "NONE":
                         number = ""
 
@@ -363,6 +368,7 @@ class PassportDataDialog(QDialog):
                     "СЕРІЯ": series,
                     "НОМЕР": number
                 }
+                self.passport_data_by_key.setdefault(normalize_name(name), self.passport_data[name])
                 count += 1
 
             self.load_status.setText(f"Завантажено {count} записів")
@@ -372,6 +378,7 @@ class PassportDataDialog(QDialog):
             self.load_status.setText(f"Помилка: {str(e)}")
             self.load_status.setStyleSheet("color: red;")
             self.passport_data = {}
+            self.passport_data_by_key = {}
 
     def on_accept(self):
         """Обробник кнопки OK"""
@@ -422,11 +429,10 @@ class PassportDataDialog(QDialog):
             if name in self.passport_data:
                 return self.passport_data[name]
 
-            # Шукаємо часткове співпадіння (без урахування регістру)
-            name_upper = name.upper()
-            for key, value in self.passport_data.items():
-                if key.upper() == name_upper:
-                    return value
+            # Співпадіння по ключу ПІБ (регістр, апостроф, пробіли) - O(1)
+            passport = self.passport_data_by_key.get(normalize_name(name))
+            if passport is not None:
+                return passport
 
             # Не знайдено - повертаємо порожнє
             return {"СЕРІЯ": "", "НОМЕР": ""}
@@ -3,6 +3,7 @@
 """
 import sys
 import os
+import multiprocessing
 
 # Для PyInstaller: визначаємо базовий шлях
 if getattr(sys, 'frozen', False):
@@ -39,4 +40,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Для PyInstaller: процеси-воркери генерації рапортів не повинні запускати GUI
+    multiprocessing.freeze_support()
     main()
@@ -2,41 +2,143 @@
 Допоміжні функції для роботи з датами
 """
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 import re
 
 
-def parse_ukrainian_date(date_str: str) -> Optional[date]:
+# Формати для повільного шляху (рядки, форма яких не розпізнана швидким шляхом)
+DATE_FORMATS = [
+    "%d.%m.%Y",                    # 01.08.2025
+    "%Y-%m-%d",                    # 2025-08-01
+    "%d/%m/%Y",                    # 01/08/2025
+    "%Y-%m-%d %H:%M:%S",           # 2025-08-01 00:00:00
+    "%Y-%m-%dT%H:%M:%S",           # 2025-08-01T00:00:00
+    "%Y-%m-%d %H:%M:%S.%f",        # 2025-08-01 00:00:00.000000
+]
+
+_ASCII_DIGITS = frozenset("0123456789")
+
+
+def parse_date(value) -> Optional[date]:
     """
-    Парсить дату з українського формату DD.MM.YYYY
+    Єдиний парсер дат для всього додатку
+
+    Приймає date / datetime (з Excel) або рядок у форматах DD.MM.YYYY,
+    DD/MM/YYYY, YYYY-MM-DD, YYYY-MM-DD HH:MM:SS[.ffffff] (також з "T").
+    Рядки розбираються за формою (довжина та позиції роздільників) без strptime;
+    результати кешуються.
 
     Args:
-        date_str: Рядок з датою у форматі DD.MM.YYYY
+        value: Значення дати
 
     Returns:
         date object або None якщо парсинг не вдався
     """
-    if not date_str or not isinstance(date_str, str):
+    if value is None:
         return None
 
-    # Видаляємо зайві пробіли
-    date_str = date_str.strip()
+    if isinstance(value, datetime):
+        return value.date()
 
-    # Спроба розпарсити у форматі DD.MM.YYYY
+    if isinstance(value, date):
+        return value
+
+    date_str = str(value).strip()
+    if not date_str:
+        return None
+
+    return _parse_date_string(date_str)
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_string(date_str: str) -> Optional[date]:
+    """Парсить рядок дати (кешується)"""
     try:
-        return datetime.strptime(date_str, "%d.%m.%Y").date()
+        parsed = _parse_date_shape(date_str)
+        if parsed is not None:
+            return parsed
     except ValueError:
         pass
 
-    # Спроба розпарсити у форматі YYYY-MM-DD
+    # Повільний шлях: невідома форма або некоректні значення
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+
+    # Якщо нічого не спрацювало - спробувати fromisoformat
     try:
-        return datetime.strptime(date_str, "%Y-%m-%d").date()
+        return datetime.fromisoformat(date_str.replace(" ", "T")).date()
     except ValueError:
-        pass
+        return None
+
+
+def _parse_date_shape(date_str: str) -> Optional[date]:
+    """
+    Швидкий шлях: розбір за формою рядка зрізами
+
+    Returns:
+        date або None якщо форма не розпізнана
+
+    Raises:
+        ValueError: Якщо форма розпізнана, але значення некоректні
+    """
+    length = len(date_str)
+
+    if length == 10:
+        separator = date_str[2]
+        if separator in "./" and date_str[5] == separator:
+            # DD.MM.YYYY / DD/MM/YYYY
+            day, month, year = date_str[0:2], date_str[3:5], date_str[6:10]
+        elif date_str[4] == "-" and date_str[7] == "-":
+            # YYYY-MM-DD
+            year, month, day = date_str[0:4], date_str[5:7], date_str[8:10]
+        else:
+            return None
+
+        if not _ASCII_DIGITS.issuperset(day + month + year):
+            return None
+        return date(int(year), int(month), int(day))
+
+    if length >= 19 and date_str[4] == "-" and date_str[7] == "-" and date_str[10] in " T" \
+            and date_str[13] == ":" and date_str[16] == ":":
+        # YYYY-MM-DD HH:MM:SS[.ffffff]
+        fraction = date_str[19:]
+        if fraction and not (fraction[0] == "." and 2 <= len(fraction) <= 7):
+            return None
+
+        digits = date_str[0:4] + date_str[5:7] + date_str[8:10] + date_str[11:13] \
+            + date_str[14:16] + date_str[17:19] + fraction[1:]
+        if not _ASCII_DIGITS.issuperset(digits):
+            return None
+
+        # datetime перевіряє коректність часу (як strptime)
+        return datetime(
+            int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]),
+            int(date_str[11:13]), int(date_str[14:16]), int(date_str[17:19])
+        ).date()
 
     return None
 
 
+def parse_ukrainian_date(date_str: str) -> Optional[date]:
+    """
+    Парсить дату з українського формату DD.MM.YYYY
+
+    Args:
+        date_str: Рядок з датою у форматі DD.MM.YYYY
+
+    Returns:
+        date object або None якщо парсинг не вдався
+    """
+    if not date_str or not isinstance(date_str, str):
+        return None
+
+    return parse_date(date_str)
+
+
 def format_date_ukrainian(date_obj: date) -> str:
     """
     Форматує дату в український формат DD.MM.YYYY
@@ -0,0 +1,38 @@
+"""
+Допоміжні функції для роботи з ПІБ
+"""
+import unicodedata
+from functools import lru_cache
+
+
+# Варіанти апострофа в українських ПІБ -> звичайний апостроф
+_APOSTROPHES = str.maketrans({
+    "ʼ": "'",  # ʼ модифікатор-апостроф
+    "’": "'",  # ’ права одинарна лапка
+    "‘": "'",  # ‘ ліва одинарна лапка
+    "ʹ": "'",  # ʹ модифікатор-штрих
+    "′": "'",  # ′ штрих
+    "´": "'",  # ´ акут
+    "`": "'",
+})
+
+
+@lru_cache(maxsize=16384)
+def normalize_name(name) -> str:
+    """
+    Канонічний ключ ПІБ для пошуку без урахування регістру та написання апострофа
+
+    Unicode NFC, уніфікований апостроф (ʼ / ’ / ' ...), casefold,
+    пробіли згорнуті до одного ("Пʼятниця  ІВАН" -> "п'ятниця іван")
+
+    Args:
+        name: ПІБ
+
+    Returns:
+        Ключ (порожній рядок для порожнього ПІБ)
+    """
+    if not name:
+        return ""
+
+    text = unicodedata.normalize("NFC", str(name)).translate(_APOSTROPHES).casefold()
+    return " ".join(text.split())
@@ -5,13 +5,17 @@ import os
 from typing import Tuple
 from openpyxl import load_workbook
 
+from core.xlsx_stream import XlsxStreamReader
 
-def validate_excel_file(file_path: str) -> Tuple[bool, str]:
+
+def validate_excel_file(file_path: str, streaming: bool = True) -> Tuple[bool, str]:
     """
     Валідує Excel файл
 
     Args:
         file_path: Шлях до Excel файлу
+        streaming: Читати перелік аркушів через XlsxStreamReader
+            (тільки workbook.xml, без завантаження книги openpyxl)
 
     Returns:
         (True, "") якщо файл валідний, (False, "повідомлення про помилку") інакше
@@ -26,7 +30,10 @@ def validate_excel_file(file_path: str) -> Tuple[bool, str]:
 
     # Спроба відкрити файл
     try:
-        wb = load_workbook(file_path, read_only=True, keep_vba=True)
+        if streaming:
+            wb = XlsxStreamReader(file_path)
+        else:
+            wb = load_workbook(file_path, read_only=True, keep_vba=True)
 
         # Перевірка наявності обов'язкових аркушів
         required_sheets = ["Data", "Періоди на 100", "Періоди на 30"]